@@ -0,0 +1,87 @@
+"""Add chat room summary columns
+
+Revision ID: 1c6f3b9e7d20
+Revises: b8e2d6f4a1c9
+Create Date: 2026-10-20 09:14:52.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c6f3b9e7d20'
+down_revision: Union[str, None] = 'b8e2d6f4a1c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 与 app/repositories/chat.py 中的消息预览规则保持一致（迁移中不引用应用代码）
+PREVIEW_MAX_LENGTH = 100
+MESSAGE_TYPE_PREVIEWS = {
+    "image": "[图片]",
+    "video": "[视频]",
+    "audio": "[语音]",
+    "file": "[文件]",
+}
+
+
+def upgrade() -> None:
+    op.add_column('chat_rooms', sa.Column('last_message_id', sa.Integer(), nullable=True))
+    op.add_column('chat_rooms', sa.Column('last_sender_id', sa.Integer(), nullable=True))
+    op.add_column('chat_rooms', sa.Column('last_message_type', sa.String(length=20), nullable=True))
+    op.add_column('chat_rooms', sa.Column('last_message_preview', sa.String(length=200), nullable=True))
+    op.add_column('chat_rooms', sa.Column('last_message_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('chat_rooms', sa.Column('member_count', sa.Integer(), server_default='0', nullable=False))
+    # 历史消息的已读状态不区分群成员，群聊未读数从0开始计
+    op.add_column('chat_room_members', sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(
+        "UPDATE chat_rooms SET member_count = "
+        "(SELECT COUNT(*) FROM chat_room_members WHERE chat_room_members.room_id = chat_rooms.id)"
+    )
+
+    # 每个聊天室的最新消息，热表中没有时取归档表
+    conn = op.get_bind()
+    sources = ['chat_messages']
+    if sa.inspect(conn).has_table('chat_messages_archive'):
+        sources.insert(0, 'chat_messages_archive')
+    latest = {}
+    for source in sources:
+        rows = conn.execute(sa.text(
+            f"SELECT m.id, m.chat_room_id, m.sender_id, m.message_type, m.content, m.created_at FROM {source} m "
+            f"JOIN (SELECT MAX(id) AS id FROM {source} WHERE chat_room_id IS NOT NULL GROUP BY chat_room_id) last "
+            "ON last.id = m.id"
+        )).fetchall()
+        for row in rows:
+            if row.chat_room_id not in latest or row.id > latest[row.chat_room_id].id:
+                latest[row.chat_room_id] = row
+
+    params = []
+    for room_id, row in latest.items():
+        message_type = (row.message_type or "text").lower()
+        params.append({
+            "room_id": room_id,
+            "message_id": row.id,
+            "sender_id": row.sender_id,
+            "message_type": message_type,
+            "preview": MESSAGE_TYPE_PREVIEWS.get(message_type, (row.content or "")[:PREVIEW_MAX_LENGTH]),
+            "created_at": row.created_at
+        })
+    if params:
+        conn.execute(sa.text(
+            "UPDATE chat_rooms SET last_message_id = :message_id, last_sender_id = :sender_id, "
+            "last_message_type = :message_type, last_message_preview = :preview, last_message_at = :created_at "
+            "WHERE id = :room_id"
+        ), params)
+
+
+def downgrade() -> None:
+    op.drop_column('chat_room_members', 'unread_count')
+    op.drop_column('chat_rooms', 'member_count')
+    op.drop_column('chat_rooms', 'last_message_at')
+    op.drop_column('chat_rooms', 'last_message_preview')
+    op.drop_column('chat_rooms', 'last_message_type')
+    op.drop_column('chat_rooms', 'last_sender_id')
+    op.drop_column('chat_rooms', 'last_message_id')
@@ -0,0 +1,34 @@
+"""Add hot path composite indexes
+
+Revision ID: 3f9c2a7d41b6
+Revises: ca7bdec27c32
+Create Date: 2026-10-19 10:12:45.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d41b6'
+down_revision: Union[str, None] = 'ca7bdec27c32'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_health_records_user_recorded_at', 'health_records', ['user_id', 'recorded_at'], unique=False)
+    op.create_index('ix_chat_messages_pair_time', 'chat_messages', ['sender_id', 'receiver_id', 'created_at'], unique=False)
+    op.create_index('ix_chat_messages_receiver_read', 'chat_messages', ['receiver_id', 'is_read'], unique=False)
+    op.create_index('ix_challenge_records_challenge_completed_user', 'challenge_records', ['challenge_id', 'completed', 'user_id'], unique=False)
+    op.create_index('ix_posts_featured_created_at', 'posts', ['is_featured', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_posts_featured_created_at', table_name='posts')
+    op.drop_index('ix_challenge_records_challenge_completed_user', table_name='challenge_records')
+    op.drop_index('ix_chat_messages_receiver_read', table_name='chat_messages')
+    op.drop_index('ix_chat_messages_pair_time', table_name='chat_messages')
+    op.drop_index('ix_health_records_user_recorded_at', table_name='health_records')
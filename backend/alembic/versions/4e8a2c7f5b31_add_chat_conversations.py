@@ -0,0 +1,71 @@
+"""Add chat conversations
+
+Revision ID: 4e8a2c7f5b31
+Revises: 1c6f3b9e7d20
+Create Date: 2026-10-20 09:47:26.905713
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e8a2c7f5b31'
+down_revision: Union[str, None] = '1c6f3b9e7d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    # 应用启动时的create_all可能已建表
+    if not inspector.has_table('chat_conversations'):
+        op.create_table(
+            'chat_conversations',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('contact_id', sa.Integer(), nullable=False),
+            sa.Column('last_message_id', sa.Integer(), nullable=False),
+            sa.Column('last_time', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+            sa.ForeignKeyConstraint(['contact_id'], ['users.id'], ),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_id', 'contact_id', name='uq_chat_conversations_user_contact')
+        )
+        op.create_index(op.f('ix_chat_conversations_id'), 'chat_conversations', ['id'], unique=False)
+        op.create_index('ix_chat_conversations_user_last_time', 'chat_conversations', ['user_id', 'last_time'], unique=False)
+
+    # 从历史私聊消息（含归档）生成双方的会话：最新消息和对方发来的未读数
+    columns = "id, sender_id, receiver_id, is_read, created_at"
+    messages = f"SELECT {columns} FROM chat_messages WHERE chat_room_id IS NULL"
+    if inspector.has_table('chat_messages_archive'):
+        messages += f" UNION ALL SELECT {columns} FROM chat_messages_archive WHERE chat_room_id IS NULL"
+    op.execute(
+        "INSERT INTO chat_conversations "
+        "(user_id, contact_id, last_message_id, last_time, unread_count, created_at, updated_at) "
+        "SELECT pairs.user_id, pairs.contact_id, pairs.last_message_id, last_message.created_at, "
+        "pairs.unread_count, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP "
+        "FROM ("
+        "SELECT user_id, contact_id, MAX(id) AS last_message_id, SUM(unread) AS unread_count FROM ("
+        f"SELECT sender_id AS user_id, receiver_id AS contact_id, id, 0 AS unread FROM ({messages}) sent "
+        "UNION ALL "
+        "SELECT receiver_id AS user_id, sender_id AS contact_id, id, "
+        f"CASE WHEN is_read = false THEN 1 ELSE 0 END AS unread FROM ({messages}) received"
+        ") directed GROUP BY user_id, contact_id"
+        f") pairs JOIN ({messages}) last_message ON last_message.id = pairs.last_message_id "
+        # 迁移前已由新消息写入的会话保持不变
+        "WHERE NOT EXISTS (SELECT 1 FROM chat_conversations existing "
+        "WHERE existing.user_id = pairs.user_id AND existing.contact_id = pairs.contact_id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_conversations_user_last_time', table_name='chat_conversations')
+    op.drop_index(op.f('ix_chat_conversations_id'), table_name='chat_conversations')
+    op.drop_table('chat_conversations')
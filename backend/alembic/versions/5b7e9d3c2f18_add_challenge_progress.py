@@ -0,0 +1,74 @@
+"""Add challenge progress table
+
+Revision ID: 5b7e9d3c2f18
+Revises: 8d1e5b0c7a42
+Create Date: 2026-10-19 16:05:21.448730
+
+"""
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e9d3c2f18'
+down_revision: Union[str, None] = '8d1e5b0c7a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'challenge_progress',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('challenge_id', sa.Integer(), nullable=False),
+        sa.Column('check_in_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_points', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('current_streak', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('longest_streak', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_check_in_date', sa.Date(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['challenge_id'], ['challenges.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'challenge_id', name='uq_challenge_progress_user_challenge')
+    )
+    op.create_index(op.f('ix_challenge_progress_id'), 'challenge_progress', ['id'], unique=False)
+    
+    # 按已完成的打卡记录回填，连续天数需按日期逐行计算
+    # （与 app/repositories/challenge.py 中的 _summarize_progress 保持一致，迁移中不引用应用代码）
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT user_id, challenge_id, check_in_day, points_earned FROM challenge_records "
+        "WHERE completed = true ORDER BY user_id, challenge_id, check_in_day"
+    )).fetchall()
+    progress = {}
+    for user_id, challenge_id, day, points in rows:
+        if isinstance(day, str):
+            day = date.fromisoformat(day[:10])
+        item = progress.setdefault((user_id, challenge_id), {
+            "user_id": user_id, "challenge_id": challenge_id, "check_in_count": 0, "total_points": 0,
+            "current_streak": 0, "longest_streak": 0, "last_check_in_date": None
+        })
+        last_day = item["last_check_in_date"]
+        item["current_streak"] = item["current_streak"] + 1 if last_day == day - timedelta(days=1) else 1
+        item["longest_streak"] = max(item["longest_streak"], item["current_streak"])
+        item["check_in_count"] += 1
+        item["total_points"] += points or 0
+        item["last_check_in_date"] = day
+    if progress:
+        conn.execute(sa.text(
+            "INSERT INTO challenge_progress (user_id, challenge_id, check_in_count, total_points, "
+            "current_streak, longest_streak, last_check_in_date, created_at, updated_at) "
+            "VALUES (:user_id, :challenge_id, :check_in_count, :total_points, "
+            ":current_streak, :longest_streak, :last_check_in_date, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        ), list(progress.values()))
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_challenge_progress_id'), table_name='challenge_progress')
+    op.drop_table('challenge_progress')
@@ -0,0 +1,26 @@
+"""Add user token version
+
+Revision ID: 6a9d1e4f8c52
+Revises: d3a7f2c9e815
+Create Date: 2026-10-20 10:21:37.480195
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a9d1e4f8c52'
+down_revision: Union[str, None] = 'd3a7f2c9e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,40 @@
+"""Add challenge record check-in day unique constraint
+
+Revision ID: 8d1e5b0c7a42
+Revises: 3f9c2a7d41b6
+Create Date: 2026-10-19 14:37:02.905117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d1e5b0c7a42'
+down_revision: Union[str, None] = '3f9c2a7d41b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('challenge_records', sa.Column('check_in_day', sa.Date(), nullable=True))
+    op.execute("UPDATE challenge_records SET check_in_day = DATE(check_in_date)")
+    # 已存在同一天多次打卡的数据需要先清理，否则无法创建唯一约束，每天只保留最早的一条
+    op.execute(
+        "DELETE FROM challenge_records WHERE id NOT IN "
+        "(SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM challenge_records "
+        "GROUP BY user_id, challenge_id, check_in_day) AS kept)"
+    )
+    op.alter_column('challenge_records', 'check_in_day', existing_type=sa.Date(), nullable=False)
+    op.create_unique_constraint(
+        'uq_challenge_records_user_challenge_day',
+        'challenge_records',
+        ['user_id', 'challenge_id', 'check_in_day']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_challenge_records_user_challenge_day', 'challenge_records', type_='unique')
+    op.drop_column('challenge_records', 'check_in_day')
@@ -0,0 +1,67 @@
+"""Add health daily rollups
+
+Revision ID: 9f2b5d8a3e64
+Revises: 6a9d1e4f8c52
+Create Date: 2026-10-20 10:58:04.216739
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f2b5d8a3e64'
+down_revision: Union[str, None] = '6a9d1e4f8c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 与 app/repositories/health.py 中的 ROLLUP_METRICS 保持一致（迁移中不引用应用代码）
+ROLLUP_METRICS = ("heart_rate", "blood_sugar", "weight", "bmi")
+
+
+def upgrade() -> None:
+    # 应用启动时的create_all可能已建表
+    if not sa.inspect(op.get_bind()).has_table('health_daily_rollups'):
+        metric_columns = []
+        for metric in ROLLUP_METRICS:
+            metric_columns += [
+                sa.Column(f'{metric}_count', sa.Integer(), server_default='0', nullable=False),
+                sa.Column(f'{metric}_sum', sa.Float(), server_default='0', nullable=False),
+                sa.Column(f'{metric}_min', sa.Float(), nullable=True),
+                sa.Column(f'{metric}_max', sa.Float(), nullable=True),
+            ]
+        op.create_table(
+            'health_daily_rollups',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('record_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('blood_pressure_count', sa.Integer(), server_default='0', nullable=False),
+            *metric_columns,
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_id', 'day', name='uq_health_daily_rollups_user_day')
+        )
+        op.create_index(op.f('ix_health_daily_rollups_id'), 'health_daily_rollups', ['id'], unique=False)
+
+    # 按原始记录全量重建，覆盖建表后仅由新记录增量写入的不完整汇总行
+    columns = ["record_count", "blood_pressure_count"]
+    aggregates = ["COUNT(id)", "COUNT(blood_pressure)"]
+    for metric in ROLLUP_METRICS:
+        columns += [f"{metric}_count", f"{metric}_sum", f"{metric}_min", f"{metric}_max"]
+        aggregates += [f"COUNT({metric})", f"COALESCE(SUM({metric}), 0)", f"MIN({metric})", f"MAX({metric})"]
+    op.execute("DELETE FROM health_daily_rollups")
+    op.execute(
+        f"INSERT INTO health_daily_rollups (user_id, day, {', '.join(columns)}, created_at, updated_at) "
+        f"SELECT user_id, DATE(recorded_at), {', '.join(aggregates)}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP "
+        "FROM health_records GROUP BY user_id, DATE(recorded_at)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_health_daily_rollups_id'), table_name='health_daily_rollups')
+    op.drop_table('health_daily_rollups')
@@ -0,0 +1,32 @@
+"""Add challenge participant count
+
+Revision ID: a4c81f6e9d25
+Revises: 5b7e9d3c2f18
+Create Date: 2026-10-19 17:22:40.183562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c81f6e9d25'
+down_revision: Union[str, None] = '5b7e9d3c2f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('challenges', sa.Column('participant_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE challenges SET participant_count = "
+        "(SELECT COUNT(*) FROM challenge_participants WHERE challenge_participants.challenge_id = challenges.id)"
+    )
+    op.create_index('ix_challenges_active_participant_count', 'challenges', ['is_active', 'participant_count'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_challenges_active_participant_count', table_name='challenges')
+    op.drop_column('challenges', 'participant_count')
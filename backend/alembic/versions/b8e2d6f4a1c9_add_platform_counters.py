@@ -0,0 +1,53 @@
+"""Add platform counters
+
+Revision ID: b8e2d6f4a1c9
+Revises: f19a7c4e2b60
+Create Date: 2026-10-19 21:58:27.640153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2d6f4a1c9'
+down_revision: Union[str, None] = 'f19a7c4e2b60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 与 app/models/platform.py 中的 PlatformCounterKey 保持一致（迁移中不引用应用代码）
+COUNTERS = [
+    (1, 'users', "SELECT COUNT(*) FROM users"),
+    (2, 'active_users', "SELECT COUNT(*) FROM users WHERE is_active = true"),
+    (3, 'courses', "SELECT COUNT(*) FROM courses"),
+    (4, 'challenges', "SELECT COUNT(*) FROM challenges"),
+    (5, 'health_records', "SELECT COUNT(*) FROM health_records"),
+    (6, 'posts', "SELECT COUNT(*) FROM posts"),
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'platform_counters',
+        sa.Column('name', sa.String(length=50), nullable=False, comment='计数项名称'),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_platform_counters_id'), 'platform_counters', ['id'], unique=False)
+
+    for counter_id, name, count_sql in COUNTERS:
+        op.execute(
+            "INSERT INTO platform_counters (id, name, value, created_at, updated_at) "
+            f"SELECT {counter_id}, '{name}', ({count_sql}), CURRENT_TIMESTAMP, CURRENT_TIMESTAMP"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_platform_counters_id'), table_name='platform_counters')
+    op.drop_table('platform_counters')
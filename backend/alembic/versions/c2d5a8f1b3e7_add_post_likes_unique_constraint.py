@@ -0,0 +1,35 @@
+"""Add post likes unique constraint
+
+Revision ID: c2d5a8f1b3e7
+Revises: a4c81f6e9d25
+Create Date: 2026-10-19 18:03:11.572904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d5a8f1b3e7'
+down_revision: Union[str, None] = 'a4c81f6e9d25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 并发点赞产生的重复记录只保留最早的一条，并据此修正点赞数
+    op.execute(
+        "DELETE FROM post_likes WHERE id NOT IN "
+        "(SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM post_likes GROUP BY post_id, user_id) AS kept)"
+    )
+    op.execute(
+        "UPDATE posts SET likes_count = "
+        "(SELECT COUNT(*) FROM post_likes WHERE post_likes.post_id = posts.id)"
+    )
+    op.create_unique_constraint('uq_post_likes_post_user', 'post_likes', ['post_id', 'user_id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_post_likes_post_user', 'post_likes', type_='unique')
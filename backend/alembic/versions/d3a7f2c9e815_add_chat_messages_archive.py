@@ -0,0 +1,53 @@
+"""Add chat messages archive
+
+Revision ID: d3a7f2c9e815
+Revises: 4e8a2c7f5b31
+Create Date: 2026-10-20 10:03:18.562047
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7f2c9e815'
+down_revision: Union[str, None] = '4e8a2c7f5b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 与 app/models/chat.py 中的 MessageType 保持一致（迁移中不引用应用代码）
+MESSAGE_TYPES = ('TEXT', 'IMAGE', 'VIDEO', 'AUDIO', 'FILE')
+
+
+def upgrade() -> None:
+    # messagetype 类型已随 chat_messages 创建，仅在不存在时创建
+    sa.Enum(*MESSAGE_TYPES, name='messagetype').create(op.get_bind(), checkfirst=True)
+    op.create_table(
+        'chat_messages_archive',
+        sa.Column('sender_id', sa.Integer(), nullable=False),
+        sa.Column('receiver_id', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('message_type', postgresql.ENUM(*MESSAGE_TYPES, name='messagetype', create_type=False), nullable=False),
+        sa.Column('is_read', sa.Boolean(), nullable=False),
+        sa.Column('read_at', sa.DateTime(), nullable=True),
+        sa.Column('chat_room_id', sa.Integer(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['receiver_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_chat_messages_archive_id'), 'chat_messages_archive', ['id'], unique=False)
+    op.create_index('ix_chat_messages_archive_pair_time', 'chat_messages_archive', ['sender_id', 'receiver_id', 'created_at'], unique=False)
+    op.create_index('ix_chat_messages_archive_room_time', 'chat_messages_archive', ['chat_room_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_messages_archive_room_time', table_name='chat_messages_archive')
+    op.drop_index('ix_chat_messages_archive_pair_time', table_name='chat_messages_archive')
+    op.drop_index(op.f('ix_chat_messages_archive_id'), table_name='chat_messages_archive')
+    op.drop_table('chat_messages_archive')
@@ -0,0 +1,44 @@
+"""Add view and enrollment counters
+
+Revision ID: e6b3f0a9c8d4
+Revises: c2d5a8f1b3e7
+Create Date: 2026-10-19 19:10:37.904215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b3f0a9c8d4'
+down_revision: Union[str, None] = 'c2d5a8f1b3e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('posts', sa.Column('views_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('courses', sa.Column('enrollment_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('courses', sa.Column('views_count', sa.Integer(), server_default='0', nullable=False))
+    # 报名表改为以id为主键，(user_id, course_id)唯一
+    op.drop_constraint('course_enrollments_pkey', 'course_enrollments', type_='primary')
+    op.create_primary_key('course_enrollments_pkey', 'course_enrollments', ['id'])
+    # 原表的id没有自增，新报名插入时需由数据库生成
+    op.alter_column('course_enrollments', 'id', existing_type=sa.Integer(), autoincrement=True, nullable=False)
+    op.create_unique_constraint('uq_course_enrollments_user_course', 'course_enrollments', ['user_id', 'course_id'])
+    op.execute(
+        "UPDATE courses SET enrollment_count = "
+        "(SELECT COUNT(*) FROM course_enrollments WHERE course_enrollments.course_id = courses.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_course_enrollments_user_course', 'course_enrollments', type_='unique')
+    op.alter_column('course_enrollments', 'id', existing_type=sa.Integer(), autoincrement=False, nullable=False)
+    op.drop_constraint('course_enrollments_pkey', 'course_enrollments', type_='primary')
+    op.create_primary_key('course_enrollments_pkey', 'course_enrollments', ['id', 'user_id', 'course_id'])
+    op.drop_column('courses', 'views_count')
+    op.drop_column('courses', 'enrollment_count')
+    op.drop_column('posts', 'views_count')
@@ -0,0 +1,45 @@
+"""Add post hot score
+
+Revision ID: f19a7c4e2b60
+Revises: e6b3f0a9c8d4
+Create Date: 2026-10-19 20:41:09.336817
+
+"""
+import math
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f19a7c4e2b60'
+down_revision: Union[str, None] = 'e6b3f0a9c8d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 与 app/core/hot_score.py 保持一致（迁移中不引用应用代码）
+HOT_SCORE_EPOCH = datetime(2024, 1, 1)
+DECAY_SECONDS = 45000
+
+
+def upgrade() -> None:
+    op.add_column('posts', sa.Column('hot_score', sa.Float(), server_default='0', nullable=False))
+    
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, likes_count, comments_count, created_at FROM posts")).fetchall()
+    params = []
+    for post_id, likes_count, comments_count, created_at in rows:
+        engagement = (likes_count or 0) + 2 * (comments_count or 0)
+        age = ((created_at or HOT_SCORE_EPOCH).replace(tzinfo=None) - HOT_SCORE_EPOCH).total_seconds()
+        params.append({"post_id": post_id, "score": round(math.log10(max(engagement, 1)) + age / DECAY_SECONDS, 7)})
+    if params:
+        conn.execute(sa.text("UPDATE posts SET hot_score = :score WHERE id = :post_id"), params)
+    
+    op.create_index('ix_posts_hot_score', 'posts', ['hot_score'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_posts_hot_score', table_name='posts')
+    op.drop_column('posts', 'hot_score')
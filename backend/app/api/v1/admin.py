@@ -4,14 +4,17 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, date, timedelta
 
 from ...core.database import get_async_db
-from ...core.security import get_current_admin_user, get_current_active_user
+from ...core.security import get_current_admin_user, get_current_active_user, password_hasher
+from ...core.snapshot import gather_in_sessions, stats_snapshots
 from ...schemas.base import DataResponse, PaginatedResponse
 from ...services.user_service import UserService
 from ...services.course_service import CourseService
 from ...services.challenge_service import ChallengeService
 from ...services.health_service import HealthService
 from ...services.social_service import SocialService
+from ...services.platform_counter_service import PlatformCounterService
 from ...models.user import User
+from ...models.platform import PlatformCounterKey
 
 router = APIRouter()
 
@@ -21,48 +24,55 @@ async def get_admin_dashboard(
     user_service: UserService = Depends(),
     course_service: CourseService = Depends(),
     challenge_service: ChallengeService = Depends(),
-    health_service: HealthService = Depends(),
-    social_service: SocialService = Depends()
+    platform_counter_service: PlatformCounterService = Depends()
 ):
     """
     获取管理员仪表盘数据
-    """
-    # 获取基础统计数据
-    total_users = await user_service.repository.count(db)
-    total_courses = await course_service.repository.count(db)
-    total_challenges = await challenge_service.repository.count(db)
-    total_health_records = await health_service.repository.count(db)
-    total_social_posts = await social_service.repository.count(db)
-    
-    # 获取活跃用户数（最近7天）
-    seven_days_ago = datetime.now() - timedelta(days=7)
-    active_users = await user_service.get_active_users(db, seven_days_ago)
     
-    # 获取课程参与统计
-    course_stats = await course_service.get_participation_stats(db)
-    
-    # 获取用户注册趋势（最近30天）
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    registration_trend = await user_service.get_registration_trend(db, thirty_days_ago)
+    统计数据在独立会话中并发查询，结果缓存为快照；系统健康状态每次实时获取
+    """
+    async def build() -> Dict[str, Any]:
+        # 活跃用户为最近7天，注册趋势为最近30天
+        seven_days_ago = datetime.now() - timedelta(days=7)
+        thirty_days_ago = datetime.now() - timedelta(days=30)
+        
+        async def count_active_users(session: AsyncSession) -> int:
+            return len(await user_service.get_active_users(session, seven_days_ago))
+        
+        results = await gather_in_sessions({
+            # 基础统计数据读取增量维护的平台计数
+            "counts": platform_counter_service.get_counts,
+            "activeUsers": count_active_users,
+            # 趋势数据
+            "registrationTrend": lambda session: user_service.get_registration_trend(session, thirty_days_ago),
+            "courseParticipation": course_service.get_participation_stats,
+            "recentActivity": lambda session: get_recent_activity(session, user_service, course_service, challenge_service)
+        })
+        counts = results["counts"]
+        return {
+            "overview": {
+                "totalUsers": counts[PlatformCounterKey.USERS],
+                "totalCourses": counts[PlatformCounterKey.COURSES],
+                "totalChallenges": counts[PlatformCounterKey.CHALLENGES],
+                "totalHealthRecords": counts[PlatformCounterKey.HEALTH_RECORDS],
+                "totalSocialPosts": counts[PlatformCounterKey.POSTS],
+                "activeUsers": results["activeUsers"]
+            },
+            "trends": {
+                "registrationTrend": results["registrationTrend"],
+                "courseParticipation": results["courseParticipation"]
+            },
+            "recentActivity": results["recentActivity"]
+        }
     
-    # 获取系统健康状态
-    system_health = await get_system_health_status(db)
+    snapshot = await stats_snapshots.get("admin:dashboard", build)
     
+    # 快照为共享对象，组装新的字典返回
     dashboard_data = {
-        "overview": {
-            "totalUsers": total_users,
-            "totalCourses": total_courses,
-            "totalChallenges": total_challenges,
-            "totalHealthRecords": total_health_records,
-            "totalSocialPosts": total_social_posts,
-            "activeUsers": len(active_users)
-        },
-        "trends": {
-            "registrationTrend": registration_trend,
-            "courseParticipation": course_stats
-        },
-        "systemHealth": system_health,
-        "recentActivity": await get_recent_activity(db, user_service, course_service, challenge_service)
+        "overview": snapshot["overview"],
+        "trends": snapshot["trends"],
+        "systemHealth": await get_system_health_status(db),
+        "recentActivity": snapshot["recentActivity"]
     }
     
     return DataResponse(data=dashboard_data, message="获取管理员仪表盘成功")
@@ -298,6 +308,15 @@ async def get_admin_reports(
     
     return DataResponse(data=report_data, message="生成系统报告成功")
 
+@router.get("/system/password-hasher", response_model=DataResponse[Dict[str, int]])
+async def get_password_hasher_stats(
+    admin_user: User = Depends(get_current_admin_user)
+):
+    """
+    获取密码哈希线程池指标（排队数、执行数等）
+    """
+    return DataResponse(data=password_hasher.stats(), message="获取密码哈希线程池指标成功")
+
 # 辅助函数
 async def get_system_health_status(db: AsyncSession) -> Dict[str, Any]:
     """获取系统健康状态"""
@@ -314,6 +333,7 @@ async def get_system_health_status(db: AsyncSession) -> Dict[str, Any]:
             "websocket": "healthy",
             "upload": "healthy"
         },
+        "password_hasher": password_hasher.stats(),
         "uptime": "7 days"
     }
 
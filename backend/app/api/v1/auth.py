@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
@@ -8,6 +8,7 @@ from ...core.database import get_async_db
 from ...schemas.user import UserCreate, TokenResponse, UserLogin
 from ...schemas.base import DataResponse
 from ...core.security import get_current_active_user
+from ...core.exceptions import TooManyRequestsException
 from ...models.user import User
 from ...services.auth_service import AuthService
 
@@ -17,17 +18,26 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login
 @router.post("/login", response_model=DataResponse[TokenResponse])
 async def login(
     login_data: UserLogin,
+    request: Request,
     db: AsyncSession = Depends(get_async_db),
     auth_service: AuthService = Depends()
 ):
     """
     用户登录
     """
-    token_response = await auth_service.login(
-        db, 
-        username=login_data.username, 
-        password=login_data.password
-    )
+    try:
+        token_response = await auth_service.login(
+            db, 
+            username=login_data.username, 
+            password=login_data.password,
+            client_ip=request.client.host if request.client else None
+        )
+    except TooManyRequestsException as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)},
+        )
     
     if not token_response:
         raise HTTPException(
@@ -4,6 +4,7 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, date
 
 from ...core.database import get_async_db
+from ...core.security import get_current_admin_user
 from ...schemas.challenge import (
     ChallengeCreate, ChallengeUpdate, ChallengePublic,
     ChallengeRecordCreate, ChallengeRecordPublic
@@ -174,6 +175,7 @@ async def check_in(
             record = ChallengeRecordCreate(
                 user_id=user_id,
                 challenge_id=challenge_id,
+                check_in_date=datetime.now(),
                 completed=True
             )
         
@@ -252,6 +254,37 @@ async def get_challenge_progress(
     
     return DataResponse(data=progress)
 
+@router.post("/progress/rebuild", response_model=DataResponse[Dict[str, int]])
+async def rebuild_challenge_progress(
+    challenge_id: Optional[int] = Query(None, description="挑战ID，不传则重建所有挑战"),
+    db: AsyncSession = Depends(get_async_db),
+    challenge_service: ChallengeService = Depends(),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    管理员根据打卡记录重建挑战进度数据
+    """
+    rebuilt_count = await challenge_service.rebuild_progress(db, challenge_id=challenge_id)
+    return DataResponse(
+        data={"rebuilt_count": rebuilt_count},
+        message=f"成功重建 {rebuilt_count} 条挑战进度"
+    )
+
+@router.post("/participant-counts/rebuild", response_model=DataResponse[Dict[str, int]])
+async def rebuild_participant_counts(
+    db: AsyncSession = Depends(get_async_db),
+    challenge_service: ChallengeService = Depends(),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    管理员根据参与记录重新计算挑战参与人数
+    """
+    updated_count = await challenge_service.rebuild_participant_counts(db)
+    return DataResponse(
+        data={"updated_count": updated_count},
+        message=f"成功更新 {updated_count} 个挑战的参与人数"
+    )
+
 @router.get("/{challenge_id}/leaderboard", response_model=DataResponse[List[Dict[str, Any]]])
 async def get_challenge_leaderboard(
     challenge_id: int,
@@ -270,6 +303,26 @@ async def get_challenge_leaderboard(
     
     return DataResponse(data=leaderboard)
 
+@router.get("/{challenge_id}/leaderboard/{user_id}", response_model=DataResponse[Dict[str, Any]])
+async def get_challenge_leaderboard_position(
+    challenge_id: int,
+    user_id: int,
+    neighbors: int = Query(5, ge=0, le=50, description="前后各返回的人数"),
+    db: AsyncSession = Depends(get_async_db),
+    challenge_service: ChallengeService = Depends()
+):
+    """
+    获取用户在挑战排行榜中的名次及前后相邻的用户
+    """
+    position = await challenge_service.get_leaderboard_position(
+        db, 
+        challenge_id=challenge_id,
+        user_id=user_id,
+        neighbors=neighbors
+    )
+    
+    return DataResponse(data=position)
+
 @router.get("/popular", response_model=DataResponse[List[Dict[str, Any]]])
 async def get_popular_challenges(
     limit: int = Query(10, ge=1, le=100),
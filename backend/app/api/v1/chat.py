@@ -5,7 +5,7 @@ from datetime import datetime
 import json
 
 from ...core.database import get_async_db
-from ...core.security import get_current_active_user
+from ...core.security import get_current_active_user, get_current_admin_user
 from ...core.chat import chat_manager
 from ...schemas.chat import (
     ChatMessageCreate, ChatMessagePublic, 
@@ -83,6 +83,23 @@ async def batch_delete_messages_admin(
     return DataResponse(message=f"成功删除 {deleted_count} 条消息")
 
 
+@router.post("/admin/messages/archive", response_model=DataResponse[Dict[str, int]])
+async def archive_messages_admin(
+    hot_days: Optional[int] = Query(None, ge=1, description="热表保留天数，默认使用系统配置"),
+    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db),
+    chat_service: ChatService = Depends(get_chat_service)
+):
+    """
+    管理员手动归档历史消息
+    """
+    archived_count = await chat_service.archive_old_messages(db, hot_days=hot_days)
+    return DataResponse(
+        data={"archived_count": archived_count},
+        message=f"成功归档 {archived_count} 条消息"
+    )
+
+
 @router.get("/admin/rooms", response_model=PaginatedResponse[ChatRoomPublic])
 async def get_all_rooms_admin(
     skip: int = Query(0, ge=0, description="跳过记录数"),
@@ -419,7 +436,7 @@ async def get_room_messages(
     )
     
     # 标记消息为已读
-    # 这里应该实现一个将聊天室中发给当前用户的消息标记为已读的方法
+    await chat_service.mark_room_as_read(db, room_id=room_id, user_id=current_user.id)
     
     # 获取总消息数
     total = await chat_service.message_repository.count_room_messages(db, room_id=room_id)
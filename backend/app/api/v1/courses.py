@@ -136,6 +136,7 @@ async def get_course(
     if course is None:
         raise NotFoundException("课程不存在")
     
+    course_service.record_view(course_id)
     return DataResponse(data=course)
 
 
@@ -276,15 +277,17 @@ async def enroll_course(
     if not course:
         raise HTTPException(status_code=404, detail="课程不存在")
     
-    # 检查是否已经报名（这里需要实现检查逻辑）
+    try:
+        enrollment = await course_service.enroll(db, course_id=course_id, user_id=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     enrollment_data = {
-        "user_id": current_user.id,
-        "course_id": course_id,
-        "enrolled_at": datetime.utcnow(),
+        "user_id": enrollment.user_id,
+        "course_id": enrollment.course_id,
+        "enrolled_at": enrollment.enrollment_date,
         "status": "active"
     }
-    
-    # 这里需要在service中添加报名管理的方法
     return DataResponse(
         data=enrollment_data,
         message="报名成功"
@@ -345,9 +348,8 @@ async def get_popular_courses(
     """
     获取热门课程
     """
-    # 按报名人数排序获取热门课程
-    # 暂时返回最近创建的课程
-    courses = await course_service.get_multi(db, skip=0, limit=limit)
+    # 按报名人数、浏览数排序获取热门课程
+    courses = await course_service.get_popular_courses(db, limit=limit)
     
     return DataResponse(data=courses, message="获取热门课程成功")
 
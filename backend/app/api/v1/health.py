@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, Query
+from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, Query, Request
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime, date
 
 from ...core.database import get_async_db
-from ...schemas.health import HealthRecordCreate, HealthRecordUpdate, HealthRecordPublic, HealthStatistics
+from ...schemas.health import (
+    HealthRecordCreate, HealthRecordUpdate, HealthRecordPublic, HealthStatistics,
+    HealthRecordBatch, HealthRecordBatchResult
+)
 from ...schemas.base import DataResponse, PaginatedResponse
 from ...services.health_service import HealthService
-from ...core.security import get_current_active_user
-from ...core.exceptions import BusinessException, NotFoundException, ValidationException
+from ...models.user import User
+from ...core.security import get_current_active_user, get_current_admin_user
+from ...core.exceptions import BusinessException, ForbiddenException, NotFoundException, ValidationException
 import asyncio
+import json
 import random
 
 router = APIRouter()
@@ -72,6 +78,59 @@ async def create_health_record(
     db_record = await health_service.create_record(db, obj_in=record)
     return DataResponse(data=db_record, message="健康记录创建成功")
 
+@router.post("/records/batch", response_model=DataResponse[HealthRecordBatchResult])
+async def create_health_records_batch(
+    request: Request,
+    user_id: Optional[int] = Query(None, description="用户ID，JSON Lines格式时使用"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+    health_service: HealthService = Depends()
+):
+    """
+    批量导入健康记录（可穿戴设备同步）
+    
+    支持两种请求体：
+    - application/json：列式结构，见HealthRecordBatch
+    - application/x-ndjson：每行一条读数，如{"recorded_at": "...", "heart_rate": 72}，
+      用户ID取自查询参数user_id，未提供时取第一行的user_id，都未提供时为当前用户
+    
+    普通用户只能导入自己的记录，管理员可为任意用户导入
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            columns = _rows_to_columns(body, user_id)
+            if columns["user_id"] is None:
+                columns["user_id"] = current_user.id
+            batch = HealthRecordBatch.model_validate(columns)
+        else:
+            batch = HealthRecordBatch.model_validate_json(body)
+    except (ValidationError, ValueError) as e:
+        raise ValidationException("批量数据格式无效", detail=str(e))
+    
+    if batch.user_id != current_user.id and not current_user.is_admin:
+        raise ForbiddenException("没有权限为其他用户导入健康记录")
+    
+    result = await health_service.create_records_batch(db, batch=batch)
+    return DataResponse(
+        data=result,
+        message=f"成功导入 {result.inserted} 条健康记录，拒绝 {result.rejected} 条"
+    )
+
+def _rows_to_columns(body: bytes, user_id: Optional[int]) -> dict:
+    """将JSON Lines格式的读数转换为列式结构"""
+    rows = [json.loads(line) for line in body.splitlines() if line.strip()]
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise ValueError(f"第{index + 1}条读数不是JSON对象")
+    if user_id is None and rows:
+        user_id = rows[0].get("user_id")
+    fields = ("recorded_at", "blood_pressure", "heart_rate", "blood_sugar", "weight", "height", "bmi")
+    columns = {field: [row.get(field) for row in rows] for field in fields}
+    columns["user_id"] = user_id
+    return columns
+
 @router.get("/{record_id}", response_model=DataResponse[HealthRecordPublic])
 async def get_health_record(
     record_id: int, 
@@ -156,6 +215,47 @@ async def get_monthly_summary(
     
     return DataResponse(data=summary)
 
+@router.get("/series/{user_id}", response_model=DataResponse[Dict[str, Any]])
+async def get_health_chart_series(
+    user_id: int,
+    start_date: Optional[datetime] = Query(None, description="开始时间"),
+    end_date: Optional[datetime] = Query(None, description="结束时间"),
+    points: int = Query(200, ge=3, le=2000, description="每个指标最多返回的点数"),
+    method: str = Query("bucket", pattern="^(bucket|lttb)$", description="降采样方式：bucket时间桶聚合，lttb保形选点"),
+    metrics: Optional[str] = Query(None, description="逗号分隔的指标，如weight,heart_rate，默认全部"),
+    db: AsyncSession = Depends(get_async_db),
+    health_service: HealthService = Depends()
+):
+    """
+    获取用于图表的降采样健康指标序列，点数与时间范围无关
+    """
+    series = await health_service.get_chart_series(
+        db,
+        user_id=user_id,
+        start_date=start_date,
+        end_date=end_date,
+        max_points=points,
+        method=method,
+        metrics=[m.strip() for m in metrics.split(",") if m.strip()] if metrics else None
+    )
+    return DataResponse(data=series)
+
+@router.post("/rollups/rebuild", response_model=DataResponse[Dict[str, int]])
+async def rebuild_health_rollups(
+    user_id: Optional[int] = Query(None, description="用户ID，不传则重建所有用户"),
+    db: AsyncSession = Depends(get_async_db),
+    health_service: HealthService = Depends(),
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    管理员根据原始记录重建健康日汇总数据
+    """
+    rebuilt_count = await health_service.rebuild_rollups(db, user_id=user_id)
+    return DataResponse(
+        data={"rebuilt_count": rebuilt_count},
+        message=f"成功重建 {rebuilt_count} 条日汇总数据"
+    )
+
 # WebSocket端点用于实时健康数据
 @router.websocket("/ws/{user_id}")
 async def health_data_websocket(websocket: WebSocket, user_id: int):
@@ -45,18 +45,32 @@ async def get_posts(
     is_public: Optional[bool] = Query(None, description="是否公开"),
     is_featured: Optional[bool] = Query(None, description="是否精选"),
     user_id: Optional[int] = Query(None, description="用户ID"),
+    sort: str = Query("latest", pattern="^(latest|hot)$", description="排序方式：latest精选优先按时间倒序，hot按热度"),
     db: AsyncSession = Depends(get_async_db),
     post_service: PostService = Depends(get_post_service)
 ):
     """
     获取动态列表
     """
-    posts = await post_service.get_posts_with_user(
-        db, skip, limit, post_type, user_role, is_public, is_featured, user_id
-    )
-    total = await post_service.get_total_count(
-        db, post_type, user_role, is_public, is_featured, user_id
-    )
+    if sort == "hot":
+        posts = await post_service.get_hot_posts(
+            db, skip, limit, post_type, user_role, is_public, is_featured, user_id
+        )
+        total = await post_service.get_total_count(
+            db, post_type, user_role, is_public, is_featured, user_id
+        )
+    elif user_id:
+        posts = await post_service.get_posts_with_user(
+            db, skip, limit, post_type, user_role, is_public, is_featured, user_id
+        )
+        total = await post_service.get_total_count(
+            db, post_type, user_role, is_public, is_featured, user_id
+        )
+    else:
+        # 按受众筛选的列表走物化时间线
+        posts, total = await post_service.get_feed(
+            db, skip, limit, post_type, user_role, is_public, is_featured
+        )
     
     return PaginatedResponse(
         data=[PostPublic.model_validate(post) for post in posts],
@@ -79,6 +93,7 @@ async def get_post(
     if not post:
         raise HTTPException(status_code=404, detail="动态不存在")
     
+    post_service.record_view(post_id)
     return DataResponse(data=post, message="获取成功")
 
 
@@ -178,7 +193,7 @@ async def delete_post(
     """
     删除动态
     """
-    success = await post_service.remove(db, id=post_id)
+    success = await post_service.delete(db, id=post_id)
     if not success:
         raise HTTPException(status_code=404, detail="动态不存在")
     
@@ -187,7 +202,7 @@ async def delete_post(
 
 # ===================== 动态评论管理 =====================
 
-@router.get("/posts/{post_id}/comments", response_model=DataResponse[List[PostCommentPublic]])
+@router.get("/posts/{post_id}/comments", response_model=DataResponse[List[PostCommentWithUser]])
 async def get_post_comments(
     post_id: int,
     skip: int = Query(0, ge=0, description="跳过记录数"),
@@ -196,9 +211,9 @@ async def get_post_comments(
     comment_service: PostCommentService = Depends(get_post_comment_service)
 ):
     """
-    获取动态评论列表
+    获取动态评论列表，回复嵌套在每条评论的replies中
     """
-    comments = await comment_service.get_comments_by_post(db, post_id, skip, limit)
+    comments = await comment_service.get_comment_tree(db, post_id, skip, limit)
     return DataResponse(data=comments, message="获取成功")
 
 
@@ -1,55 +1,53 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, Optional
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 
 from ...core.database import get_async_db
 from ...core.security import get_current_active_user, get_current_admin_user
+from ...core.snapshot import gather_in_sessions, stats_snapshots
 from ...schemas.base import DataResponse, PaginatedResponse
 from ...services.user_service import UserService
 from ...services.course_service import CourseService
 from ...services.challenge_service import ChallengeService
 from ...services.health_service import HealthService
 from ...services.social_service import SocialService
+from ...services.platform_counter_service import PlatformCounterService
 from ...models.user import User
+from ...models.platform import PlatformCounterKey
 from ...core.exceptions import ForbiddenException, NotFoundException
 
 router = APIRouter()
 
 @router.get("/dashboard", response_model=DataResponse[Dict[str, Any]])
 async def get_dashboard_stats(
-    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_admin_user),
-    user_service: UserService = Depends(),
     course_service: CourseService = Depends(),
-    challenge_service: ChallengeService = Depends(),
-    health_service: HealthService = Depends()
+    platform_counter_service: PlatformCounterService = Depends()
 ):
     """
     获取仪表盘统计数据 (仅管理员可访问)
-    """
-    # 使用各服务层的repository对象获取统计数据
-    total_users = await user_service.repository.count(db)
-    total_courses = await course_service.repository.count(db)
-    total_challenges = await challenge_service.repository.count(db)
-    total_health_records = await health_service.repository.count(db)
-    
-    # 获取活跃用户数
-    active_users = await user_service.repository.count(db, filters={"is_active": True})
-    
-    # 获取各难度级别的课程数量
-    course_by_difficulty = await course_service.get_course_count_by_difficulty(db)
     
-    # 构建统计数据
-    stats = {
-        "totalUsers": total_users,
-        "totalCourses": total_courses,
-        "totalChallenges": total_challenges,
-        "totalHealthRecords": total_health_records,
-        "activeUsers": active_users,
-        "coursesByDifficulty": course_by_difficulty
-    }
+    各项统计在独立会话中并发查询，结果缓存为快照
+    """
+    async def build() -> Dict[str, Any]:
+        results = await gather_in_sessions({
+            # 总数读取增量维护的平台计数
+            "counts": platform_counter_service.get_counts,
+            # 获取各难度级别的课程数量
+            "coursesByDifficulty": course_service.get_course_count_by_difficulty
+        })
+        counts = results["counts"]
+        return {
+            "totalUsers": counts[PlatformCounterKey.USERS],
+            "totalCourses": counts[PlatformCounterKey.COURSES],
+            "totalChallenges": counts[PlatformCounterKey.CHALLENGES],
+            "totalHealthRecords": counts[PlatformCounterKey.HEALTH_RECORDS],
+            "activeUsers": counts[PlatformCounterKey.ACTIVE_USERS],
+            "coursesByDifficulty": results["coursesByDifficulty"]
+        }
     
+    stats = await stats_snapshots.get("stats:dashboard", build)
     return DataResponse(data=stats)
 
 @router.get("/user/{user_id}", response_model=DataResponse[Dict[str, Any]])
@@ -91,91 +89,99 @@ async def get_user_stats(
 # 平台总体统计接口
 @router.get("/users", response_model=DataResponse[Dict[str, Any]])
 async def get_user_statistics(
-    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_admin_user),
-    user_service: UserService = Depends()
+    user_service: UserService = Depends(),
+    platform_counter_service: PlatformCounterService = Depends()
 ):
     """
     获取用户统计信息（仅管理员可访问）
     """
-    # 获取用户注册趋势（最近30天）
-    from datetime import timedelta
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    user_registration_trend = await user_service.get_registration_trend(db, start_date=thirty_days_ago)
-    
-    # 获取用户活跃度统计
-    user_activity_stats = await user_service.get_user_activity_stats(db)
-    
-    # 获取角色分布统计
-    user_role_distribution = await user_service.get_role_distribution(db)
-    
-    stats = {
-        "registrationTrend": user_registration_trend,
-        "activityStats": user_activity_stats,
-        "roleDistribution": user_role_distribution,
-        "totalUsers": await user_service.repository.count(db),
-        "activeUsers": await user_service.repository.count(db, filters={"is_active": True})
-    }
-    
+    async def build() -> Dict[str, Any]:
+        # 获取用户注册趋势（最近30天）
+        thirty_days_ago = datetime.now() - timedelta(days=30)
+        results = await gather_in_sessions({
+            "registrationTrend": lambda db: user_service.get_registration_trend(db, start_date=thirty_days_ago),
+            # 获取用户活跃度统计
+            "activityStats": user_service.get_user_activity_stats,
+            # 获取角色分布统计
+            "roleDistribution": user_service.get_role_distribution,
+            "counts": platform_counter_service.get_counts
+        })
+        counts = results.pop("counts")
+        results["totalUsers"] = counts[PlatformCounterKey.USERS]
+        results["activeUsers"] = counts[PlatformCounterKey.ACTIVE_USERS]
+        return results
+    
+    stats = await stats_snapshots.get("stats:users", build)
     return DataResponse(data=stats)
 
 @router.get("/courses", response_model=DataResponse[Dict[str, Any]])
 async def get_course_statistics(
-    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_admin_user),
-    course_service: CourseService = Depends()
+    course_service: CourseService = Depends(),
+    platform_counter_service: PlatformCounterService = Depends()
 ):
     """
     获取课程统计信息（仅管理员可访问）
     """
-    # 获取课程创建趋势
-    from datetime import timedelta
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    course_creation_trend = await course_service.get_creation_trend(db, start_date=thirty_days_ago)
-    
-    # 获取课程参与统计
-    course_participation_stats = await course_service.get_participation_stats(db)
-    
-    # 获取课程分类统计
-    course_category_stats = await course_service.get_category_stats(db)
-    
-    stats = {
-        "creationTrend": course_creation_trend,
-        "participationStats": course_participation_stats,
-        "categoryStats": course_category_stats,
-        "totalCourses": await course_service.repository.count(db),
-        "popularCourses": await course_service.get_popular_courses(db, limit=10)
-    }
-    
+    async def build() -> Dict[str, Any]:
+        # 获取课程创建趋势
+        thirty_days_ago = datetime.now() - timedelta(days=30)
+        results = await gather_in_sessions({
+            "creationTrend": lambda db: course_service.get_creation_trend(db, start_date=thirty_days_ago),
+            # 获取课程参与统计
+            "participationStats": course_service.get_participation_stats,
+            # 获取课程分类统计
+            "categoryStats": course_service.get_category_stats,
+            "counts": platform_counter_service.get_counts,
+            "popularCourses": lambda db: course_service.get_popular_courses(db, limit=10)
+        })
+        results["totalCourses"] = results.pop("counts")[PlatformCounterKey.COURSES]
+        return results
+    
+    stats = await stats_snapshots.get("stats:courses", build)
     return DataResponse(data=stats)
 
 @router.get("/challenges", response_model=DataResponse[Dict[str, Any]])
 async def get_challenge_statistics(
-    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_admin_user),
-    challenge_service: ChallengeService = Depends()
+    challenge_service: ChallengeService = Depends(),
+    platform_counter_service: PlatformCounterService = Depends()
 ):
     """
     获取挑战统计信息（仅管理员可访问）
     """
-    # 获取挑战参与统计
-    challenge_participation_stats = await challenge_service.get_participation_stats(db)
-    
-    # 获取挑战完成情况
-    completion_stats = await challenge_service.get_completion_stats(db)
-    
-    # 获取挑战类型分布
-    challenge_type_distribution = await challenge_service.get_type_distribution(db)
-    
-    stats = {
-        "participationStats": challenge_participation_stats,
-        "completionStats": completion_stats,
-        "typeDistribution": challenge_type_distribution,
-        "totalChallenges": await challenge_service.repository.count(db)
-    }
-    
+    async def build() -> Dict[str, Any]:
+        results = await gather_in_sessions({
+            # 获取挑战参与统计
+            "participationStats": challenge_service.get_participation_stats,
+            # 获取挑战完成情况
+            "completionStats": challenge_service.get_completion_stats,
+            # 获取挑战类型分布
+            "typeDistribution": challenge_service.get_type_distribution,
+            "counts": platform_counter_service.get_counts
+        })
+        results["totalChallenges"] = results.pop("counts")[PlatformCounterKey.CHALLENGES]
+        return results
+    
+    stats = await stats_snapshots.get("stats:challenges", build)
     return DataResponse(data=stats)
 
+@router.post("/counters/rebuild", response_model=DataResponse[Dict[str, int]])
+async def rebuild_platform_counters(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_admin_user),
+    platform_counter_service: PlatformCounterService = Depends()
+):
+    """
+    管理员按实际记录数重新计算平台计数
+    """
+    counts = await platform_counter_service.rebuild(db)
+    return DataResponse(
+        data={key.name.lower(): value for key, value in counts.items()},
+        message="平台计数已重建"
+    )
+
 @router.get("/user/{user_id}/activity", response_model=DataResponse[Dict[str, Any]])
 async def get_user_activity_statistics(
     user_id: int,
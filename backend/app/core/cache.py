@@ -0,0 +1,63 @@
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    进程内带过期时间的简单缓存
+
+    仅在当前工作进程内有效，适合缓存短时间内可容忍轻微过期的数据
+    """
+
+    def __init__(self, ttl: float, max_size: int = 10000):
+        """
+        初始化缓存
+
+        Args:
+            ttl: 过期时间（秒）
+            max_size: 最大条目数，超出时先清理过期条目，仍超出则淘汰最早写入的条目
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """获取缓存值，不存在或已过期返回None"""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """写入缓存值"""
+        if ttl is None:
+            ttl = self.ttl
+        if ttl <= 0:
+            return
+        if key not in self._data and len(self._data) >= self.max_size:
+            self._evict()
+        self._data[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key: Hashable) -> None:
+        """删除缓存值"""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._data.items() if expires_at < now]
+        for key in expired:
+            del self._data[key]
+        if len(self._data) >= self.max_size:
+            # dict保持插入顺序，第一个即最早写入的条目
+            del self._data[next(iter(self._data))]
@@ -18,6 +18,19 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-super-secret-key-here")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    USER_CACHE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "30"))  # 0表示不缓存
+    USER_CACHE_MAX_SIZE: int = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+    
+    # 密码哈希配置
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))  # 仅影响新生成的哈希
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    
+    # 登录限流配置（令牌桶）
+    LOGIN_USERNAME_BURST: int = int(os.getenv("LOGIN_USERNAME_BURST", "5"))
+    LOGIN_USERNAME_PER_MINUTE: float = float(os.getenv("LOGIN_USERNAME_PER_MINUTE", "5"))
+    LOGIN_IP_BURST: int = int(os.getenv("LOGIN_IP_BURST", "20"))
+    LOGIN_IP_PER_MINUTE: float = float(os.getenv("LOGIN_IP_PER_MINUTE", "20"))
+    RATE_LIMIT_REDIS_URL: Optional[str] = os.getenv("RATE_LIMIT_REDIS_URL")  # 为空时使用进程内存储
     
     # 跨域配置
     CORS_ORIGINS: List[str] = ["http://localhost:5173", "http://localhost:5174"]
@@ -30,6 +43,33 @@ class Settings(BaseSettings):
     MINICPM_V_API_URL: str = os.getenv("MINICPM_V_API_URL", "http://localhost:9000/v1")
     MINICPM_V_API_KEY: str = os.getenv("MINICPM_V_API_KEY", "dummy_key_for_development")
 
+    # 聊天消息归档配置
+    CHAT_HOT_DAYS: int = int(os.getenv("CHAT_HOT_DAYS", "90"))  # 热表保留最近多少天的消息
+    CHAT_ARCHIVE_BATCH_SIZE: int = int(os.getenv("CHAT_ARCHIVE_BATCH_SIZE", "5000"))
+    CHAT_ARCHIVE_INTERVAL_HOURS: int = int(os.getenv("CHAT_ARCHIVE_INTERVAL_HOURS", "24"))  # 0表示不自动归档
+
+    # 启动时检查模型声明的索引是否已创建
+    SCHEMA_INDEX_CHECK: bool = os.getenv("SCHEMA_INDEX_CHECK", "true").lower() == "true"
+
+    # 挑战排行榜配置（进程内缓存）
+    LEADERBOARD_REFRESH_SECONDS: int = int(os.getenv("LEADERBOARD_REFRESH_SECONDS", "300"))  # 重新从数据库加载的间隔，0表示不重新加载
+    LEADERBOARD_MAX_BOARDS: int = int(os.getenv("LEADERBOARD_MAX_BOARDS", "1000"))
+    
+    # 社区信息流配置（进程内物化时间线）
+    FEED_REFRESH_SECONDS: int = int(os.getenv("FEED_REFRESH_SECONDS", "300"))  # 重新从数据库加载的间隔，0表示不重新加载
+    FEED_MAX_TIMELINES: int = int(os.getenv("FEED_MAX_TIMELINES", "200"))
+    POST_HOT_SCORE_DECAY_SECONDS: int = int(os.getenv("POST_HOT_SCORE_DECAY_SECONDS", "45000"))  # 晚发布多少秒相当于互动量多10倍
+    
+    # 点赞数、浏览数、报名人数等计数的写回间隔（秒）
+    COUNTER_FLUSH_INTERVAL_SECONDS: int = int(os.getenv("COUNTER_FLUSH_INTERVAL_SECONDS", "5"))
+
+    # 管理统计快照配置
+    STATS_SNAPSHOT_TTL_SECONDS: int = int(os.getenv("STATS_SNAPSHOT_TTL_SECONDS", "60"))  # 快照缓存时间，0表示不缓存
+    STATS_QUERY_CONCURRENCY: int = int(os.getenv("STATS_QUERY_CONCURRENCY", "4"))  # 每个快照同时占用的连接数上限
+
+    # 健康数据批量导入配置
+    HEALTH_BATCH_MAX_SIZE: int = int(os.getenv("HEALTH_BATCH_MAX_SIZE", "20000"))  # 单次请求最多记录数
+
     class Config:
         case_sensitive = True
 
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import bindparam, case, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+class CounterAggregator:
+    """
+    写回式计数器
+
+    点赞数、浏览数、报名人数等高频计数先在内存中合并，由后台任务定期把每行的合并增量
+    用一条批量UPDATE写回数据库，热点行在一个刷新周期内只被更新一次。
+    进程异常退出时会丢失尚未写回的增量
+    """
+
+    def __init__(self):
+        self._pending: Dict[InstrumentedAttribute, Dict[int, int]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_hooks: Dict[InstrumentedAttribute, List[Callable[[AsyncSession, List[int]], Awaitable[None]]]] = {}
+
+    def add_flush_hook(
+        self,
+        column: InstrumentedAttribute,
+        hook: Callable[[AsyncSession, List[int]], Awaitable[None]]
+    ) -> None:
+        """
+        注册计数列写回后的回调，在同一事务中以写回的行ID列表调用，用于刷新依赖该计数的派生列
+
+        Args:
+            column: 计数列
+            hook: 接收(数据库会话, 行ID列表)的异步函数
+        """
+        self._flush_hooks.setdefault(column, []).append(hook)
+
+    def increment(self, column: InstrumentedAttribute, row_id: int, delta: int = 1) -> None:
+        """
+        累加计数增量，等待下次刷新时写回
+
+        Args:
+            column: 计数列，如Post.likes_count
+            row_id: 行ID
+            delta: 增量，可为负数
+        """
+        if not delta:
+            return
+        counts = self._pending.setdefault(column, {})
+        counts[row_id] = counts.get(row_id, 0) + delta
+
+    def pending_count(self) -> int:
+        """待写回的(计数列, 行)数量"""
+        return sum(len(counts) for counts in self._pending.values())
+
+    async def flush(self) -> int:
+        """
+        把合并后的增量写回数据库，失败时增量放回队列等待下次重试
+
+        Returns:
+            写回的(计数列, 行)数量
+        """
+        from .database import AsyncSessionLocal  # 避免循环导入
+
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            batches = {
+                column: [{"row_id": row_id, "delta": delta} for row_id, delta in counts.items() if delta]
+                for column, counts in pending.items()
+            }
+            batches = {column: params for column, params in batches.items() if params}
+            if not batches:
+                return 0
+
+            committed = False
+            try:
+                async with AsyncSessionLocal() as db:
+                    for column, params in batches.items():
+                        table = column.class_.__table__
+                        target = table.c[column.key]
+                        # 减少后不低于0
+                        new_value = func.coalesce(target, 0) + bindparam("delta")
+                        stmt = (
+                            update(table)
+                            .where(table.c.id == bindparam("row_id"))
+                            .values({target.name: case((new_value < 0, 0), else_=new_value)})
+                        )
+                        await db.execute(stmt, params)
+                        for hook in self._flush_hooks.get(column, ()):
+                            await hook(db, [param["row_id"] for param in params])
+                    await db.commit()
+                    committed = True
+            except BaseException:
+                # 任务被取消时同样放回，已提交的增量不再重复放回
+                if committed:
+                    raise
+                for column, params in batches.items():
+                    for param in params:
+                        self.increment(column, param["row_id"], param["delta"])
+                raise
+
+            return sum(len(params) for params in batches.values())
+
+
+counter_aggregator = CounterAggregator()
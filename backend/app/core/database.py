@@ -1,4 +1,8 @@
-from sqlalchemy import create_engine
+import zlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Tuple
+
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
@@ -90,6 +94,75 @@ async def initialize_db():
         await conn.run_sync(Base.metadata.create_all)
     logger.info("Database tables created")
     
+# 检查模型声明的索引是否已在数据库中创建
+async def check_declared_indexes() -> List[Tuple[str, str]]:
+    """
+    比较模型中声明的索引与数据库中实际存在的索引
+    
+    线上库的表结构由迁移维护，模型新增索引而忘记迁移时在启动日志中给出告警。
+    若实际存在列顺序以声明列开头的索引或唯一约束，即视为已覆盖
+    
+    Returns:
+        缺失的索引列表，元素为(表名, 索引名)
+    """
+    from ..models import Base as ModelBase  # 避免循环导入
+    
+    def collect_missing(sync_conn) -> List[Tuple[str, str]]:
+        inspector = inspect(sync_conn)
+        existing_tables = set(inspector.get_table_names())
+        missing = []
+        for table in ModelBase.metadata.sorted_tables:
+            if table.name not in existing_tables or not table.indexes:
+                continue
+            live = [tuple(index["column_names"]) for index in inspector.get_indexes(table.name)]
+            live += [tuple(unique["column_names"]) for unique in inspector.get_unique_constraints(table.name)]
+            live.append(tuple(inspector.get_pk_constraint(table.name).get("constrained_columns") or ()))
+            for index in table.indexes:
+                declared = tuple(column.name for column in index.columns)
+                if not any(columns[:len(declared)] == declared for columns in live):
+                    missing.append((table.name, index.name))
+        return missing
+    
+    async with async_engine.connect() as conn:
+        missing = await conn.run_sync(collect_missing)
+    for table_name, index_name in missing:
+        logger.warning(f"Index {index_name} declared on {table_name} is missing in the database, run alembic upgrade head")
+    return missing
+    
+# 多个工作进程间的互斥
+@asynccontextmanager
+async def advisory_lock(name: str) -> AsyncIterator[bool]:
+    """
+    尝试获取数据库级的命名锁（不等待），用于多个工作进程中只让一个执行定时任务
+    
+    MySQL/MariaDB使用GET_LOCK，PostgreSQL使用pg_try_advisory_lock，锁随持有连接释放；
+    其他数据库（如单进程的SQLite）视为总能获取
+    
+    Args:
+        name: 锁名称
+    
+    Yields:
+        是否获取到锁
+    """
+    dialect = async_engine.dialect.name
+    if dialect not in ("mysql", "postgresql"):
+        yield True
+        return
+    
+    async with async_engine.connect() as conn:
+        if dialect == "mysql":
+            acquired = (await conn.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": name})).scalar() == 1
+            release = text("SELECT RELEASE_LOCK(:name)"), {"name": name}
+        else:
+            key = zlib.crc32(name.encode())
+            acquired = bool((await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})).scalar())
+            release = text("SELECT pg_advisory_unlock(:key)"), {"key": key}
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await conn.execute(*release)
+    
 # 关闭数据库连接
 async def close_db_connection():
     """
@@ -0,0 +1,91 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+
+def bucket_aggregate(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    max_points: int,
+    start: Optional[float] = None,
+    end: Optional[float] = None
+) -> Dict[str, np.ndarray]:
+    """
+    将时间序列按等宽时间桶聚合，每个非空桶输出一个点
+
+    Args:
+        timestamps: 按时间升序排列的时间戳数组（秒）
+        values: 与时间戳对应的数值数组，NaN表示缺失
+        max_points: 最多输出的点数（时间桶个数）
+        start: 时间范围起点，缺省取第一个数据点
+        end: 时间范围终点，缺省取最后一个数据点
+
+    Returns:
+        包含timestamp（桶内平均时间）、avg、min、max、count数组的字典
+    """
+    mask = ~np.isnan(values)
+    t = timestamps[mask]
+    y = values[mask]
+    if t.size == 0:
+        empty = np.empty(0)
+        return {"timestamp": empty, "avg": empty, "min": empty, "max": empty, "count": empty}
+
+    start = t[0] if start is None else start
+    end = t[-1] if end is None else end
+    width = max(end - start, 1.0) / max_points
+    buckets = np.clip(((t - start) // width).astype(np.int64), 0, max_points - 1)
+
+    # 数据按时间有序，同一个桶内的点是连续的，可以用reduceat分段聚合
+    boundaries = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    counts = np.diff(np.append(boundaries, t.size))
+    return {
+        "timestamp": np.add.reduceat(t, boundaries) / counts,
+        "avg": np.add.reduceat(y, boundaries) / counts,
+        "min": np.minimum.reduceat(y, boundaries),
+        "max": np.maximum.reduceat(y, boundaries),
+        "count": counts
+    }
+
+
+def lttb(timestamps: np.ndarray, values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets降采样，保留曲线的视觉形状
+
+    Args:
+        timestamps: 按时间升序排列的时间戳数组（秒），不含缺失值
+        values: 与时间戳对应的数值数组，不含缺失值
+        max_points: 最多输出的点数，至少为3
+
+    Returns:
+        被选中的数据点下标数组（升序）
+    """
+    n = values.size
+    if max_points >= n:
+        return np.arange(n)
+    if max_points < 3:
+        raise ValueError("max_points must be at least 3")
+
+    # 首尾两点固定保留，中间的点均分到max_points-2个桶中
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 下一个桶的平均点作为三角形的第三个顶点
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < edges.size else n
+        avg_t = timestamps[next_lo:next_hi].mean()
+        avg_y = values[next_lo:next_hi].mean()
+
+        bucket_t = timestamps[lo:hi]
+        bucket_y = values[lo:hi]
+        areas = np.abs(
+            (timestamps[previous] - avg_t) * (bucket_y - values[previous])
+            - (timestamps[previous] - bucket_t) * (avg_y - values[previous])
+        )
+        previous = lo + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    return selected
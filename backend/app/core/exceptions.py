@@ -42,6 +42,13 @@ class ForbiddenException(BusinessException):
         super().__init__(message, code=403)
 
 
+class TooManyRequestsException(BusinessException):
+    """请求过于频繁异常"""
+    def __init__(self, message: str = "请求过于频繁，请稍后再试", retry_after: int = 60):
+        self.retry_after = retry_after
+        super().__init__(message, code=429)
+
+
 # 异常处理器
 async def business_exception_handler(request: Request, exc: BusinessException) -> JSONResponse:
     """业务异常处理器"""
@@ -0,0 +1,196 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+from .config import settings
+
+
+class FeedEntry(NamedTuple):
+    """动态在信息流中的排序和筛选属性"""
+    post_id: int
+    is_featured: bool
+    created_at: float  # 时间戳（秒）
+    post_type: str
+    user_role: Optional[str]
+    is_public: bool
+
+
+class FeedFilter(NamedTuple):
+    """信息流的受众条件，None表示不限"""
+    post_type: Optional[str] = None
+    user_role: Optional[str] = None
+    is_public: Optional[bool] = None
+    is_featured: Optional[bool] = None
+
+    def matches(self, entry: FeedEntry) -> bool:
+        return (
+            (self.post_type is None or entry.post_type == self.post_type)
+            and (self.user_role is None or entry.user_role == self.user_role)
+            and (self.is_public is None or entry.is_public == self.is_public)
+            and (self.is_featured is None or entry.is_featured == self.is_featured)
+        )
+
+
+class FeedTimeline:
+    """
+    单个受众的动态时间线
+
+    按精选在前、创建时间倒序排列的动态ID列表，增删为O(log n)，分页为O(log n + limit)
+    """
+
+    def __init__(self, entries: Iterable[FeedEntry] = ()):
+        self._keys: Dict[int, Tuple[bool, float, int]] = {}
+        self._ranking = SortedList()
+        for entry in entries:
+            self._keys[entry.post_id] = self._key(entry)
+        self._ranking.update(self._keys.values())
+
+    @staticmethod
+    def _key(entry: FeedEntry) -> Tuple[bool, float, int]:
+        return (not entry.is_featured, -entry.created_at, -entry.post_id)
+
+    def __len__(self) -> int:
+        return len(self._ranking)
+
+    def upsert(self, entry: FeedEntry) -> None:
+        """加入或更新动态的排序位置"""
+        self.remove(entry.post_id)
+        key = self._key(entry)
+        self._keys[entry.post_id] = key
+        self._ranking.add(key)
+
+    def remove(self, post_id: int) -> None:
+        """从时间线中移除动态"""
+        key = self._keys.pop(post_id, None)
+        if key is not None:
+            self._ranking.remove(key)
+
+    def page(self, skip: int, limit: int) -> List[int]:
+        """获取一页动态ID"""
+        return [-key[2] for key in self._ranking.islice(skip, skip + limit)]
+
+
+class FeedRegistry:
+    """
+    进程内的信息流物化视图
+
+    所有动态的排序和筛选属性在首次查询时从数据库加载一次，各受众（全部、精选、按角色、
+    按类型及其组合）的时间线在首次查询该受众时由内存数据构建，之后随发布、精选、可见性变更增量维护。
+    多个工作进程各自维护，超过刷新间隔后重新加载以收敛其他进程的变更
+    """
+
+    def __init__(self, refresh_seconds: float = 300, max_timelines: int = 200):
+        """
+        初始化信息流
+
+        Args:
+            refresh_seconds: 重新从数据库加载的间隔（秒），0表示不重新加载
+            max_timelines: 最多缓存的受众时间线数量
+        """
+        self.refresh_seconds = refresh_seconds
+        self.max_timelines = max_timelines
+        self._entries: Optional[Dict[int, FeedEntry]] = None
+        self._timelines: Dict[FeedFilter, FeedTimeline] = {}
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._changed_while_loading: Optional[bool] = None  # 加载期间是否有变更，未在加载时为None
+
+    def _is_fresh(self) -> bool:
+        if self._entries is None:
+            return False
+        return not self.refresh_seconds or time.monotonic() - self._loaded_at < self.refresh_seconds
+
+    async def _ensure_loaded(self, loader: Callable[[], Awaitable[List[FeedEntry]]]) -> Dict[int, FeedEntry]:
+        if self._is_fresh():
+            return self._entries
+
+        async with self._lock:
+            if self._is_fresh():
+                return self._entries
+
+            self._changed_while_loading = False
+            try:
+                entries = {entry.post_id: entry for entry in await loader()}
+            finally:
+                changed_while_loading = self._changed_while_loading
+                self._changed_while_loading = None
+
+            # 加载期间有变更时，无法确定查询结果是否已包含该变更，本次结果不缓存
+            if not changed_while_loading:
+                self._entries = entries
+                self._timelines = {}
+                self._loaded_at = time.monotonic()
+            return entries
+
+    async def page(
+        self,
+        feed_filter: FeedFilter,
+        skip: int,
+        limit: int,
+        loader: Callable[[], Awaitable[List[FeedEntry]]]
+    ) -> Tuple[List[int], int]:
+        """
+        获取受众时间线的一页动态ID
+
+        Args:
+            feed_filter: 受众条件
+            skip: 跳过的记录数
+            limit: 返回的最大记录数
+            loader: 返回所有动态FeedEntry列表的异步函数
+
+        Returns:
+            (动态ID列表, 该受众的动态总数)
+        """
+        entries = await self._ensure_loaded(loader)
+        timeline = self._timelines.get(feed_filter) if entries is self._entries else None
+        if timeline is None:
+            timeline = FeedTimeline(entry for entry in entries.values() if feed_filter.matches(entry))
+            if entries is self._entries:
+                if len(self._timelines) >= self.max_timelines:
+                    # 淘汰最早构建的时间线
+                    self._timelines.pop(next(iter(self._timelines)))
+                self._timelines[feed_filter] = timeline
+        return timeline.page(skip, limit), len(timeline)
+
+    def upsert(self, entry: FeedEntry) -> None:
+        """
+        发布或修改动态后更新所有受众时间线，信息流未加载时忽略（下次查询时从数据库加载）
+
+        Args:
+            entry: 动态的最新属性
+        """
+        if self._changed_while_loading is not None:
+            self._changed_while_loading = True
+        if self._entries is None:
+            return
+        self._entries[entry.post_id] = entry
+        for feed_filter, timeline in self._timelines.items():
+            if feed_filter.matches(entry):
+                timeline.upsert(entry)
+            else:
+                timeline.remove(entry.post_id)
+
+    def remove(self, post_id: int) -> None:
+        """删除动态后从所有受众时间线中移除"""
+        if self._changed_while_loading is not None:
+            self._changed_while_loading = True
+        if self._entries is None:
+            return
+        self._entries.pop(post_id, None)
+        for timeline in self._timelines.values():
+            timeline.remove(post_id)
+
+    def invalidate(self) -> None:
+        """丢弃信息流，下次查询时重新加载"""
+        if self._changed_while_loading is not None:
+            self._changed_while_loading = True
+        self._entries = None
+        self._timelines = {}
+
+
+feed_registry = FeedRegistry(
+    refresh_seconds=settings.FEED_REFRESH_SECONDS,
+    max_timelines=settings.FEED_MAX_TIMELINES
+)
@@ -0,0 +1,36 @@
+import math
+from datetime import datetime
+from typing import Optional
+
+from .config import settings
+
+# 热度分的时间起点，使分值保持在较小范围
+HOT_SCORE_EPOCH = datetime(2024, 1, 1)
+# 评论比点赞更能代表互动，按双倍计
+COMMENT_WEIGHT = 2
+
+
+def hot_score(likes_count: Optional[int], comments_count: Optional[int], created_at: Optional[datetime]) -> float:
+    """
+    计算动态的热度分
+
+    热度分 = log10(互动量) + 发布时间 / 衰减时长。发布越晚分越高，每晚发布一个衰减时长
+    相当于互动量多10倍，等价于按发布时长衰减的热度排名；分值只随互动量变化，
+    不需要随时间重算，可以直接建索引取前K条
+
+    Args:
+        likes_count: 点赞数
+        comments_count: 评论数
+        created_at: 发布时间（UTC）
+
+    Returns:
+        热度分
+    """
+    engagement = (likes_count or 0) + COMMENT_WEIGHT * (comments_count or 0)
+    order = math.log10(max(engagement, 1))
+    if created_at is None:
+        created_at = datetime.utcnow()
+    if created_at.tzinfo is not None:
+        created_at = created_at.replace(tzinfo=None)
+    age = (created_at - HOT_SCORE_EPOCH).total_seconds()
+    return round(order + age / settings.POST_HOT_SCORE_DECAY_SECONDS, 7)
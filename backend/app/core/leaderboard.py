@@ -0,0 +1,182 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+from .config import settings
+
+# (用户ID, 总积分, 打卡次数)
+LeaderboardEntry = Tuple[int, int, int]
+
+
+class ChallengeLeaderboard:
+    """
+    单个挑战的排行榜
+
+    按总积分降序、打卡次数降序、用户ID升序排列，增删均为O(log n)，
+    支持按名次取前K名和查询指定用户的名次
+    """
+
+    def __init__(self, entries: Iterable[LeaderboardEntry] = ()):
+        self._scores: Dict[int, Tuple[int, int]] = {}
+        self._ranking = SortedList()
+        for user_id, total_points, check_in_count in entries:
+            self._scores[user_id] = (total_points, check_in_count)
+        self._ranking.update(self._key(user_id) for user_id in self._scores)
+        self.seeded_at = time.monotonic()
+
+    def _key(self, user_id: int) -> Tuple[int, int, int]:
+        total_points, check_in_count = self._scores[user_id]
+        return (-total_points, -check_in_count, user_id)
+
+    def __len__(self) -> int:
+        return len(self._ranking)
+
+    def add(self, user_id: int, *, points: int, check_ins: int = 1) -> None:
+        """
+        累加用户的积分和打卡次数
+
+        Args:
+            user_id: 用户ID
+            points: 增加的积分
+            check_ins: 增加的打卡次数
+        """
+        total_points, check_in_count = self._scores.get(user_id, (0, 0))
+        if user_id in self._scores:
+            self._ranking.remove(self._key(user_id))
+        self._scores[user_id] = (total_points + points, check_in_count + check_ins)
+        self._ranking.add(self._key(user_id))
+
+    def remove(self, user_id: int) -> None:
+        """从排行榜中移除用户"""
+        if user_id in self._scores:
+            self._ranking.remove(self._key(user_id))
+            del self._scores[user_id]
+
+    def _entry(self, key: Tuple[int, int, int]) -> LeaderboardEntry:
+        return (key[2], -key[0], -key[1])
+
+    def top(self, limit: int) -> List[LeaderboardEntry]:
+        """获取前limit名"""
+        return [self._entry(key) for key in self._ranking.islice(0, limit)]
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """获取用户名次（从1开始），未上榜返回None"""
+        if user_id not in self._scores:
+            return None
+        return self._ranking.index(self._key(user_id)) + 1
+
+    def around(self, user_id: int, neighbors: int) -> Tuple[Optional[int], List[LeaderboardEntry]]:
+        """
+        获取用户名次及其前后各neighbors名，O(log n + neighbors)
+
+        Args:
+            user_id: 用户ID
+            neighbors: 前后各取的人数
+
+        Returns:
+            (用户名次, 从第max(名次-neighbors, 1)名开始的条目列表)，未上榜返回(None, [])
+        """
+        rank = self.rank(user_id)
+        if rank is None:
+            return None, []
+        start = max(rank - 1 - neighbors, 0)
+        return rank, [self._entry(key) for key in self._ranking.islice(start, rank + neighbors)]
+
+
+class LeaderboardRegistry:
+    """
+    进程内的挑战排行榜集合
+
+    每个挑战的排行榜在首次查询时从数据库加载一次，之后随打卡增量更新。
+    多个工作进程各自维护排行榜，超过刷新间隔后重新加载以收敛其他进程的打卡
+    """
+
+    def __init__(self, refresh_seconds: float = 300, max_boards: int = 1000):
+        """
+        初始化排行榜集合
+
+        Args:
+            refresh_seconds: 排行榜重新从数据库加载的间隔（秒），0表示不重新加载
+            max_boards: 最多缓存的挑战排行榜数量
+        """
+        self.refresh_seconds = refresh_seconds
+        self.max_boards = max_boards
+        self._boards: Dict[int, ChallengeLeaderboard] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._loading: Dict[int, bool] = {}  # 挑战ID -> 加载期间是否有新的打卡
+
+    def _is_fresh(self, board: ChallengeLeaderboard) -> bool:
+        return not self.refresh_seconds or time.monotonic() - board.seeded_at < self.refresh_seconds
+
+    async def get(
+        self,
+        challenge_id: int,
+        loader: Callable[[], Awaitable[List[LeaderboardEntry]]]
+    ) -> ChallengeLeaderboard:
+        """
+        获取挑战排行榜，未加载或已过期时调用loader从数据库加载
+
+        Args:
+            challenge_id: 挑战ID
+            loader: 返回(用户ID, 总积分, 打卡次数)列表的异步函数
+
+        Returns:
+            挑战排行榜
+        """
+        board = self._boards.get(challenge_id)
+        if board is not None and self._is_fresh(board):
+            return board
+
+        lock = self._locks.setdefault(challenge_id, asyncio.Lock())
+        async with lock:
+            board = self._boards.get(challenge_id)
+            if board is not None and self._is_fresh(board):
+                return board
+
+            self._loading[challenge_id] = False
+            try:
+                board = ChallengeLeaderboard(await loader())
+            finally:
+                changed_while_loading = self._loading.pop(challenge_id)
+
+            # 加载期间有打卡时，无法确定查询结果是否已包含该打卡，本次结果不缓存
+            if not changed_while_loading:
+                if challenge_id not in self._boards and len(self._boards) >= self.max_boards:
+                    self._evict()
+                self._boards[challenge_id] = board
+            return board
+
+    def record_check_in(self, challenge_id: int, user_id: int, points: int) -> None:
+        """
+        记录一次完成的打卡，排行榜未加载时忽略（下次查询时从数据库加载）
+
+        Args:
+            challenge_id: 挑战ID
+            user_id: 用户ID
+            points: 本次获得的积分
+        """
+        if challenge_id in self._loading:
+            self._loading[challenge_id] = True
+        board = self._boards.get(challenge_id)
+        if board is not None:
+            board.add(user_id, points=points)
+
+    def invalidate(self, challenge_id: int) -> None:
+        """丢弃挑战排行榜，下次查询时重新加载"""
+        self._boards.pop(challenge_id, None)
+        if challenge_id in self._loading:
+            self._loading[challenge_id] = True
+
+    def _evict(self) -> None:
+        # 淘汰最早加载的排行榜
+        oldest = min(self._boards, key=lambda challenge_id: self._boards[challenge_id].seeded_at)
+        del self._boards[oldest]
+        self._locks.pop(oldest, None)
+
+
+leaderboard_registry = LeaderboardRegistry(
+    refresh_seconds=settings.LEADERBOARD_REFRESH_SECONDS,
+    max_boards=settings.LEADERBOARD_MAX_BOARDS
+)
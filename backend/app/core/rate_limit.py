@@ -0,0 +1,183 @@
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBucketStore:
+    """
+    进程内令牌桶存储
+
+    多个工作进程之间不共享，每个进程各自限流
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        # key -> (tokens, updated_at, capacity, rate)，同一存储被多个限流器共用，清理时按各桶自身的参数判断
+        self._buckets: Dict[str, Tuple[float, float, float, float]] = {}
+
+    async def take(self, key: str, capacity: float, rate: float) -> Tuple[bool, float]:
+        """
+        从令牌桶中取一个令牌
+
+        Args:
+            key: 桶标识
+            capacity: 桶容量（允许的突发次数）
+            rate: 每秒补充的令牌数
+
+        Returns:
+            (是否允许, 剩余令牌数)
+        """
+        now = time.monotonic()
+        tokens, updated_at, _, _ = self._buckets.get(key, (capacity, now, capacity, rate))
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        if key not in self._buckets and len(self._buckets) >= self.max_keys:
+            self._prune(now)
+        self._buckets[key] = (tokens, now, capacity, rate)
+        return allowed, tokens
+
+    def _prune(self, now: float) -> None:
+        # 已补满的桶与不存在的桶等价，可以直接丢弃
+        full = [
+            key for key, (tokens, updated_at, capacity, rate) in self._buckets.items()
+            if tokens + (now - updated_at) * rate >= capacity
+        ]
+        for key in full:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_keys:
+            del self._buckets[next(iter(self._buckets))]
+
+
+class RedisBucketStore:
+    """
+    基于Redis的共享令牌桶存储，多个工作进程共用同一份限流状态
+
+    Redis不可用时放行请求，避免限流组件故障导致无法登录
+    """
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis.asyncio as redis  # 仅在配置了共享存储时才需要redis
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    async def take(self, key: str, capacity: float, rate: float) -> Tuple[bool, float]:
+        try:
+            allowed, tokens = await self._script(
+                keys=[self.prefix + key],
+                args=[capacity, rate, time.time()]
+            )
+            return bool(int(allowed)), float(tokens)
+        except Exception as e:
+            logger.warning(f"Rate limit backend unavailable, allowing request: {e}")
+            return True, capacity
+
+
+class TokenBucketLimiter:
+    """
+    令牌桶限流器
+    """
+
+    def __init__(self, name: str, capacity: int, per_minute: float, store):
+        """
+        初始化限流器
+
+        Args:
+            name: 限流器名称，作为桶标识前缀
+            capacity: 桶容量（允许的突发次数）
+            per_minute: 每分钟补充的令牌数
+            store: 令牌桶存储
+        """
+        self.name = name
+        self.capacity = capacity
+        self.rate = per_minute / 60.0
+        self.store = store
+
+    async def hit(self, key: str) -> Tuple[bool, int]:
+        """
+        记录一次请求
+
+        Args:
+            key: 限流对象（用户名、IP等）
+
+        Returns:
+            (是否允许, 建议重试等待秒数)
+        """
+        allowed, tokens = await self.store.take(f"{self.name}:{key}", self.capacity, self.rate)
+        if allowed:
+            return True, 0
+        return False, max(int((1 - tokens) / self.rate) + 1, 1)
+
+
+def create_bucket_store():
+    """根据配置创建令牌桶存储，配置了RATE_LIMIT_REDIS_URL时使用Redis共享存储"""
+    if settings.RATE_LIMIT_REDIS_URL:
+        try:
+            return RedisBucketStore(settings.RATE_LIMIT_REDIS_URL)
+        except ImportError:
+            logger.warning("redis is not installed, falling back to in-memory rate limiting")
+    return MemoryBucketStore()
+
+
+_login_store = create_bucket_store()
+
+# 登录限流：同时按用户名和客户端IP限流
+login_username_limiter = TokenBucketLimiter(
+    "login:user",
+    capacity=settings.LOGIN_USERNAME_BURST,
+    per_minute=settings.LOGIN_USERNAME_PER_MINUTE,
+    store=_login_store
+)
+login_ip_limiter = TokenBucketLimiter(
+    "login:ip",
+    capacity=settings.LOGIN_IP_BURST,
+    per_minute=settings.LOGIN_IP_PER_MINUTE,
+    store=_login_store
+)
+
+
+async def check_login_rate(username: str, client_ip: Optional[str] = None) -> Tuple[bool, int]:
+    """
+    检查登录请求是否超出限流
+
+    先检查IP，IP被拒绝时不再消耗该用户名的令牌
+
+    Args:
+        username: 登录用户名
+        client_ip: 客户端IP
+
+    Returns:
+        (是否允许, 建议重试等待秒数)
+    """
+    if client_ip:
+        allowed, retry_after = await login_ip_limiter.hit(client_ip)
+        if not allowed:
+            return False, retry_after
+    return await login_username_limiter.hit(username.strip().lower())
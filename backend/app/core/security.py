@@ -1,18 +1,85 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 from datetime import datetime, timedelta
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Union, Dict, Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
 
 from ..core.database import get_async_db
 from ..models.user import User, UserRole
 from .config import settings
+from .cache import TTLCache
 from passlib.context import CryptContext
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+class PasswordHasher:
+    """
+    在独立的有界线程池中执行bcrypt哈希与校验
+    
+    bcrypt每次计算需要数十毫秒CPU时间，直接在事件循环中执行会阻塞同一进程内的所有请求和WebSocket
+    """
+    
+    def __init__(self, workers: int, rounds: int):
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0    # 已提交尚未完成的任务数（仅在事件循环线程中修改）
+        self._running = 0    # 正在工作线程中执行的任务数
+        self._completed = 0
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(self.context.verify, plain_password, hashed_password)
+    
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.context.hash, password)
+    
+    def stats(self) -> Dict[str, int]:
+        """线程池运行指标，queued即排队等待工作线程的任务数"""
+        running = self._running
+        return {
+            "workers": self.workers,
+            "in_flight": self._pending,
+            "running": running,
+            "queued": max(self._pending - running, 0),
+            "completed": self._completed
+        }
+    
+    async def _submit(self, func: Callable, *args):
+        loop = asyncio.get_running_loop()
+        self._pending += 1
+        try:
+            return await loop.run_in_executor(self._executor, self._run, func, *args)
+        finally:
+            self._pending -= 1
+            self._completed += 1
+    
+    def _run(self, func: Callable, *args):
+        with self._lock:
+            self._running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+password_hasher = PasswordHasher(workers=settings.PASSWORD_HASH_WORKERS, rounds=settings.BCRYPT_ROUNDS)
+
+pwd_context = password_hasher.context
+
+# 已认证用户缓存: user_id -> (token_version, 用户列值字典)，避免每个请求都查询users表。
+# 缓存的是普通字典而非ORM实例，每个请求各自构造实例并关联到本请求的会话，互不影响
+user_cache = TTLCache(ttl=settings.USER_CACHE_TTL_SECONDS, max_size=settings.USER_CACHE_MAX_SIZE)
+
+def invalidate_cached_user(user_id: int) -> None:
+    """用户资料、状态或密码变更后清除其缓存"""
+    user_cache.delete(user_id)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -20,6 +87,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """在密码哈希线程池中校验密码，供异步代码使用"""
+    return await password_hasher.verify(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """在密码哈希线程池中计算密码哈希，供异步代码使用"""
+    return await password_hasher.hash(password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -41,18 +116,29 @@ async def get_current_user(
     )
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: int = payload.get("sub")
+        user_id = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-        token_data = {"sub": user_id}
-    except JWTError:
+        user_id = int(user_id)
+        token_version = int(payload.get("ver", 0))
+    except (JWTError, ValueError):
         raise credentials_exception
     
+    cached = user_cache.get(user_id)
+    if cached is not None and cached[0] == token_version:
+        user = User(**cached[1])
+        make_transient_to_detached(user)
+        # load=False不查询数据库，直接作为本会话中的持久化对象使用
+        return await db.merge(user, load=False)
+    
     from ..services import user_service  # 避免循环导入
     
     user = await user_service.get(db, user_id)
-    if user is None:
+    if user is None or (user.token_version or 0) != token_version:
         raise credentials_exception
+    
+    snapshot = {attr.key: getattr(user, attr.key) for attr in sa_inspect(User).column_attrs}
+    user_cache.set(user_id, (token_version, snapshot))
     return user
 
 async def get_current_active_user(
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+
+
+async def gather_in_sessions(
+    queries: Dict[str, Callable[[AsyncSession], Awaitable[Any]]],
+    concurrency: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    并发执行互不依赖的统计查询，每个查询使用连接池中独立的数据库会话
+
+    Args:
+        queries: 结果名 -> 接收数据库会话的异步函数
+        concurrency: 同时占用的会话数上限，默认为STATS_QUERY_CONCURRENCY
+
+    Returns:
+        结果名 -> 查询结果
+    """
+    from .database import AsyncSessionLocal  # 避免循环导入
+
+    semaphore = asyncio.Semaphore(max(concurrency or settings.STATS_QUERY_CONCURRENCY, 1))
+
+    async def run(query: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        async with semaphore:
+            async with AsyncSessionLocal() as db:
+                return await query(db)
+
+    results = await asyncio.gather(*(run(query) for query in queries.values()))
+    return dict(zip(queries.keys(), results))
+
+
+class SnapshotCache:
+    """
+    进程内的统计快照缓存
+
+    仪表盘等聚合结果按键缓存，过期后由第一个请求重新计算，同一键的并发请求等待同一次计算，
+    不会同时发起多组聚合查询。多个工作进程各自缓存，数据最多滞后ttl_seconds秒
+    """
+
+    def __init__(self, ttl_seconds: float = 60):
+        """
+        初始化快照缓存
+
+        Args:
+            ttl_seconds: 快照缓存时间（秒），0表示不缓存
+        """
+        self.ttl_seconds = ttl_seconds
+        self._snapshots: Dict[str, Tuple[float, Any]] = {}  # 键 -> (生成时间, 快照)
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _fresh(self, key: str) -> Optional[Tuple[float, Any]]:
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and time.monotonic() - snapshot[0] < self.ttl_seconds:
+            return snapshot
+        return None
+
+    async def get(self, key: str, builder: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        获取快照，不存在或已过期时调用builder重新生成
+
+        Args:
+            key: 快照键
+            builder: 生成快照的异步函数，返回值会被共享，调用方不应修改
+
+        Returns:
+            快照
+        """
+        if not self.ttl_seconds:
+            return await builder()
+
+        snapshot = self._fresh(key)
+        if snapshot is not None:
+            return snapshot[1]
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            snapshot = self._fresh(key)
+            if snapshot is not None:
+                return snapshot[1]
+
+            value = await builder()
+            self._snapshots[key] = (time.monotonic(), value)
+            return value
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """丢弃指定键的快照，未指定时丢弃全部"""
+        if key is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(key, None)
+
+
+stats_snapshots = SnapshotCache(ttl_seconds=settings.STATS_SNAPSHOT_TTL_SECONDS)
@@ -0,0 +1,163 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# 参与趋势分析的健康指标
+TREND_METRICS = ("weight", "bmi", "heart_rate", "blood_sugar")
+
+# 拟合变化幅度低于该百分比视为稳定
+STABLE_CHANGE_PERCENT = 1.0
+
+# 残差标准差相对数据量级低于该比例时视为无波动
+RESIDUAL_TOLERANCE = 1e-9
+
+SECONDS_PER_DAY = 86400.0
+
+
+def to_float_array(values: Sequence[Optional[float]]) -> np.ndarray:
+    """将可能包含None的数值列转换为float数组，None转为NaN"""
+    return np.fromiter(
+        (np.nan if v is None else v for v in values),
+        dtype=float,
+        count=len(values)
+    )
+
+
+def to_timestamp_array(values: Sequence[datetime]) -> np.ndarray:
+    """将时间列转换为Unix时间戳（秒）数组"""
+    return np.fromiter((v.timestamp() for v in values), dtype=float, count=len(values))
+
+
+def analyze_series(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    *,
+    labels: Optional[np.ndarray] = None,
+    window: int = 7,
+    z_threshold: float = 3.0,
+    max_anomalies: int = 20
+) -> Optional[Dict[str, Any]]:
+    """
+    分析单个指标的时间序列
+
+    使用最小二乘拟合斜率判断趋势，基于拟合残差的z分数标记异常值
+
+    Args:
+        timestamps: 按时间升序排列的时间戳数组（秒）
+        values: 与时间戳对应的数值数组，NaN表示缺失
+        labels: 与时间戳对应的原始记录时间，用于标注异常点，缺省时由时间戳换算
+        window: 滑动平均窗口大小（数据点个数）
+        z_threshold: 判定为异常的z分数阈值
+        max_anomalies: 最多返回的异常点数量（按偏离程度排序）
+
+    Returns:
+        趋势分析结果，有效数据少于2个时返回None
+    """
+    mask = ~np.isnan(values)
+    t = timestamps[mask]
+    y = values[mask]
+    if labels is not None:
+        labels = labels[mask]
+    n = y.size
+    if n < 2:
+        return None
+
+    days = (t - t[0]) / SECONDS_PER_DAY
+    y_mean = y.mean()
+
+    # 最小二乘拟合 y = intercept + slope * days
+    dx = days - days.mean()
+    sxx = dx @ dx
+    slope = float(dx @ (y - y_mean) / sxx) if sxx > 0 else 0.0
+    intercept = y_mean - slope * days.mean()
+
+    fitted_first = intercept
+    change = slope * days[-1]
+    change_percent = change / fitted_first * 100 if fitted_first else 0.0
+
+    if abs(change_percent) < STABLE_CHANGE_PERCENT:
+        trend = "stable"
+    elif change_percent > 0:
+        trend = "increasing"
+    else:
+        trend = "decreasing"
+
+    # 滑动平均（基于累加和，O(n)）
+    w = min(window, n)
+    cumsum = np.cumsum(np.insert(y, 0, 0.0))
+    rolling = (cumsum[w:] - cumsum[:-w]) / w
+
+    # 基于拟合残差的z分数异常检测，避免把正常趋势误判为异常
+    residuals = y - (intercept + slope * days)
+    residual_std = residuals.std()
+    anomalies: List[Dict[str, Any]] = []
+    anomaly_count = 0
+    # 残差小到只剩浮点误差时说明数据完全符合线性趋势，不做异常判断
+    if residual_std > RESIDUAL_TOLERANCE * (abs(y_mean) + 1):
+        z_scores = residuals / residual_std
+        anomaly_idx = np.flatnonzero(np.abs(z_scores) > z_threshold)
+        anomaly_count = int(anomaly_idx.size)
+        top = anomaly_idx[np.argsort(-np.abs(z_scores[anomaly_idx]))][:max_anomalies]
+        anomalies = [
+            {
+                "recorded_at": (
+                    labels[i] if labels is not None
+                    else datetime.fromtimestamp(t[i], tz=timezone.utc)
+                ).isoformat(),
+                "value": round(float(y[i]), 2),
+                "z_score": round(float(z_scores[i]), 2)
+            }
+            for i in np.sort(top)
+        ]
+
+    variance = float(y.var())
+    return {
+        "trend": trend,
+        "change": round(float(change), 2),
+        "change_percent": round(float(change_percent), 2),
+        "first_value": float(y[0]),
+        "last_value": float(y[-1]),
+        "slope_per_day": round(slope, 4),
+        "mean": round(float(y_mean), 2),
+        "variance": round(variance, 4),
+        "std": round(float(np.sqrt(variance)), 4),
+        "rolling_window": int(w),
+        "rolling_mean": round(float(rolling[-1]), 2),
+        "anomaly_count": anomaly_count,
+        "anomalies": anomalies,
+        "data_points": int(n)
+    }
+
+
+def analyze_columns(columns: Dict[str, Sequence[Any]], **options) -> Dict[str, Any]:
+    """
+    对列式健康数据逐指标做趋势分析
+
+    Args:
+        columns: 列式数据，包含recorded_at及各指标列，长度一致
+        **options: 透传给analyze_series的参数
+
+    Returns:
+        各指标的趋势分析结果
+    """
+    recorded_at = columns.get("recorded_at") or []
+    if len(recorded_at) < 2:
+        return {
+            "trend": "insufficient_data",
+            "message": "数据不足，无法分析趋势"
+        }
+
+    timestamps = to_timestamp_array(recorded_at)
+    order = np.argsort(timestamps, kind="stable")
+    timestamps = timestamps[order]
+    labels = np.asarray(recorded_at, dtype=object)[order]
+
+    result: Dict[str, Any] = {}
+    for metric in TREND_METRICS:
+        values = to_float_array(columns[metric])[order]
+        result[f"{metric}_trend"] = analyze_series(timestamps, values, labels=labels, **options)
+
+    result["analysis_date"] = datetime.now().isoformat()
+    result["data_points"] = len(recorded_at)
+    return result
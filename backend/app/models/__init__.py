@@ -2,11 +2,12 @@ from .base import Base
 from .user import User
 from .user_relation import UserRelation
 from .course import Course, CourseEnrollment
-from .health import HealthRecord
+from .health import HealthRecord, HealthDailyRollup
 from .prescription import Prescription, PrescriptionExercise
-from .challenge import Challenge, ChallengeRecord, challenge_participants
-from .chat import ChatMessage, ChatRoom, ChatRoomMember
+from .challenge import Challenge, ChallengeRecord, ChallengeProgress, challenge_participants
+from .chat import ChatMessage, ChatMessageArchive, ChatRoom, ChatRoomMember, ChatConversation
 from .social import Post, PostComment, PostLike, HeritageProject, HeritageInheritor
+from .platform import PlatformCounter, PlatformCounterKey
 
 __all__ = [
     'Base',
@@ -15,17 +16,23 @@ __all__ = [
     'Course',
     'CourseEnrollment',
     'HealthRecord',
+    'HealthDailyRollup',
     'Prescription',
     'PrescriptionExercise',
     'Challenge',
     'ChallengeRecord',
+    'ChallengeProgress',
     'challenge_participants',
     'ChatMessage',
+    'ChatMessageArchive',
     'ChatRoom',
     'ChatRoomMember',
+    'ChatConversation',
     'Post',
     'PostComment',
     'PostLike',
     'HeritageProject',
     'HeritageInheritor',
+    'PlatformCounter',
+    'PlatformCounterKey',
 ]
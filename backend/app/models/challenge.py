@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
 
-from sqlalchemy import String, Text, DateTime, ForeignKey, Boolean, Table, Column, Integer
+from sqlalchemy import String, Text, DateTime, ForeignKey, Boolean, Table, Column, Integer, Index, Date, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -18,6 +18,9 @@ challenge_participants = Table(
 class Challenge(Base):
     """挑战活动模型"""
     __tablename__ = "challenges"
+    __table_args__ = (
+        Index("ix_challenges_active_participant_count", "is_active", "participant_count"),
+    )
 
     title: Mapped[str] = mapped_column(String(100), index=True, nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
@@ -28,6 +31,7 @@ class Challenge(Base):
     creator_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     max_participants: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     reward_points: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    participant_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)  # 随加入/退出维护的参与人数
     
     # 关系定义
     participants: Mapped[List["User"]] = relationship(
@@ -41,10 +45,19 @@ class Challenge(Base):
 class ChallengeRecord(Base):
     """挑战记录模型，记录用户参与挑战的情况"""
     __tablename__ = "challenge_records"
+    __table_args__ = (
+        Index("ix_challenge_records_challenge_completed_user", "challenge_id", "completed", "user_id"),
+        UniqueConstraint("user_id", "challenge_id", "check_in_day", name="uq_challenge_records_user_challenge_day"),
+    )
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     challenge_id: Mapped[int] = mapped_column(ForeignKey("challenges.id"), nullable=False)
     check_in_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    check_in_day: Mapped[date] = mapped_column(
+        Date,
+        default=lambda context: context.get_current_parameters()["check_in_date"].date(),
+        nullable=False
+    )  # 打卡日期，用于保证每天只能打卡一次
     completed: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     points_earned: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     duration: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # 活动时长(分钟)
@@ -53,4 +66,24 @@ class ChallengeRecord(Base):
     
     # 关系定义
     user: Mapped["User"] = relationship("User", back_populates="challenge_records")
-    challenge: Mapped["Challenge"] = relationship("Challenge", back_populates="records") 
\ No newline at end of file
+    challenge: Mapped["Challenge"] = relationship("Challenge", back_populates="records")
+
+class ChallengeProgress(Base):
+    """
+    挑战进度模型，每个用户每个挑战一行
+
+    随完成的打卡增量维护，查询进度时只需读取一行
+    """
+    __tablename__ = "challenge_progress"
+    __table_args__ = (
+        UniqueConstraint("user_id", "challenge_id", name="uq_challenge_progress_user_challenge"),
+    )
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    challenge_id: Mapped[int] = mapped_column(ForeignKey("challenges.id"), nullable=False)
+    check_in_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    total_points: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    current_streak: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)  # 截至最后一次打卡的连续天数
+    longest_streak: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    last_check_in_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+
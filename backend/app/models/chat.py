@@ -2,7 +2,7 @@ from datetime import datetime
 from enum import Enum as PyEnum
 from typing import Optional
 
-from sqlalchemy import String, Text, ForeignKey, Enum, Integer
+from sqlalchemy import String, Text, ForeignKey, Enum, Integer, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -17,6 +17,10 @@ class MessageType(str, PyEnum):
 class ChatMessage(Base):
     """聊天消息模型"""
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_pair_time", "sender_id", "receiver_id", "created_at"),
+        Index("ix_chat_messages_receiver_read", "receiver_id", "is_read"),
+    )
 
     sender_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     receiver_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -35,6 +39,30 @@ class ChatMessage(Base):
     receiver: Mapped["User"] = relationship("User", foreign_keys=[receiver_id], back_populates="received_messages")
     chat_room: Mapped[Optional["ChatRoom"]] = relationship("ChatRoom", back_populates="messages")
 
+class ChatMessageArchive(Base):
+    """归档聊天消息模型，保存超出热数据窗口的历史消息，字段与ChatMessage一致"""
+    __tablename__ = "chat_messages_archive"
+    __table_args__ = (
+        Index("ix_chat_messages_archive_pair_time", "sender_id", "receiver_id", "created_at"),
+        Index("ix_chat_messages_archive_room_time", "chat_room_id", "created_at"),
+    )
+
+    sender_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    receiver_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    message_type: Mapped[str] = mapped_column(
+        Enum(MessageType), 
+        default=MessageType.TEXT, 
+        nullable=False
+    )
+    is_read: Mapped[bool] = mapped_column(default=False, nullable=False)
+    read_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    chat_room_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    # 关系定义（只读）
+    sender: Mapped["User"] = relationship("User", foreign_keys=[sender_id], viewonly=True)
+    receiver: Mapped["User"] = relationship("User", foreign_keys=[receiver_id], viewonly=True)
+
 class ChatRoom(Base):
     """聊天室模型"""
     __tablename__ = "chat_rooms"
@@ -43,6 +71,14 @@ class ChatRoom(Base):
     is_group: Mapped[bool] = mapped_column(default=False, nullable=False)
     creator_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     
+    # 房间摘要，发送消息时随之更新，房间列表直接读取，无需扫描消息表
+    last_message_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    last_sender_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    last_message_type: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    last_message_preview: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+    last_message_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    member_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    
     # 关系定义
     messages: Mapped[list["ChatMessage"]] = relationship("ChatMessage", back_populates="chat_room")
     members: Mapped[list["ChatRoomMember"]] = relationship("ChatRoomMember", back_populates="room")
@@ -57,7 +93,25 @@ class ChatRoomMember(Base):
     nickname: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     join_date: Mapped[datetime] = mapped_column(nullable=False)
     is_admin: Mapped[bool] = mapped_column(default=False, nullable=False)
+    unread_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     
     # 关系定义
     room: Mapped["ChatRoom"] = relationship("ChatRoom", back_populates="members")
-    user: Mapped["User"] = relationship("User") 
\ No newline at end of file
+    user: Mapped["User"] = relationship("User") 
+
+class ChatConversation(Base):
+    """私聊会话模型，每对用户各保存一行（以user_id为视角），发送私聊消息时更新"""
+    __tablename__ = "chat_conversations"
+    __table_args__ = (
+        UniqueConstraint("user_id", "contact_id", name="uq_chat_conversations_user_contact"),
+        Index("ix_chat_conversations_user_last_time", "user_id", "last_time"),
+    )
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    contact_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    last_message_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    unread_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    
+    # 关系定义
+    contact: Mapped["User"] = relationship("User", foreign_keys=[contact_id])
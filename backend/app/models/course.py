@@ -2,7 +2,7 @@ from datetime import datetime
 from enum import Enum as PyEnum
 from typing import List, Optional
 
-from sqlalchemy import String, Text, Integer, Enum, ForeignKey
+from sqlalchemy import String, Text, Integer, Enum, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -27,6 +27,8 @@ class Course(Base):
         default=DifficultyLevel.BEGINNER
     )
     instructor_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    enrollment_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    views_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     
     # 关系定义
     enrollments: Mapped[List["CourseEnrollment"]] = relationship("CourseEnrollment", back_populates="course")
@@ -34,9 +36,12 @@ class Course(Base):
 class CourseEnrollment(Base):
     """课程报名模型，记录用户与课程的多对多关系"""
     __tablename__ = "course_enrollments"
+    __table_args__ = (
+        UniqueConstraint("user_id", "course_id", name="uq_course_enrollments_user_course"),
+    )
     
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
-    course_id: Mapped[int] = mapped_column(ForeignKey("courses.id"), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    course_id: Mapped[int] = mapped_column(ForeignKey("courses.id"), nullable=False)
     enrollment_date: Mapped[datetime] = mapped_column(nullable=False)
     completed: Mapped[bool] = mapped_column(default=False)
     progress: Mapped[float] = mapped_column(default=0.0)  # 课程完成百分比 0.0 - 100.0
@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import String, Integer, Float, ForeignKey, DateTime, func
+from sqlalchemy import String, Integer, Float, ForeignKey, DateTime, Date, Index, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -9,6 +9,9 @@ from .base import Base
 class HealthRecord(Base):
     """健康记录模型"""
     __tablename__ = "health_records"
+    __table_args__ = (
+        Index("ix_health_records_user_recorded_at", "user_id", "recorded_at"),
+    )
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     blood_pressure: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)  # 格式: "120/80"
@@ -25,4 +28,42 @@ class HealthRecord(Base):
     )
 
     # 关系定义
-    user: Mapped["User"] = relationship("User", back_populates="health_records") 
\ No newline at end of file
+    user: Mapped["User"] = relationship("User", back_populates="health_records")
+
+
+class HealthDailyRollup(Base):
+    """
+    健康数据日汇总模型
+
+    每个用户每天一行，记录各指标的次数、合计、最小值和最大值，
+    随健康记录的增删改增量维护，周/月统计由日汇总再聚合得到
+    """
+    __tablename__ = "health_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_health_daily_rollups_user_day"),
+    )
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    record_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    blood_pressure_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+    heart_rate_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    heart_rate_sum: Mapped[float] = mapped_column(Float, default=0, server_default="0", nullable=False)
+    heart_rate_min: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    heart_rate_max: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    blood_sugar_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    blood_sugar_sum: Mapped[float] = mapped_column(Float, default=0, server_default="0", nullable=False)
+    blood_sugar_min: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    blood_sugar_max: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    weight_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    weight_sum: Mapped[float] = mapped_column(Float, default=0, server_default="0", nullable=False)
+    weight_min: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    weight_max: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    bmi_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    bmi_sum: Mapped[float] = mapped_column(Float, default=0, server_default="0", nullable=False)
+    bmi_min: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    bmi_max: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
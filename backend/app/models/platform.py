@@ -0,0 +1,26 @@
+from enum import IntEnum
+
+from sqlalchemy import String, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+class PlatformCounterKey(IntEnum):
+    """平台计数项，值即platform_counters表中该计数行的ID"""
+    USERS = 1           # 用户总数
+    ACTIVE_USERS = 2    # 已激活用户数
+    COURSES = 3         # 课程总数
+    CHALLENGES = 4      # 挑战总数
+    HEALTH_RECORDS = 5  # 健康记录总数
+    POSTS = 6           # 动态总数
+
+class PlatformCounter(Base):
+    """
+    平台计数模型
+
+    每个计数项一行，随创建、删除增量维护，仪表盘读取总数时不再对大表执行count(*)
+    """
+    __tablename__ = "platform_counters"
+
+    name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False, comment="计数项名称")
+    value: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
@@ -2,10 +2,11 @@ from typing import List, Optional
 from enum import Enum
 from datetime import datetime
 
-from sqlalchemy import String, Text, Integer, Boolean, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import String, Text, Integer, Float, Boolean, DateTime, ForeignKey, Index, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
+from ..core.hot_score import hot_score
 
 class PostType(str, Enum):
     """动态类型枚举"""
@@ -18,6 +19,10 @@ class PostType(str, Enum):
 class Post(Base):
     """动态模型"""
     __tablename__ = "posts"
+    __table_args__ = (
+        Index("ix_posts_featured_created_at", "is_featured", "created_at"),
+        Index("ix_posts_hot_score", "hot_score"),
+    )
 
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
     title: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
@@ -27,11 +32,23 @@ class Post(Base):
     thumbnail_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     likes_count: Mapped[int] = mapped_column(Integer, default=0)
     comments_count: Mapped[int] = mapped_column(Integer, default=0)
+    views_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     shares_count: Mapped[int] = mapped_column(Integer, default=0)
     is_public: Mapped[bool] = mapped_column(Boolean, default=True)
     is_featured: Mapped[bool] = mapped_column(Boolean, default=False)  # 是否精选
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # 热度分，随点赞数、评论数变化时刷新
+    hot_score: Mapped[float] = mapped_column(
+        Float,
+        default=lambda context: hot_score(
+            context.get_current_parameters().get("likes_count"),
+            context.get_current_parameters().get("comments_count"),
+            context.get_current_parameters().get("created_at")
+        ),
+        server_default="0",
+        nullable=False
+    )
 
     # 关系定义
     user: Mapped["User"] = relationship("User", back_populates="posts")
@@ -57,6 +74,9 @@ class PostComment(Base):
 class PostLike(Base):
     """动态点赞模型"""
     __tablename__ = "post_likes"
+    __table_args__ = (
+        UniqueConstraint("post_id", "user_id", name="uq_post_likes_post_user"),
+    )
 
     post_id: Mapped[int] = mapped_column(Integer, ForeignKey("posts.id"), nullable=False)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
@@ -2,7 +2,7 @@ from typing import List, Optional
 from enum import Enum
 from datetime import date
 
-from sqlalchemy import String, Boolean, Enum as SQLEnum, Date, Text
+from sqlalchemy import String, Boolean, Integer, Enum as SQLEnum, Date, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -44,6 +44,7 @@ class User(Base):
     is_admin: Mapped[bool] = mapped_column(Boolean, default=False)  # 保持向后兼容
     role: Mapped[UserRole] = mapped_column(SQLEnum(UserRole), default=UserRole.ELDERLY, server_default='ELDERLY')
     unique_id: Mapped[str] = mapped_column(String(20), unique=True, index=True, nullable=False)
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)  # 停用或改密时递增，使旧令牌失效
     
     # 关系定义 - 这些将在其他模型定义后添加
     health_records: Mapped[List["HealthRecord"]] = relationship("HealthRecord", back_populates="user")
@@ -23,6 +23,7 @@ from .social import (
     HeritageProjectRepository,
     HeritageInheritorRepository
 )
+from .platform import PlatformCounterRepository
 
 # 创建单例实例
 user_repository = UserRepository()
@@ -40,4 +41,5 @@ post_repository = PostRepository()
 post_comment_repository = PostCommentRepository()
 post_like_repository = PostLikeRepository()
 heritage_project_repository = HeritageProjectRepository()
-heritage_inheritor_repository = HeritageInheritorRepository() 
\ No newline at end of file
+heritage_inheritor_repository = HeritageInheritorRepository() 
+platform_counter_repository = PlatformCounterRepository()
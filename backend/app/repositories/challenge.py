@@ -1,11 +1,12 @@
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, date, timedelta
-from sqlalchemy import select, func, and_, or_, desc, text
+from sqlalchemy import select, insert, update, delete, func, and_, or_, desc, literal, case
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from .base import RepositoryBase
-from ..models.challenge import Challenge, challenge_participants, ChallengeRecord
+from ..models.challenge import Challenge, challenge_participants, ChallengeRecord, ChallengeProgress
 from ..schemas.challenge import (
     ChallengeCreate, ChallengeUpdate, 
     ChallengeParticipantCreate, ChallengeParticipantInDB,
@@ -138,16 +139,7 @@ class ChallengeRepository(RepositoryBase[Challenge, ChallengeCreate, ChallengeUp
         challenge = await self.get(db, id)
         if not challenge:
             return None, 0
-        
-        count_query = (
-            select(func.count())
-            .select_from(challenge_participants)
-            .where(challenge_participants.c.challenge_id == id)
-        )
-        result = await db.execute(count_query)
-        count = result.scalar()
-        
-        return challenge, count
+        return challenge, challenge.participant_count
     
     async def check_user_joined(
         self, 
@@ -196,40 +188,35 @@ class ChallengeRepository(RepositoryBase[Challenge, ChallengeCreate, ChallengeUp
         Returns:
             (挑战对象, 参与者数量)元组列表
         """
-        # 使用 text() 函数执行原生 SQL
-        query = text("""
-            SELECT 
-                c.*, 
-                COUNT(cp.user_id) AS participant_count
-            FROM 
-                challenge c
-            LEFT JOIN 
-                challenge_participant cp ON c.id = cp.challenge_id
-            WHERE 
-                c.is_active = true
-            GROUP BY 
-                c.id
-            ORDER BY 
-                participant_count DESC, 
-                c.created_at DESC
-            LIMIT :limit
-        """)
-        
-        result = await db.execute(query, {"limit": limit})
-        rows = result.all()
-        
-        challenges = []
-        for row in rows:
-            challenge_dict = {}
-            for column, value in row._mapping.items():
-                if column != 'participant_count':
-                    challenge_dict[column] = value
-            
-            challenge = Challenge(**challenge_dict)
-            participant_count = row.participant_count
-            challenges.append((challenge, participant_count))
+        # 参与人数随加入/退出维护在挑战表中，按(is_active, participant_count)索引直接取前N条
+        query = (
+            select(Challenge)
+            .where(Challenge.is_active == True)
+            .order_by(desc(Challenge.participant_count), desc(Challenge.created_at))
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return [(challenge, challenge.participant_count) for challenge in result.scalars().all()]
+    
+    async def rebuild_participant_counts(self, db: AsyncSession) -> int:
+        """
+        根据参与记录重新计算所有挑战的参与人数，用于初始化或修复历史数据
+        
+        Args:
+            db: 数据库会话
             
-        return challenges
+        Returns:
+            更新的挑战数
+        """
+        count_query = (
+            select(func.count())
+            .select_from(challenge_participants)
+            .where(challenge_participants.c.challenge_id == Challenge.id)
+            .scalar_subquery()
+        )
+        result = await db.execute(update(Challenge).values(participant_count=count_query))
+        await db.commit()
+        return result.rowcount
 
 class ChallengeParticipantRepository:
     """
@@ -243,7 +230,12 @@ class ChallengeParticipantRepository:
         obj_in: ChallengeParticipantCreate
     ):
         """
-        创建挑战参与记录
+        创建挑战参与记录，并在同一事务中增加挑战的参与人数
+        
+        参与人数的增加带有人数上限条件，并发加入时不会超出max_participants
+        
+        Raises:
+            ValueError: 挑战已达到最大参与人数或用户已参与
         """
         now = datetime.now()
         values = {
@@ -251,9 +243,29 @@ class ChallengeParticipantRepository:
             "challenge_id": obj_in.challenge_id,
             "joined_at": now
         }
-        query = challenge_participants.insert().values(**values)
-        await db.execute(query)
-        await db.commit()
+        counter = (
+            update(Challenge)
+            .where(
+                and_(
+                    Challenge.id == obj_in.challenge_id,
+                    or_(
+                        Challenge.max_participants.is_(None),
+                        Challenge.participant_count < Challenge.max_participants
+                    )
+                )
+            )
+            .values(participant_count=Challenge.participant_count + 1)
+        )
+        try:
+            result = await db.execute(counter)
+            if not result.rowcount:
+                await db.rollback()
+                raise ValueError("挑战已达到最大参与人数")
+            await db.execute(challenge_participants.insert().values(**values))
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise ValueError("已经参与该挑战")
         return values
     
     async def remove(
@@ -264,7 +276,7 @@ class ChallengeParticipantRepository:
         challenge_id: int
     ):
         """
-        删除挑战参与记录
+        删除挑战参与记录，并在同一事务中减少挑战的参与人数
         """
         query = challenge_participants.delete().where(
             and_(
@@ -272,7 +284,13 @@ class ChallengeParticipantRepository:
                 challenge_participants.c.challenge_id == challenge_id
             )
         )
-        await db.execute(query)
+        result = await db.execute(query)
+        if result.rowcount:
+            await db.execute(
+                update(Challenge)
+                .where(Challenge.id == challenge_id)
+                .values(participant_count=Challenge.participant_count - 1)
+            )
         await db.commit()
         return {"user_id": user_id, "challenge_id": challenge_id}
     
@@ -483,6 +501,270 @@ class ChallengeRecordRepository(RepositoryBase[ChallengeRecord, ChallengeRecordC
         result = await db.execute(query)
         return result.scalars().first()
     
+    async def create_check_in(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id: int,
+        challenge_id: int,
+        values: Dict[str, Any]
+    ) -> Optional[ChallengeRecord]:
+        """
+        用一条INSERT ... SELECT语句完成打卡
+        
+        仅当用户已参与且挑战处于活跃状态时才会插入；未指定积分的完成打卡使用挑战的奖励积分。
+        同一用户同一挑战每天只能打卡一次，由唯一约束保证
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            challenge_id: 挑战ID
+            values: 打卡字段（check_in_date、completed、points_earned、duration、notes、evidence_url）
+            
+        Returns:
+            创建的打卡记录；未参与或挑战不可用时返回None
+            
+        Raises:
+            ValueError: 当天已打卡
+        """
+        check_in_date = values["check_in_date"]
+        if values.get("completed", True) and not values.get("points_earned"):
+            points = Challenge.reward_points
+        else:
+            points = literal(values.get("points_earned") or 0)
+        
+        columns = {
+            "user_id": literal(user_id),
+            "challenge_id": Challenge.id,
+            "check_in_date": literal(check_in_date, ChallengeRecord.check_in_date.type),
+            "check_in_day": literal(check_in_date.date(), ChallengeRecord.check_in_day.type),
+            "completed": literal(values.get("completed", True)),
+            "points_earned": points,
+            "duration": literal(values.get("duration"), ChallengeRecord.duration.type),
+            "notes": literal(values.get("notes"), ChallengeRecord.notes.type),
+            "evidence_url": literal(values.get("evidence_url"), ChallengeRecord.evidence_url.type)
+        }
+        source = (
+            select(*columns.values())
+            .select_from(Challenge)
+            .join(
+                challenge_participants,
+                and_(
+                    challenge_participants.c.challenge_id == Challenge.id,
+                    challenge_participants.c.user_id == user_id
+                )
+            )
+            .where(
+                and_(
+                    Challenge.id == challenge_id,
+                    Challenge.is_active == True
+                )
+            )
+        )
+        stmt = insert(ChallengeRecord).from_select(list(columns.keys()), source)
+        
+        # 支持RETURNING的数据库（PostgreSQL、MariaDB、SQLite）直接取回新记录
+        returning = db.get_bind().dialect.insert_returning
+        if returning:
+            stmt = stmt.returning(ChallengeRecord)
+        
+        try:
+            result = await db.execute(stmt)
+            record = result.scalars().first() if returning else None
+            inserted = record is not None if returning else result.rowcount > 0
+            if not inserted:
+                await db.rollback()
+                return None
+            if not returning:
+                record = await db.get(ChallengeRecord, result.lastrowid)
+            if record.completed:
+                await self._apply_progress(db, record=record)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise ValueError("今日已打卡")
+        
+        return record
+    
+    async def _apply_progress(self, db: AsyncSession, *, record: ChallengeRecord) -> None:
+        """
+        将一次完成的打卡累加到进度行（先UPDATE，无记录再INSERT），不提交事务
+        
+        Args:
+            db: 数据库会话
+            record: 新增的完成打卡记录
+        """
+        day = record.check_in_day
+        points = record.points_earned or 0
+        streak = case(
+            (ChallengeProgress.last_check_in_date == day - timedelta(days=1), ChallengeProgress.current_streak + 1),
+            else_=1
+        )
+        stmt = (
+            update(ChallengeProgress)
+            .where(
+                and_(
+                    ChallengeProgress.user_id == record.user_id,
+                    ChallengeProgress.challenge_id == record.challenge_id,
+                    # 只处理按日期顺序到达的打卡，补打更早日期的打卡需要重算连续天数
+                    or_(
+                        ChallengeProgress.last_check_in_date.is_(None),
+                        ChallengeProgress.last_check_in_date < day
+                    )
+                )
+            )
+            .values(
+                check_in_count=ChallengeProgress.check_in_count + 1,
+                total_points=ChallengeProgress.total_points + points,
+                current_streak=streak,
+                longest_streak=case(
+                    (streak > ChallengeProgress.longest_streak, streak),
+                    else_=ChallengeProgress.longest_streak
+                ),
+                last_check_in_date=day,
+                updated_at=func.now()
+            )
+        )
+        result = await db.execute(stmt)
+        if result.rowcount:
+            return
+        
+        try:
+            async with db.begin_nested():
+                db.add(ChallengeProgress(
+                    user_id=record.user_id,
+                    challenge_id=record.challenge_id,
+                    check_in_count=1,
+                    total_points=points,
+                    current_streak=1,
+                    longest_streak=1,
+                    last_check_in_date=day
+                ))
+        except IntegrityError:
+            # 进度行已存在但本次是补打卡（或并发插入），从打卡记录重算该用户的进度
+            await self._rebuild_user_progress(db, user_id=record.user_id, challenge_id=record.challenge_id)
+    
+    @staticmethod
+    def _summarize_progress(rows: List[Tuple[date, int]]) -> Dict[str, Any]:
+        """根据按日期升序排列的(打卡日期, 积分)列表计算进度字段"""
+        current_streak = longest_streak = 0
+        last_day = None
+        for day, _ in rows:
+            current_streak = current_streak + 1 if last_day == day - timedelta(days=1) else 1
+            longest_streak = max(longest_streak, current_streak)
+            last_day = day
+        return {
+            "check_in_count": len(rows),
+            "total_points": sum(points or 0 for _, points in rows),
+            "current_streak": current_streak,
+            "longest_streak": longest_streak,
+            "last_check_in_date": last_day
+        }
+    
+    async def _rebuild_user_progress(self, db: AsyncSession, *, user_id: int, challenge_id: int) -> None:
+        """
+        根据打卡记录重算单个用户在挑战中的进度行，不提交事务
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            challenge_id: 挑战ID
+        """
+        query = (
+            select(ChallengeRecord.check_in_day, ChallengeRecord.points_earned)
+            .where(
+                and_(
+                    ChallengeRecord.user_id == user_id,
+                    ChallengeRecord.challenge_id == challenge_id,
+                    ChallengeRecord.completed == True
+                )
+            )
+            .order_by(ChallengeRecord.check_in_day)
+        )
+        result = await db.execute(query)
+        summary = self._summarize_progress(result.all())
+        await db.execute(
+            update(ChallengeProgress)
+            .where(
+                and_(
+                    ChallengeProgress.user_id == user_id,
+                    ChallengeProgress.challenge_id == challenge_id
+                )
+            )
+            .values(**summary, updated_at=func.now())
+        )
+    
+    async def rebuild_progress(self, db: AsyncSession, *, challenge_id: Optional[int] = None) -> int:
+        """
+        根据打卡记录全量重建挑战进度表，用于初始化或修复历史数据
+        
+        Args:
+            db: 数据库会话
+            challenge_id: 挑战ID，为None时重建所有挑战
+            
+        Returns:
+            重建的进度行数
+        """
+        delete_stmt = delete(ChallengeProgress)
+        query = (
+            select(
+                ChallengeRecord.user_id,
+                ChallengeRecord.challenge_id,
+                ChallengeRecord.check_in_day,
+                ChallengeRecord.points_earned
+            )
+            .where(ChallengeRecord.completed == True)
+            .order_by(ChallengeRecord.user_id, ChallengeRecord.challenge_id, ChallengeRecord.check_in_day)
+        )
+        if challenge_id is not None:
+            delete_stmt = delete_stmt.where(ChallengeProgress.challenge_id == challenge_id)
+            query = query.where(ChallengeRecord.challenge_id == challenge_id)
+        await db.execute(delete_stmt)
+        
+        # 记录按(用户, 挑战, 日期)排序，逐组计算连续天数
+        grouped: Dict[Tuple[int, int], List[Tuple[date, int]]] = {}
+        for user_id, record_challenge_id, day, points in await db.execute(query):
+            grouped.setdefault((user_id, record_challenge_id), []).append((day, points))
+        
+        db.add_all([
+            ChallengeProgress(user_id=user_id, challenge_id=record_challenge_id, **self._summarize_progress(rows))
+            for (user_id, record_challenge_id), rows in grouped.items()
+        ])
+        await db.commit()
+        return len(grouped)
+    
+    async def get_progress_with_challenge(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id: int, 
+        challenge_id: int
+    ) -> Optional[Tuple[Challenge, Optional[ChallengeProgress]]]:
+        """
+        一次查询获取挑战及用户在其中的进度行
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            challenge_id: 挑战ID
+            
+        Returns:
+            (挑战, 进度行)元组，用户尚未完成打卡时进度行为None；挑战不存在返回None
+        """
+        query = (
+            select(Challenge, ChallengeProgress)
+            .outerjoin(
+                ChallengeProgress,
+                and_(
+                    ChallengeProgress.challenge_id == Challenge.id,
+                    ChallengeProgress.user_id == user_id
+                )
+            )
+            .where(Challenge.id == challenge_id)
+        )
+        result = await db.execute(query)
+        return result.first()
+    
     async def get_records_by_date_range(
         self, 
         db: AsyncSession, 
@@ -591,59 +873,35 @@ class ChallengeRecordRepository(RepositoryBase[ChallengeRecord, ChallengeRecordC
         total_points = result.scalar()
         return total_points or 0
     
-    async def get_leaderboard(
+    async def get_leaderboard_scores(
         self, 
         db: AsyncSession, 
         *, 
-        challenge_id: int,
-        limit: int = 10
-    ) -> List[Dict[str, Any]]:
+        challenge_id: int
+    ) -> List[Tuple[int, int, int]]:
         """
-        获取挑战排行榜
+        汇总挑战中每个用户的总积分和打卡次数，用于加载进程内排行榜
         
         Args:
             db: 数据库会话
             challenge_id: 挑战ID
-            limit: 返回的最大记录数
             
         Returns:
-            排行榜数据列表
-        """
-        # 使用 text() 函数执行原生 SQL
-        query = text("""
-            SELECT 
-                cr.user_id,
-                u.username,
-                u.nickname,
-                u.avatar,
-                SUM(cr.points_earned) AS total_points,
-                COUNT(cr.id) AS check_in_count
-            FROM 
-                challenge_record cr
-            JOIN 
-                "user" u ON cr.user_id = u.id
-            WHERE 
-                cr.challenge_id = :challenge_id
-                AND cr.completed = true
-            GROUP BY 
-                cr.user_id, u.username, u.nickname, u.avatar
-            ORDER BY 
-                total_points DESC, 
-                check_in_count DESC
-            LIMIT :limit
-        """)
-        
-        result = await db.execute(query, {"challenge_id": challenge_id, "limit": limit})
-        
-        leaderboard = []
-        for row in result:
-            leaderboard.append({
-                "user_id": row.user_id,
-                "username": row.username,
-                "nickname": row.nickname,
-                "avatar": row.avatar,
-                "total_points": row.total_points,
-                "check_in_count": row.check_in_count
-            })
-            
-        return leaderboard 
\ No newline at end of file
+            (用户ID, 总积分, 打卡次数)列表
+        """
+        query = (
+            select(
+                ChallengeRecord.user_id,
+                func.coalesce(func.sum(ChallengeRecord.points_earned), 0),
+                func.count(ChallengeRecord.id)
+            )
+            .where(
+                and_(
+                    ChallengeRecord.challenge_id == challenge_id,
+                    ChallengeRecord.completed == True
+                )
+            )
+            .group_by(ChallengeRecord.user_id)
+        )
+        result = await db.execute(query)
+        return [(user_id, int(points), int(count)) for user_id, points, count in result]
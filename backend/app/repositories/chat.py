@@ -1,17 +1,46 @@
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Callable
 from datetime import datetime
-from sqlalchemy import select, func, and_, or_, desc, asc, text
+from sqlalchemy import select, insert, update, delete, func, and_, or_, desc, asc, text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 
 from .base import RepositoryBase
-from ..models.chat import ChatMessage, ChatRoom, ChatRoomMember
+from ..models.chat import ChatMessage, ChatMessageArchive, ChatRoom, ChatRoomMember, ChatConversation
+from ..models.user import User
 from ..schemas.chat import (
     ChatMessageCreate, ChatMessageUpdate, 
     ChatRoomCreate, ChatRoomUpdate,
     ChatRoomMemberCreate, ChatRoomMemberUpdate
 )
 
+# 聊天室摘要中消息预览的最大长度
+PREVIEW_MAX_LENGTH = 100
+
+# 非文本消息在摘要中的占位文字
+MESSAGE_TYPE_PREVIEWS = {
+    "image": "[图片]",
+    "video": "[视频]",
+    "audio": "[语音]",
+    "file": "[文件]",
+}
+
+def build_message_preview(content: str, message_type: str) -> str:
+    """
+    生成聊天室摘要中的消息预览
+    
+    Args:
+        content: 消息内容
+        message_type: 消息类型
+        
+    Returns:
+        预览文字
+    """
+    message_type = getattr(message_type, "value", message_type)
+    if message_type in MESSAGE_TYPE_PREVIEWS:
+        return MESSAGE_TYPE_PREVIEWS[message_type]
+    return (content or "")[:PREVIEW_MAX_LENGTH]
+
 class ChatMessageRepository(RepositoryBase[ChatMessage, ChatMessageCreate, ChatMessageUpdate]):
     """
     聊天消息数据访问层
@@ -32,6 +61,8 @@ class ChatMessageRepository(RepositoryBase[ChatMessage, ChatMessageCreate, ChatM
         """
         获取两个用户之间的对话
         
+        翻页超出热表范围时自动继续读取归档表
+        
         Args:
             db: 数据库会话
             user_id1: 用户1 ID
@@ -42,26 +73,39 @@ class ChatMessageRepository(RepositoryBase[ChatMessage, ChatMessageCreate, ChatM
         Returns:
             消息列表
         """
-        query = (
-            select(ChatMessage)
-            .where(
-                or_(
-                    and_(
-                        ChatMessage.sender_id == user_id1,
-                        ChatMessage.receiver_id == user_id2
-                    ),
-                    and_(
-                        ChatMessage.sender_id == user_id2,
-                        ChatMessage.receiver_id == user_id1
-                    )
-                )
-            )
-            .order_by(desc(ChatMessage.created_at))
-            .offset(skip)
-            .limit(limit)
+        return await self._read_across_archive(
+            db,
+            clause=lambda model: self._conversation_clause(model, user_id1, user_id2),
+            skip=skip,
+            limit=limit
         )
-        result = await db.execute(query)
-        return result.scalars().all()
+    
+    async def create_room_message(
+        self, 
+        db: AsyncSession, 
+        *, 
+        obj_in: ChatMessageCreate
+    ) -> ChatMessage:
+        """
+        创建聊天室消息，并在同一事务中更新聊天室摘要
+        
+        Args:
+            db: 数据库会话
+            obj_in: 消息创建数据
+            
+        Returns:
+            创建的消息
+        """
+        db_obj = ChatMessage(**obj_in.model_dump(exclude_unset=True))
+        db.add(db_obj)
+        await db.flush()
+        
+        from . import chat_room_repository  # 避免循环导入
+        await chat_room_repository.record_message(db, message=db_obj)
+        
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
     
     async def get_room_messages(
         self, 
@@ -74,6 +118,8 @@ class ChatMessageRepository(RepositoryBase[ChatMessage, ChatMessageCreate, ChatM
         """
         获取聊天室的消息
         
+        翻页超出热表范围时自动继续读取归档表
+        
         Args:
             db: 数据库会话
             room_id: 聊天室ID
@@ -83,17 +129,180 @@ class ChatMessageRepository(RepositoryBase[ChatMessage, ChatMessageCreate, ChatM
         Returns:
             消息列表
         """
-        query = (
+        messages = await self._read_across_archive(
+            db,
+            clause=lambda model: model.chat_room_id == room_id,
+            skip=skip,
+            limit=limit
+        )
+        # 反转列表以使消息按时间顺序排列
+        messages.reverse()
+        return messages
+    
+    async def count_conversation(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id1: int, 
+        user_id2: int
+    ) -> int:
+        """
+        计算两个用户之间的消息总数（含归档消息）
+        
+        Args:
+            db: 数据库会话
+            user_id1: 用户1 ID
+            user_id2: 用户2 ID
+            
+        Returns:
+            消息总数
+        """
+        hot = await self._count_where(
+            db, ChatMessage, self._conversation_clause(ChatMessage, user_id1, user_id2)
+        )
+        archived = await self._count_where(
+            db, ChatMessageArchive, self._conversation_clause(ChatMessageArchive, user_id1, user_id2)
+        )
+        return hot + archived
+    
+    async def count_room_messages(
+        self, 
+        db: AsyncSession, 
+        *, 
+        room_id: int
+    ) -> int:
+        """
+        计算聊天室的消息总数（含归档消息）
+        
+        Args:
+            db: 数据库会话
+            room_id: 聊天室ID
+            
+        Returns:
+            消息总数
+        """
+        hot = await self._count_where(db, ChatMessage, ChatMessage.chat_room_id == room_id)
+        archived = await self._count_where(
+            db, ChatMessageArchive, ChatMessageArchive.chat_room_id == room_id
+        )
+        return hot + archived
+    
+    async def archive_messages_before(
+        self, 
+        db: AsyncSession, 
+        *, 
+        cutoff: datetime,
+        batch_size: int = 5000
+    ) -> int:
+        """
+        将早于指定时间的消息从热表迁移到归档表
+        
+        按ID分批执行INSERT ... SELECT与DELETE，每批单独提交，避免长事务锁表
+        
+        Args:
+            db: 数据库会话
+            cutoff: 截止时间，早于该时间的消息被归档
+            batch_size: 每批迁移的消息数
+            
+        Returns:
+            归档的消息数
+        """
+        columns = [column.name for column in ChatMessageArchive.__table__.columns]
+        archived = 0
+        
+        while True:
+            result = await db.execute(
+                select(ChatMessage.id)
+                .where(ChatMessage.created_at < cutoff)
+                .order_by(ChatMessage.id)
+                .limit(batch_size)
+            )
+            message_ids = result.scalars().all()
+            if not message_ids:
+                break
+            
+            await db.execute(
+                insert(ChatMessageArchive).from_select(
+                    columns,
+                    select(*[getattr(ChatMessage, name) for name in columns])
+                    .where(ChatMessage.id.in_(message_ids))
+                )
+            )
+            await db.execute(delete(ChatMessage).where(ChatMessage.id.in_(message_ids)))
+            await db.commit()
+            
+            archived += len(message_ids)
+            if len(message_ids) < batch_size:
+                break
+        
+        return archived
+    
+    @staticmethod
+    def _conversation_clause(model, user_id1: int, user_id2: int):
+        """构建两个用户之间消息的过滤条件，热表和归档表通用"""
+        return or_(
+            and_(
+                model.sender_id == user_id1,
+                model.receiver_id == user_id2
+            ),
+            and_(
+                model.sender_id == user_id2,
+                model.receiver_id == user_id1
+            )
+        )
+    
+    async def _count_where(self, db: AsyncSession, model, clause) -> int:
+        """计算指定表中满足条件的消息数"""
+        result = await db.execute(select(func.count()).select_from(model).where(clause))
+        return result.scalar()
+    
+    async def _read_across_archive(
+        self, 
+        db: AsyncSession, 
+        *, 
+        clause: Callable[[Any], Any],
+        skip: int,
+        limit: int
+    ) -> List[ChatMessage]:
+        """
+        按时间倒序分页读取消息，翻过热表范围后继续从归档表读取
+        
+        归档表中的消息都早于热表，因此两段结果直接拼接即可保持顺序
+        
+        Args:
+            db: 数据库会话
+            clause: 接收模型类并返回过滤条件的函数
+            skip: 跳过的记录数
+            limit: 返回的最大记录数
+            
+        Returns:
+            消息列表（按创建时间倒序）
+        """
+        result = await db.execute(
             select(ChatMessage)
-            .where(ChatMessage.chat_room_id == room_id)
+            .where(clause(ChatMessage))
             .order_by(desc(ChatMessage.created_at))
             .offset(skip)
             .limit(limit)
         )
-        result = await db.execute(query)
-        messages = result.scalars().all()
-        # 反转列表以使消息按时间顺序排列
-        messages.reverse()
+        messages = list(result.scalars().all())
+        if len(messages) >= limit:
+            return messages
+        
+        # 热表不足一页时，计算热表中满足条件的总数以确定归档表的偏移量
+        if messages:
+            hot_total = skip + len(messages)
+        else:
+            hot_total = await self._count_where(db, ChatMessage, clause(ChatMessage))
+        
+        result = await db.execute(
+            select(ChatMessageArchive)
+            .where(clause(ChatMessageArchive))
+            .order_by(desc(ChatMessageArchive.created_at))
+            .offset(max(skip - hot_total, 0))
+            .limit(limit - len(messages))
+        )
+        messages.extend(result.scalars().all())
         return messages
     
     async def get_unread_count(
@@ -189,6 +398,17 @@ class ChatMessageRepository(RepositoryBase[ChatMessage, ChatMessageCreate, ChatM
         
         if not message_ids:
             return 0
+        
+        await db.execute(
+            update(ChatConversation)
+            .where(
+                and_(
+                    ChatConversation.user_id == receiver_id,
+                    ChatConversation.contact_id == sender_id
+                )
+            )
+            .values(unread_count=0)
+        )
             
         return await self.mark_as_read(db, message_ids=message_ids, user_id=receiver_id)
     
@@ -202,6 +422,8 @@ class ChatMessageRepository(RepositoryBase[ChatMessage, ChatMessageCreate, ChatM
         """
         获取用户最近联系人
         
+        读取维护好的私聊会话表，走(user_id, last_time)索引，与历史消息量无关
+        
         Args:
             db: 数据库会话
             user_id: 用户ID
@@ -210,45 +432,21 @@ class ChatMessageRepository(RepositoryBase[ChatMessage, ChatMessageCreate, ChatM
         Returns:
             联系人列表
         """
-        # 使用原生SQL以获得更好的性能
-        query = text("""
-            WITH last_message AS (
-                SELECT 
-                    CASE 
-                        WHEN sender_id = :user_id THEN receiver_id 
-                        ELSE sender_id 
-                    END AS contact_id,
-                    MAX(created_at) AS last_time
-                FROM 
-                    chat_message
-                WHERE 
-                    sender_id = :user_id OR receiver_id = :user_id
-                GROUP BY 
-                    contact_id
+        query = (
+            select(
+                User.id,
+                User.username,
+                User.nickname,
+                User.avatar,
+                ChatConversation.last_time,
+                ChatConversation.unread_count
             )
-            SELECT 
-                u.id,
-                u.username,
-                u.nickname,
-                u.avatar,
-                lm.last_time,
-                (
-                    SELECT COUNT(*) 
-                    FROM chat_message cm 
-                    WHERE cm.sender_id = u.id 
-                    AND cm.receiver_id = :user_id 
-                    AND cm.is_read = false
-                ) AS unread_count
-            FROM 
-                "user" u
-            JOIN 
-                last_message lm ON u.id = lm.contact_id
-            ORDER BY 
-                lm.last_time DESC
-            LIMIT :limit
-        """)
-        
-        result = await db.execute(query, {"user_id": user_id, "limit": limit})
+            .join(User, User.id == ChatConversation.contact_id)
+            .where(ChatConversation.user_id == user_id)
+            .order_by(desc(ChatConversation.last_time))
+            .limit(limit)
+        )
+        result = await db.execute(query)
         
         contacts = []
         for row in result:
@@ -262,6 +460,96 @@ class ChatMessageRepository(RepositoryBase[ChatMessage, ChatMessageCreate, ChatM
             })
             
         return contacts
+    
+    async def create_direct_message(
+        self, 
+        db: AsyncSession, 
+        *, 
+        obj_in: ChatMessageCreate
+    ) -> ChatMessage:
+        """
+        创建私聊消息，并在同一事务中更新双方的会话记录
+        
+        Args:
+            db: 数据库会话
+            obj_in: 消息创建数据
+            
+        Returns:
+            创建的消息
+        """
+        db_obj = ChatMessage(**obj_in.model_dump(exclude_unset=True))
+        db.add(db_obj)
+        await db.flush()
+        
+        await self._record_conversation(
+            db,
+            user_id=db_obj.sender_id,
+            contact_id=db_obj.receiver_id,
+            message_id=db_obj.id,
+            unread_delta=0
+        )
+        await self._record_conversation(
+            db,
+            user_id=db_obj.receiver_id,
+            contact_id=db_obj.sender_id,
+            message_id=db_obj.id,
+            unread_delta=1
+        )
+        
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+    
+    async def _record_conversation(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id: int,
+        contact_id: int,
+        message_id: int,
+        unread_delta: int
+    ) -> None:
+        """
+        更新或创建一条会话记录（先UPDATE，无记录再INSERT，兼容MySQL与PostgreSQL）
+        
+        Args:
+            db: 数据库会话
+            user_id: 会话所属用户ID
+            contact_id: 联系人ID
+            message_id: 最新消息ID
+            unread_delta: 未读数增量
+        """
+        stmt = (
+            update(ChatConversation)
+            .where(
+                and_(
+                    ChatConversation.user_id == user_id,
+                    ChatConversation.contact_id == contact_id
+                )
+            )
+            .values(
+                last_message_id=message_id,
+                last_time=func.now(),
+                unread_count=ChatConversation.unread_count + unread_delta
+            )
+        )
+        result = await db.execute(stmt)
+        if result.rowcount:
+            return
+        
+        try:
+            async with db.begin_nested():
+                db.add(ChatConversation(
+                    user_id=user_id,
+                    contact_id=contact_id,
+                    last_message_id=message_id,
+                    last_time=func.now(),
+                    unread_count=unread_delta
+                ))
+        except IntegrityError:
+            # 并发发送时另一个事务已插入该会话，改为更新
+            await db.execute(stmt)
+    
 
 class ChatRoomRepository(RepositoryBase[ChatRoom, ChatRoomCreate, ChatRoomUpdate]):
     """
@@ -280,6 +568,8 @@ class ChatRoomRepository(RepositoryBase[ChatRoom, ChatRoomCreate, ChatRoomUpdate
         """
         获取聊天室及其最后一条消息
         
+        最后一条消息由房间摘要字段构建，不再查询消息表
+        
         Args:
             db: 数据库会话
             id: 聊天室ID
@@ -291,17 +581,7 @@ class ChatRoomRepository(RepositoryBase[ChatRoom, ChatRoomCreate, ChatRoomUpdate
         if not room:
             return None, None
         
-        # 获取最后一条消息
-        message_query = (
-            select(ChatMessage)
-            .where(ChatMessage.chat_room_id == id)
-            .order_by(desc(ChatMessage.created_at))
-            .limit(1)
-        )
-        message_result = await db.execute(message_query)
-        last_message = message_result.scalars().first()
-        
-        return room, last_message
+        return room, self.build_last_message(room)
     
     async def get_user_rooms(
         self, 
@@ -314,6 +594,8 @@ class ChatRoomRepository(RepositoryBase[ChatRoom, ChatRoomCreate, ChatRoomUpdate
         """
         获取用户参与的聊天室
         
+        只读取聊天室摘要和成员未读计数，查询代价与消息表大小无关
+        
         Args:
             db: 数据库会话
             user_id: 用户ID
@@ -323,99 +605,105 @@ class ChatRoomRepository(RepositoryBase[ChatRoom, ChatRoomCreate, ChatRoomUpdate
         Returns:
             (聊天室对象, 未读消息数, 最后一条消息)元组列表
         """
-        # 使用原生SQL以获得更好的性能和复杂查询
-        query = text("""
-            WITH room_info AS (
-                SELECT 
-                    cr.id AS room_id,
-                    cr.name,
-                    cr.is_group,
-                    cr.creator_id,
-                    cr.created_at,
-                    cr.updated_at,
-                    (
-                        SELECT COUNT(*) 
-                        FROM chat_message cm 
-                        WHERE cm.chat_room_id = cr.id 
-                        AND cm.sender_id != :user_id 
-                        AND cm.is_read = false
-                    ) AS unread_count
-                FROM 
-                    chat_room cr
-                JOIN 
-                    chat_room_member crm ON cr.id = crm.room_id
-                WHERE 
-                    crm.user_id = :user_id
-                ORDER BY 
-                    cr.updated_at DESC
-                OFFSET :skip LIMIT :limit
-            ),
-            last_messages AS (
-                SELECT DISTINCT ON (chat_room_id)
-                    chat_room_id,
-                    id,
-                    sender_id,
-                    receiver_id,
-                    content,
-                    message_type,
-                    is_read,
-                    created_at
-                FROM 
-                    chat_message
-                WHERE 
-                    chat_room_id IN (SELECT room_id FROM room_info)
-                ORDER BY 
-                    chat_room_id, created_at DESC
-            )
-            SELECT 
-                ri.*,
-                lm.id AS message_id,
-                lm.sender_id,
-                lm.receiver_id,
-                lm.content,
-                lm.message_type,
-                lm.is_read,
-                lm.created_at AS message_created_at
-            FROM 
-                room_info ri
-            LEFT JOIN 
-                last_messages lm ON ri.room_id = lm.chat_room_id
-            ORDER BY 
-                ri.updated_at DESC
-        """)
+        query = (
+            select(ChatRoom, ChatRoomMember.unread_count)
+            .join(ChatRoomMember, ChatRoomMember.room_id == ChatRoom.id)
+            .where(ChatRoomMember.user_id == user_id)
+            .order_by(desc(ChatRoom.updated_at))
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await db.execute(query)
         
-        result = await db.execute(query, {"user_id": user_id, "skip": skip, "limit": limit})
-        rows = result.all()
-        
-        rooms = []
-        for row in rows:
-            # 构建聊天室对象
-            room = ChatRoom(
-                id=row.room_id,
-                name=row.name,
-                is_group=row.is_group,
-                creator_id=row.creator_id,
-                created_at=row.created_at,
-                updated_at=row.updated_at
-            )
+        return [
+            (room, unread_count, self.build_last_message(room))
+            for room, unread_count in result.all()
+        ]
+    
+    def build_last_message(self, room: ChatRoom) -> Optional[ChatMessage]:
+        """
+        根据聊天室摘要构建最后一条消息（未绑定会话的临时对象）
+        
+        Args:
+            room: 聊天室对象
             
-            # 构建最后一条消息对象（如果有）
-            last_message = None
-            if row.message_id:
-                last_message = ChatMessage(
-                    id=row.message_id,
-                    sender_id=row.sender_id,
-                    receiver_id=row.receiver_id,
-                    content=row.content,
-                    message_type=row.message_type,
-                    is_read=row.is_read,
-                    chat_room_id=row.room_id,
-                    created_at=row.message_created_at
+        Returns:
+            最后一条消息，如聊天室还没有消息返回None
+        """
+        if not room.last_message_id:
+            return None
+        
+        return ChatMessage(
+            id=room.last_message_id,
+            sender_id=room.last_sender_id,
+            content=room.last_message_preview,
+            message_type=room.last_message_type,
+            chat_room_id=room.id,
+            created_at=room.last_message_at
+        )
+    
+    async def record_message(
+        self, 
+        db: AsyncSession, 
+        *, 
+        message: ChatMessage
+    ) -> None:
+        """
+        用新消息更新聊天室摘要，并为其他成员累加未读数
+        
+        不提交事务，由调用方与消息写入一并提交
+        
+        Args:
+            db: 数据库会话
+            message: 已flush的消息对象
+        """
+        await db.execute(
+            update(ChatRoom)
+            .where(ChatRoom.id == message.chat_room_id)
+            .values(
+                last_message_id=message.id,
+                last_sender_id=message.sender_id,
+                last_message_type=message.message_type,
+                last_message_preview=build_message_preview(message.content, message.message_type),
+                last_message_at=func.now(),
+                updated_at=func.now()
+            )
+        )
+        await db.execute(
+            update(ChatRoomMember)
+            .where(
+                and_(
+                    ChatRoomMember.room_id == message.chat_room_id,
+                    ChatRoomMember.user_id != message.sender_id
                 )
-            
-            rooms.append((room, row.unread_count, last_message))
-            
-        return rooms
+            )
+            .values(unread_count=ChatRoomMember.unread_count + 1)
+        )
+    
+    async def adjust_member_count(
+        self, 
+        db: AsyncSession, 
+        *, 
+        room_id: int,
+        delta: int,
+        commit: bool = True
+    ) -> None:
+        """
+        调整聊天室摘要中的成员数量
+        
+        Args:
+            db: 数据库会话
+            room_id: 聊天室ID
+            delta: 变化量，可为负数
+            commit: 是否提交事务，与成员增删在同一事务中时由调用方提交
+        """
+        await db.execute(
+            update(ChatRoom)
+            .where(ChatRoom.id == room_id)
+            .values(member_count=ChatRoom.member_count + delta)
+        )
+        if commit:
+            await db.commit()
     
     async def create_direct_room(
         self, 
@@ -460,7 +748,8 @@ class ChatRoomRepository(RepositoryBase[ChatRoom, ChatRoomCreate, ChatRoomUpdate
         room_data = {
             "name": None,
             "is_group": False,
-            "creator_id": user_id1
+            "creator_id": user_id1,
+            "member_count": 2
         }
         room = ChatRoom(**room_data)
         db.add(room)
@@ -578,6 +867,58 @@ class ChatRoomMemberRepository(RepositoryBase[ChatRoomMember, ChatRoomMemberCrea
         result = await db.execute(query)
         return result.scalars().all()
     
+    async def count_user_rooms(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id: int
+    ) -> int:
+        """
+        计算用户参与的聊天室数量
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            
+        Returns:
+            聊天室数量
+        """
+        query = (
+            select(func.count())
+            .select_from(ChatRoomMember)
+            .where(ChatRoomMember.user_id == user_id)
+        )
+        result = await db.execute(query)
+        return result.scalar()
+    
+    async def reset_unread(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id: int, 
+        room_id: int
+    ) -> None:
+        """
+        清零用户在聊天室的未读计数
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            room_id: 聊天室ID
+        """
+        await db.execute(
+            update(ChatRoomMember)
+            .where(
+                and_(
+                    ChatRoomMember.user_id == user_id,
+                    ChatRoomMember.room_id == room_id,
+                    ChatRoomMember.unread_count > 0
+                )
+            )
+            .values(unread_count=0)
+        )
+        await db.commit()
+    
     async def is_admin(
         self, 
         db: AsyncSession, 
@@ -609,6 +950,46 @@ class ChatRoomMemberRepository(RepositoryBase[ChatRoomMember, ChatRoomMemberCrea
         is_admin = result.scalar()
         return bool(is_admin)
     
+    async def add_member(
+        self, 
+        db: AsyncSession, 
+        *, 
+        obj_in: ChatRoomMemberCreate,
+        commit: bool = True
+    ) -> ChatRoomMember:
+        """
+        添加聊天室成员，并在同一事务中增加聊天室的成员数量
+        
+        Args:
+            db: 数据库会话
+            obj_in: 成员创建数据
+            commit: 是否提交事务，批量添加成员时由调用方统一提交
+            
+        Returns:
+            创建的成员记录
+            
+        Raises:
+            ValueError: 用户已经是聊天室成员
+        """
+        member_data = obj_in.model_dump(exclude_unset=True)
+        member_data.setdefault("join_date", datetime.now())
+        member = ChatRoomMember(**member_data)
+        try:
+            db.add(member)
+            await db.execute(
+                update(ChatRoom)
+                .where(ChatRoom.id == obj_in.room_id)
+                .values(member_count=ChatRoom.member_count + 1)
+            )
+            if commit:
+                await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise ValueError("用户已经是聊天室成员")
+        if commit:
+            await db.refresh(member)
+        return member
+    
     async def remove_member(
         self, 
         db: AsyncSession, 
@@ -617,7 +998,7 @@ class ChatRoomMemberRepository(RepositoryBase[ChatRoomMember, ChatRoomMemberCrea
         room_id: int
     ) -> bool:
         """
-        从聊天室移除成员
+        从聊天室移除成员，并在同一事务中减少聊天室的成员数量
         
         Args:
             db: 数据库会话
@@ -643,6 +1024,11 @@ class ChatRoomMemberRepository(RepositoryBase[ChatRoomMember, ChatRoomMemberCrea
             return False
             
         await db.delete(member)
+        await db.execute(
+            update(ChatRoom)
+            .where(ChatRoom.id == room_id)
+            .values(member_count=ChatRoom.member_count - 1)
+        )
         await db.commit()
         return True
     
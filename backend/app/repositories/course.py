@@ -1,9 +1,11 @@
 from typing import Optional, List
-from sqlalchemy import select, func, and_, or_
+from datetime import datetime
+from sqlalchemy import select, func, and_, or_, desc
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .base import RepositoryBase
-from ..models.course import Course
+from ..models.course import Course, CourseEnrollment
 from ..schemas.course import CourseCreate, CourseUpdate
 
 class CourseRepository(RepositoryBase[Course, CourseCreate, CourseUpdate]):
@@ -172,4 +174,82 @@ class CourseRepository(RepositoryBase[Course, CourseCreate, CourseUpdate]):
             .group_by(Course.difficulty)
         )
         result = await db.execute(query)
-        return {difficulty: count for difficulty, count in result.all()} 
\ No newline at end of file
+        return {difficulty: count for difficulty, count in result.all()}
+    
+    async def get_popular_courses(self, db: AsyncSession, limit: int = 10) -> List[Course]:
+        """
+        按报名人数和浏览数获取热门课程
+        
+        Args:
+            db: 数据库会话
+            limit: 返回数量
+            
+        Returns:
+            热门课程列表
+        """
+        query = (
+            select(Course)
+            .order_by(desc(Course.enrollment_count), desc(Course.views_count), desc(Course.created_at))
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return result.scalars().all()
+    
+    async def get_enrollment(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id: int, 
+        course_id: int
+    ) -> Optional[CourseEnrollment]:
+        """
+        获取用户的课程报名记录
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            course_id: 课程ID
+            
+        Returns:
+            报名记录，如未报名返回None
+        """
+        query = select(CourseEnrollment).where(
+            and_(
+                CourseEnrollment.user_id == user_id,
+                CourseEnrollment.course_id == course_id
+            )
+        )
+        result = await db.execute(query)
+        return result.scalars().first()
+    
+    async def create_enrollment(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id: int, 
+        course_id: int
+    ) -> Optional[CourseEnrollment]:
+        """
+        创建课程报名记录
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            course_id: 课程ID
+            
+        Returns:
+            创建的报名记录，(user_id, course_id)唯一约束冲突（并发重复报名）时返回None
+        """
+        enrollment = CourseEnrollment(
+            user_id=user_id,
+            course_id=course_id,
+            enrollment_date=datetime.now()
+        )
+        db.add(enrollment)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            return None
+        await db.refresh(enrollment)
+        return enrollment
@@ -1,20 +1,371 @@
-from typing import Optional, List, Dict, Any
-from datetime import datetime, date, timedelta
-from sqlalchemy import select, func, desc, and_, extract
+from typing import Optional, List, Dict, Any, Union
+from datetime import datetime, date, time, timedelta
+from sqlalchemy import select, insert, update, delete, func, desc, and_, case, true
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
 
+import numpy as np
+
 from .base import RepositoryBase
-from ..models.health import HealthRecord
+from ..core.downsample import bucket_aggregate, lttb
+from ..core.trend import TREND_METRICS, to_float_array, to_timestamp_array
+from ..models.health import HealthRecord, HealthDailyRollup
 from ..schemas.health import HealthRecordCreate, HealthRecordUpdate
 
+# 日汇总表中维护的数值指标
+ROLLUP_METRICS = ("heart_rate", "blood_sugar", "weight", "bmi")
+
+
 class HealthRepository(RepositoryBase[HealthRecord, HealthRecordCreate, HealthRecordUpdate]):
     """
     健康记录数据访问层
+    
+    健康记录的创建、更新、删除会在同一事务中维护日汇总表
     """
     
     def __init__(self):
         super().__init__(HealthRecord)
     
+    async def create(self, db: AsyncSession, *, obj_in: HealthRecordCreate) -> HealthRecord:
+        """
+        创建健康记录，并增量更新当天的汇总数据
+        
+        Args:
+            db: 数据库会话
+            obj_in: 健康记录创建数据
+            
+        Returns:
+            创建的健康记录
+        """
+        db_obj = HealthRecord(**obj_in.model_dump(exclude_unset=True))
+        db.add(db_obj)
+        await db.flush()
+        if db_obj.recorded_at is None:
+            # 由数据库默认值生成的记录时间需要回读
+            await db.refresh(db_obj, attribute_names=["recorded_at"])
+        
+        await self._add_to_rollup(db, record=db_obj)
+        
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+    
+    async def update(
+        self, 
+        db: AsyncSession, 
+        *, 
+        db_obj: HealthRecord, 
+        obj_in: Union[HealthRecordUpdate, Dict[str, Any]]
+    ) -> HealthRecord:
+        """
+        更新健康记录，并重算受影响日期的汇总数据
+        
+        最小值、最大值无法增量回退，因此按天重算，代价为当天的记录数
+        
+        Args:
+            db: 数据库会话
+            db_obj: 要更新的健康记录
+            obj_in: 更新数据
+            
+        Returns:
+            更新后的健康记录
+        """
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+        old_day = db_obj.recorded_at.date()
+        
+        for field in update_data:
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, update_data[field])
+        db.add(db_obj)
+        await db.flush()
+        
+        for day in {old_day, db_obj.recorded_at.date()}:
+            await self.rebuild_daily_rollup(db, user_id=db_obj.user_id, day=day)
+        
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+    
+    async def delete(self, db: AsyncSession, *, id: int) -> Optional[HealthRecord]:
+        """
+        删除健康记录，并重算当天的汇总数据
+        
+        Args:
+            db: 数据库会话
+            id: 记录ID
+            
+        Returns:
+            删除的健康记录，如未找到返回None
+        """
+        obj = await self.get(db, id)
+        if obj:
+            await db.delete(obj)
+            await db.flush()
+            await self.rebuild_daily_rollup(db, user_id=obj.user_id, day=obj.recorded_at.date())
+            await db.commit()
+        return obj
+    
+    async def create_many(self, db: AsyncSession, *, rows: List[Dict[str, Any]]) -> int:
+        """
+        批量写入健康记录，并在同一事务中重算涉及日期的汇总数据
+
+        使用executemany多行插入，各行需包含相同的字段
+
+        Args:
+            db: 数据库会话
+            rows: 记录字段字典列表，recorded_at不能为空
+
+        Returns:
+            写入的记录数
+        """
+        if not rows:
+            return 0
+
+        await db.execute(insert(HealthRecord), rows)
+
+        affected_days = {(row["user_id"], row["recorded_at"].date()) for row in rows}
+        for user_id, day in sorted(affected_days):
+            await self.rebuild_daily_rollup(db, user_id=user_id, day=day)
+
+        await db.commit()
+        return len(rows)
+
+    async def _add_to_rollup(self, db: AsyncSession, *, record: HealthRecord) -> None:
+        """
+        将一条记录累加到当天的汇总行（先UPDATE，无记录再INSERT）
+        
+        Args:
+            db: 数据库会话
+            record: 新增的健康记录
+        """
+        day = record.recorded_at.date()
+        values = {
+            "record_count": HealthDailyRollup.record_count + 1,
+            "updated_at": func.now()
+        }
+        initial = {"record_count": 1}
+        if record.blood_pressure:
+            values["blood_pressure_count"] = HealthDailyRollup.blood_pressure_count + 1
+            initial["blood_pressure_count"] = 1
+        
+        for metric in ROLLUP_METRICS:
+            value = getattr(record, metric)
+            if value is None:
+                continue
+            count_col = getattr(HealthDailyRollup, f"{metric}_count")
+            sum_col = getattr(HealthDailyRollup, f"{metric}_sum")
+            min_col = getattr(HealthDailyRollup, f"{metric}_min")
+            max_col = getattr(HealthDailyRollup, f"{metric}_max")
+            values[count_col.key] = count_col + 1
+            values[sum_col.key] = sum_col + value
+            values[min_col.key] = case((min_col.is_(None), value), (min_col > value, value), else_=min_col)
+            values[max_col.key] = case((max_col.is_(None), value), (max_col < value, value), else_=max_col)
+            initial.update({
+                count_col.key: 1,
+                sum_col.key: value,
+                min_col.key: value,
+                max_col.key: value
+            })
+        
+        stmt = (
+            update(HealthDailyRollup)
+            .where(
+                and_(
+                    HealthDailyRollup.user_id == record.user_id,
+                    HealthDailyRollup.day == day
+                )
+            )
+            .values(**values)
+        )
+        result = await db.execute(stmt)
+        if result.rowcount:
+            return
+        
+        try:
+            async with db.begin_nested():
+                db.add(HealthDailyRollup(user_id=record.user_id, day=day, **initial))
+        except IntegrityError:
+            # 并发写入时另一个事务已插入当天汇总行，改为累加
+            await db.execute(stmt)
+    
+    @staticmethod
+    def _rollup_aggregates() -> Dict[str, Any]:
+        """汇总列到原始记录聚合表达式的映射"""
+        aggregates = {
+            "record_count": func.count(HealthRecord.id),
+            "blood_pressure_count": func.count(HealthRecord.blood_pressure)
+        }
+        for metric in ROLLUP_METRICS:
+            column = getattr(HealthRecord, metric)
+            aggregates[f"{metric}_count"] = func.count(column)
+            aggregates[f"{metric}_sum"] = func.coalesce(func.sum(column), 0)
+            aggregates[f"{metric}_min"] = func.min(column)
+            aggregates[f"{metric}_max"] = func.max(column)
+        return aggregates
+    
+    async def rebuild_daily_rollup(self, db: AsyncSession, *, user_id: int, day: date) -> None:
+        """
+        根据原始记录重算某用户某一天的汇总行（不提交事务）
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            day: 日期
+        """
+        await db.execute(
+            delete(HealthDailyRollup).where(
+                and_(
+                    HealthDailyRollup.user_id == user_id,
+                    HealthDailyRollup.day == day
+                )
+            )
+        )
+        
+        start = datetime.combine(day, time.min)
+        aggregates = self._rollup_aggregates()
+        query = (
+            select(*(expr.label(name) for name, expr in aggregates.items()))
+            .where(
+                and_(
+                    HealthRecord.user_id == user_id,
+                    HealthRecord.recorded_at >= start,
+                    HealthRecord.recorded_at < start + timedelta(days=1)
+                )
+            )
+        )
+        result = await db.execute(query)
+        row = result.one()
+        if row.record_count:
+            db.add(HealthDailyRollup(user_id=user_id, day=day, **row._asdict()))
+            await db.flush()
+    
+    async def rebuild_rollups(self, db: AsyncSession, *, user_id: Optional[int] = None) -> int:
+        """
+        根据原始记录全量重建日汇总表，用于初始化或修复历史数据
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID，为None时重建所有用户
+            
+        Returns:
+            重建的汇总行数
+        """
+        delete_stmt = delete(HealthDailyRollup)
+        if user_id is not None:
+            delete_stmt = delete_stmt.where(HealthDailyRollup.user_id == user_id)
+        await db.execute(delete_stmt)
+        
+        aggregates = self._rollup_aggregates()
+        record_day = func.date(HealthRecord.recorded_at)
+        source = select(
+            HealthRecord.user_id,
+            record_day,
+            *aggregates.values()
+        ).group_by(HealthRecord.user_id, record_day)
+        if user_id is not None:
+            source = source.where(HealthRecord.user_id == user_id)
+        
+        result = await db.execute(
+            insert(HealthDailyRollup).from_select(
+                ["user_id", "day", *aggregates.keys()],
+                source
+            )
+        )
+        await db.commit()
+        return result.rowcount
+    
+    async def get_daily_rollups(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        start_date: date,
+        end_date: date
+    ) -> List[HealthDailyRollup]:
+        """
+        获取日期范围内的日汇总数据
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            start_date: 开始日期（包含）
+            end_date: 结束日期（包含）
+            
+        Returns:
+            按日期升序排列的日汇总列表
+        """
+        query = (
+            select(HealthDailyRollup)
+            .where(
+                and_(
+                    HealthDailyRollup.user_id == user_id,
+                    HealthDailyRollup.day >= start_date,
+                    HealthDailyRollup.day <= end_date
+                )
+            )
+            .order_by(HealthDailyRollup.day)
+        )
+        result = await db.execute(query)
+        return result.scalars().all()
+    
+    async def get_rollup_totals(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        start_date: date,
+        end_date: date
+    ) -> Dict[str, Any]:
+        """
+        将日期范围内的日汇总再聚合为一个周期的统计（周、月、任意区间）
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            start_date: 开始日期（包含）
+            end_date: 结束日期（包含）
+            
+        Returns:
+            周期内的记录数及各指标的次数、平均值、最小值、最大值
+        """
+        columns = [
+            func.coalesce(func.sum(HealthDailyRollup.record_count), 0).label("record_count"),
+            func.coalesce(func.sum(HealthDailyRollup.blood_pressure_count), 0).label("blood_pressure_count")
+        ]
+        for metric in ROLLUP_METRICS:
+            columns.extend([
+                func.coalesce(func.sum(getattr(HealthDailyRollup, f"{metric}_count")), 0).label(f"{metric}_count"),
+                func.sum(getattr(HealthDailyRollup, f"{metric}_sum")).label(f"{metric}_sum"),
+                func.min(getattr(HealthDailyRollup, f"{metric}_min")).label(f"{metric}_min"),
+                func.max(getattr(HealthDailyRollup, f"{metric}_max")).label(f"{metric}_max")
+            ])
+        
+        query = select(*columns).where(
+            and_(
+                HealthDailyRollup.user_id == user_id,
+                HealthDailyRollup.day >= start_date,
+                HealthDailyRollup.day <= end_date
+            )
+        )
+        result = await db.execute(query)
+        row = result.one()
+        
+        totals = {
+            "record_count": int(row.record_count),
+            "blood_pressure_count": int(row.blood_pressure_count)
+        }
+        for metric in ROLLUP_METRICS:
+            count = int(getattr(row, f"{metric}_count"))
+            total = getattr(row, f"{metric}_sum")
+            totals[metric] = {
+                "count": count,
+                "avg": float(total) / count if count else None,
+                "min": getattr(row, f"{metric}_min"),
+                "max": getattr(row, f"{metric}_max")
+            }
+        return totals
+    
     async def get_by_user_id(
         self, 
         db: AsyncSession, 
@@ -108,8 +459,113 @@ class HealthRepository(RepositoryBase[HealthRecord, HealthRecordCreate, HealthRe
         result = await db.execute(query)
         return result.scalars().first()
     
+    async def get_metric_columns(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Dict[str, List[Any]]:
+        """
+        以列式结构获取用户的健康指标数据
+
+        只查询分析需要的列，不构造ORM对象，结果按记录时间升序排列
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            start_date: 开始时间（包含）
+            end_date: 结束时间（包含）
+
+        Returns:
+            列名到数值列表的字典，包含recorded_at、weight、bmi、heart_rate、blood_sugar
+        """
+        columns = (
+            HealthRecord.recorded_at,
+            HealthRecord.weight,
+            HealthRecord.bmi,
+            HealthRecord.heart_rate,
+            HealthRecord.blood_sugar
+        )
+        conditions = [HealthRecord.user_id == user_id]
+        if start_date:
+            conditions.append(HealthRecord.recorded_at >= start_date)
+        if end_date:
+            conditions.append(HealthRecord.recorded_at <= end_date)
+
+        query = select(*columns).where(and_(*conditions)).order_by(HealthRecord.recorded_at)
+        result = await db.execute(query)
+        rows = result.all()
+
+        names = ("recorded_at", "weight", "bmi", "heart_rate", "blood_sugar")
+        if not rows:
+            return {name: [] for name in names}
+        return dict(zip(names, (list(column) for column in zip(*rows))))
+
+    async def get_downsampled_series(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        max_points: int = 200,
+        method: str = "bucket",
+        metrics: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        获取降采样后的健康指标时间序列，每个指标最多返回max_points个点
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            start_date: 开始时间（包含），同时作为时间桶的起点
+            end_date: 结束时间（包含），同时作为时间桶的终点
+            max_points: 每个指标最多返回的点数
+            method: 降采样方式，bucket为等宽时间桶聚合（平均/最小/最大值），
+                lttb为Largest-Triangle-Three-Buckets选点（返回原始数据点）
+            metrics: 需要的指标，默认全部
+            
+        Returns:
+            指标名到列式序列的字典，以及原始数据点数
+        """
+        columns = await self.get_metric_columns(db, user_id=user_id, start_date=start_date, end_date=end_date)
+        recorded_at = columns["recorded_at"]
+        timestamps = to_timestamp_array(recorded_at)
+        labels = np.asarray(recorded_at, dtype=object)
+        tz = recorded_at[0].tzinfo if recorded_at else None
+        start = start_date.timestamp() if start_date else None
+        end = end_date.timestamp() if end_date else None
+        
+        series = {}
+        for metric in metrics or TREND_METRICS:
+            values = to_float_array(columns[metric])
+            if method == "lttb":
+                mask = ~np.isnan(values)
+                selected = lttb(timestamps[mask], values[mask], max_points)
+                series[metric] = {
+                    "recorded_at": labels[mask][selected].tolist(),
+                    "value": values[mask][selected].tolist()
+                }
+            else:
+                buckets = bucket_aggregate(timestamps, values, max_points, start=start, end=end)
+                series[metric] = {
+                    "recorded_at": [datetime.fromtimestamp(ts, tz=tz) for ts in buckets["timestamp"].tolist()],
+                    "value": np.round(buckets["avg"], 2).tolist(),
+                    "min": buckets["min"].tolist(),
+                    "max": buckets["max"].tolist(),
+                    "count": buckets["count"].tolist()
+                }
+        
+        return {
+            "method": method,
+            "raw_points": len(recorded_at),
+            "series": series
+        }
+    
     async def get_statistics(
-        self, 
+        self,
         db: AsyncSession, 
         *, 
         user_id: int,
@@ -130,49 +586,45 @@ class HealthRepository(RepositoryBase[HealthRecord, HealthRecordCreate, HealthRe
         now = datetime.now()
         start_date = datetime(now.year, now.month, now.day) - timedelta(days=days)
         
-        # 获取最新记录
-        latest_record = await self.get_latest_record(db, user_id=user_id)
-        
-        # 获取平均心率
-        avg_heart_rate_query = (
-            select(func.avg(HealthRecord.heart_rate))
+        # 统计窗口内的平均值和记录数（AVG自动忽略NULL）
+        window_stats = (
+            select(
+                func.avg(HealthRecord.heart_rate).label("avg_heart_rate"),
+                func.avg(HealthRecord.blood_sugar).label("avg_blood_sugar"),
+                func.count(HealthRecord.id).label("records_count")
+            )
             .where(
                 and_(
                     HealthRecord.user_id == user_id,
-                    HealthRecord.recorded_at >= start_date,
-                    HealthRecord.heart_rate != None
+                    HealthRecord.recorded_at >= start_date
                 )
             )
+            .subquery()
         )
-        avg_heart_rate_result = await db.execute(avg_heart_rate_query)
-        avg_heart_rate = avg_heart_rate_result.scalar()
         
-        # 获取平均血糖
-        avg_blood_sugar_query = (
-            select(func.avg(HealthRecord.blood_sugar))
-            .where(
-                and_(
-                    HealthRecord.user_id == user_id,
-                    HealthRecord.recorded_at >= start_date,
-                    HealthRecord.blood_sugar != None
-                )
-            )
+        # 最新一条记录（不受统计窗口限制）
+        latest_subquery = (
+            select(HealthRecord)
+            .where(HealthRecord.user_id == user_id)
+            .order_by(desc(HealthRecord.recorded_at))
+            .limit(1)
+            .subquery()
         )
-        avg_blood_sugar_result = await db.execute(avg_blood_sugar_query)
-        avg_blood_sugar = avg_blood_sugar_result.scalar()
+        latest = aliased(HealthRecord, latest_subquery)
         
-        # 获取记录数量
-        count_query = (
-            select(func.count())
-            .where(
-                and_(
-                    HealthRecord.user_id == user_id,
-                    HealthRecord.recorded_at >= start_date
-                )
+        # 聚合结果恒为一行，左连接最新记录，一次往返取回全部数据
+        query = (
+            select(
+                window_stats.c.avg_heart_rate,
+                window_stats.c.avg_blood_sugar,
+                window_stats.c.records_count,
+                latest
             )
+            .select_from(window_stats)
+            .outerjoin(latest, true())
         )
-        count_result = await db.execute(count_query)
-        records_count = count_result.scalar()
+        result = await db.execute(query)
+        avg_heart_rate, avg_blood_sugar, records_count, latest_record = result.one()
         
         # 构建统计数据
         statistics = {
@@ -180,7 +632,7 @@ class HealthRepository(RepositoryBase[HealthRecord, HealthRecordCreate, HealthRe
             "avg_blood_sugar": float(avg_blood_sugar) if avg_blood_sugar else None,
             "latest_weight": float(latest_record.weight) if latest_record and latest_record.weight else None,
             "latest_bmi": float(latest_record.bmi) if latest_record and latest_record.bmi else None,
-            "records_count": records_count,
+            "records_count": records_count or 0,
             "latest_record": latest_record
         }
         
@@ -195,7 +647,7 @@ class HealthRepository(RepositoryBase[HealthRecord, HealthRecordCreate, HealthRe
         month: int
     ) -> List[Dict[str, Any]]:
         """
-        获取月度健康记录摘要
+        获取月度健康记录摘要（读取日汇总表）
         
         Args:
             db: 数据库会话
@@ -206,33 +658,19 @@ class HealthRepository(RepositoryBase[HealthRecord, HealthRecordCreate, HealthRe
         Returns:
             月度健康记录摘要列表
         """
-        query = (
-            select(
-                func.date(HealthRecord.recorded_at).label("record_date"),
-                func.avg(HealthRecord.heart_rate).label("avg_heart_rate"),
-                func.avg(HealthRecord.blood_sugar).label("avg_blood_sugar"),
-                func.avg(HealthRecord.weight).label("avg_weight")
-            )
-            .where(
-                and_(
-                    HealthRecord.user_id == user_id,
-                    extract('year', HealthRecord.recorded_at) == year,
-                    extract('month', HealthRecord.recorded_at) == month
-                )
-            )
-            .group_by(func.date(HealthRecord.recorded_at))
-            .order_by(func.date(HealthRecord.recorded_at))
-        )
-        
-        result = await db.execute(query)
+        if not 1 <= month <= 12:
+            return []
+        start_date = date(year, month, 1)
+        end_date = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+        rollups = await self.get_daily_rollups(db, user_id=user_id, start_date=start_date, end_date=end_date)
         
         summary = []
-        for row in result:
+        for rollup in rollups:
             summary.append({
-                "date": row.record_date,
-                "avg_heart_rate": float(row.avg_heart_rate) if row.avg_heart_rate else None,
-                "avg_blood_sugar": float(row.avg_blood_sugar) if row.avg_blood_sugar else None,
-                "avg_weight": float(row.avg_weight) if row.avg_weight else None
+                "date": rollup.day,
+                "avg_heart_rate": rollup.heart_rate_sum / rollup.heart_rate_count if rollup.heart_rate_count else None,
+                "avg_blood_sugar": rollup.blood_sugar_sum / rollup.blood_sugar_count if rollup.blood_sugar_count else None,
+                "avg_weight": rollup.weight_sum / rollup.weight_count if rollup.weight_count else None
             })
             
-        return summary 
\ No newline at end of file
+        return summary
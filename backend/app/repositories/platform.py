@@ -0,0 +1,103 @@
+from typing import Dict, Iterable
+from sqlalchemy import select, insert, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.counters import counter_aggregator
+from ..models.platform import PlatformCounter, PlatformCounterKey
+from ..models.user import User
+from ..models.course import Course
+from ..models.challenge import Challenge
+from ..models.health import HealthRecord
+from ..models.social import Post
+
+
+class PlatformCounterRepository:
+    """
+    平台计数数据访问层
+
+    创建、删除时的增减经写回式计数器合并后定期写回，读取总数只查询platform_counters的几行
+    """
+
+    @staticmethod
+    def _count_query(key: PlatformCounterKey):
+        if key == PlatformCounterKey.USERS:
+            return select(func.count()).select_from(User)
+        if key == PlatformCounterKey.ACTIVE_USERS:
+            return select(func.count()).select_from(User).where(User.is_active.is_(True))
+        model = {
+            PlatformCounterKey.COURSES: Course,
+            PlatformCounterKey.CHALLENGES: Challenge,
+            PlatformCounterKey.HEALTH_RECORDS: HealthRecord,
+            PlatformCounterKey.POSTS: Post
+        }[key]
+        return select(func.count()).select_from(model)
+
+    async def _count(self, db: AsyncSession, keys: Iterable[PlatformCounterKey]) -> Dict[PlatformCounterKey, int]:
+        return {key: (await db.execute(self._count_query(key))).scalar_one() for key in keys}
+
+    def adjust(self, key: PlatformCounterKey, delta: int = 1) -> None:
+        """
+        记录计数项的增减，在创建或删除提交成功后调用
+
+        Args:
+            key: 计数项
+            delta: 增量，可为负数
+        """
+        counter_aggregator.increment(PlatformCounter.value, int(key), delta)
+
+    async def get_counts(self, db: AsyncSession) -> Dict[PlatformCounterKey, int]:
+        """
+        获取所有计数项的当前值
+
+        计数行不存在时（新部署或新增计数项）按count(*)初始化一次。初始化前先写回待写回的增量，
+        这些增量对应的记录已提交、已包含在count(*)中，写回时计数行尚不存在，不会被重复累加
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            计数项 -> 值
+        """
+        result = await db.execute(select(PlatformCounter.id, PlatformCounter.value))
+        counts = {row.id: row.value for row in result.all()}
+
+        missing = [key for key in PlatformCounterKey if key not in counts]
+        if missing:
+            await counter_aggregator.flush()
+            initial = await self._count(db, missing)
+            for key, value in initial.items():
+                try:
+                    async with db.begin_nested():
+                        await db.execute(
+                            insert(PlatformCounter).values(id=int(key), name=key.name.lower(), value=value)
+                        )
+                except IntegrityError:
+                    # 其他请求已初始化
+                    pass
+            await db.commit()
+            counts.update(initial)
+
+        return {key: counts[key] for key in PlatformCounterKey}
+
+    async def rebuild(self, db: AsyncSession) -> Dict[PlatformCounterKey, int]:
+        """
+        按count(*)重新计算所有计数项，用于修复进程异常退出丢失增量等原因造成的偏差
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            计数项 -> 重新计算后的值
+        """
+        counts = await self._count(db, PlatformCounterKey)
+        for key, value in counts.items():
+            result = await db.execute(
+                update(PlatformCounter).where(PlatformCounter.id == int(key)).values(value=value)
+            )
+            if not result.rowcount:
+                await db.execute(
+                    insert(PlatformCounter).values(id=int(key), name=key.name.lower(), value=value)
+                )
+        await db.commit()
+        return counts
@@ -1,9 +1,15 @@
-from typing import List, Optional
-from sqlalchemy import and_, or_, desc, asc, func, select
+from typing import Any, Dict, List, Optional, Tuple
+from enum import Enum
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import and_, or_, desc, asc, func, select, insert, update, delete, literal, bindparam
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from .base import RepositoryBase
+from ..core.feed import FeedEntry
+from ..core.counters import counter_aggregator
+from ..core.hot_score import hot_score
 from ..models.social import Post, PostComment, PostLike, HeritageProject, HeritageInheritor
 from ..schemas.social import (
     PostCreate, PostUpdate, PostCommentCreate, PostCommentUpdate,
@@ -54,6 +60,80 @@ class PostRepository(RepositoryBase[Post, PostCreate, PostUpdate]):
         result = await db.execute(query.offset(skip).limit(limit))
         return result.scalars().all()
     
+    async def get_posts_by_ids(self, db: AsyncSession, post_ids: List[int]) -> List[Post]:
+        """按给定ID顺序获取带用户信息的动态"""
+        if not post_ids:
+            return []
+        query = select(self.model).options(selectinload(Post.user)).where(Post.id.in_(post_ids))
+        result = await db.execute(query)
+        posts = {post.id: post for post in result.scalars().all()}
+        return [posts[post_id] for post_id in post_ids if post_id in posts]
+    
+    async def get_feed_entries(self, db: AsyncSession, post_id: Optional[int] = None) -> List[FeedEntry]:
+        """获取动态的信息流排序和筛选属性，post_id为None时获取全部"""
+        from ..models.user import User
+        
+        query = select(
+            Post.id, Post.is_featured, Post.created_at, Post.post_type, User.role, Post.is_public
+        ).join(User, User.id == Post.user_id)
+        if post_id is not None:
+            query = query.where(Post.id == post_id)
+        result = await db.execute(query)
+        return [
+            FeedEntry(
+                post_id=row_id,
+                is_featured=bool(is_featured),
+                created_at=created_at.timestamp() if created_at else 0.0,
+                post_type=post_type.value if isinstance(post_type, Enum) else post_type,
+                user_role=role.value if isinstance(role, Enum) else role,
+                is_public=bool(is_public)
+            )
+            for row_id, is_featured, created_at, post_type, role, is_public in result.all()
+        ]
+    
+    async def get_user_activity_counts(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict[str, int]:
+        """
+        用一条带日期范围的聚合查询统计用户的动态数、评论数、点赞数和动态获得的点赞数
+        
+        Returns:
+            包含posts、comments、likes、received_likes的字典
+        """
+        def bounded(query, column):
+            # 按半开区间比较，created_at上的索引可用
+            if start_date:
+                query = query.where(column >= datetime.combine(start_date, time.min))
+            if end_date:
+                query = query.where(column < datetime.combine(end_date + timedelta(days=1), time.min))
+            return query
+        
+        query = select(
+            bounded(
+                select(func.count(Post.id)).where(Post.user_id == user_id), Post.created_at
+            ).scalar_subquery().label("posts"),
+            bounded(
+                select(func.count(PostComment.id)).where(PostComment.user_id == user_id), PostComment.created_at
+            ).scalar_subquery().label("comments"),
+            bounded(
+                select(func.count(PostLike.id)).where(PostLike.user_id == user_id), PostLike.created_at
+            ).scalar_subquery().label("likes"),
+            bounded(
+                select(func.coalesce(func.sum(Post.likes_count), 0)).where(Post.user_id == user_id), Post.created_at
+            ).scalar_subquery().label("received_likes")
+        )
+        row = (await db.execute(query)).one()
+        return {
+            "posts": row.posts or 0,
+            "comments": row.comments or 0,
+            "likes": row.likes or 0,
+            "received_likes": int(row.received_likes or 0)
+        }
+    
     async def get_posts_by_user(
         self, 
         db: AsyncSession, 
@@ -85,33 +165,89 @@ class PostRepository(RepositoryBase[Post, PostCreate, PostUpdate]):
             await db.refresh(post)
         return post
     
-    async def increment_likes_count(self, db: AsyncSession, post_id: int):
-        """增加点赞数"""
-        post = await self.get(db, post_id)
-        if post:
-            post.likes_count = (post.likes_count or 0) + 1
+    async def _adjust_counter(
+        self,
+        db: AsyncSession,
+        post_id: int,
+        column,
+        delta: int,
+        commit: bool
+    ) -> bool:
+        """在数据库端原子地增减计数列，减少时不低于0"""
+        stmt = update(Post).where(Post.id == post_id)
+        if delta < 0:
+            stmt = stmt.where(column > 0)
+        stmt = stmt.values({column: func.coalesce(column, 0) + delta}).execution_options(synchronize_session=False)
+        result = await db.execute(stmt)
+        if result.rowcount:
+            await self.refresh_hot_scores(db, [post_id])
+        if commit:
             await db.commit()
+        return result.rowcount > 0
     
-    async def decrement_likes_count(self, db: AsyncSession, post_id: int):
-        """减少点赞数"""
-        post = await self.get(db, post_id)
-        if post and (post.likes_count or 0) > 0:
-            post.likes_count = post.likes_count - 1
-            await db.commit()
+    async def refresh_hot_scores(self, db: AsyncSession, post_ids: List[int]) -> None:
+        """根据当前点赞数、评论数重新计算动态的热度分，不提交事务"""
+        if not post_ids:
+            return
+        result = await db.execute(
+            select(Post.id, Post.likes_count, Post.comments_count, Post.created_at).where(Post.id.in_(post_ids))
+        )
+        params = [
+            {"post_id": post_id, "score": hot_score(likes_count, comments_count, created_at)}
+            for post_id, likes_count, comments_count, created_at in result.all()
+        ]
+        if params:
+            table = Post.__table__
+            await db.execute(
+                update(table).where(table.c.id == bindparam("post_id")).values(hot_score=bindparam("score")),
+                params
+            )
     
-    async def increment_comments_count(self, db: AsyncSession, post_id: int):
-        """增加评论数"""
-        post = await self.get(db, post_id)
-        if post:
-            post.comments_count = (post.comments_count or 0) + 1
-            await db.commit()
+    async def get_hot_posts(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 20,
+        post_type: Optional[str] = None,
+        user_role: Optional[str] = None,
+        is_public: Optional[bool] = None,
+        is_featured: Optional[bool] = None,
+        user_id: Optional[int] = None
+    ) -> List[Post]:
+        """按热度分倒序获取动态列表，走hot_score索引"""
+        from ..models.user import User
+        
+        query = select(self.model).options(selectinload(Post.user))
+        if post_type:
+            query = query.where(Post.post_type == post_type)
+        if user_role:
+            query = query.join(User).where(User.role == user_role)
+        if is_public is not None:
+            query = query.where(Post.is_public == is_public)
+        if is_featured is not None:
+            query = query.where(Post.is_featured == is_featured)
+        if user_id:
+            query = query.where(Post.user_id == user_id)
+        
+        query = query.order_by(desc(Post.hot_score), desc(Post.id))
+        result = await db.execute(query.offset(skip).limit(limit))
+        return result.scalars().all()
     
-    async def decrement_comments_count(self, db: AsyncSession, post_id: int):
-        """减少评论数"""
-        post = await self.get(db, post_id)
-        if post and (post.comments_count or 0) > 0:
-            post.comments_count = post.comments_count - 1
-            await db.commit()
+    async def increment_likes_count(self, db: AsyncSession, post_id: int, commit: bool = True) -> bool:
+        """增加点赞数，commit为False时由调用方提交事务"""
+        return await self._adjust_counter(db, post_id, Post.likes_count, 1, commit)
+    
+    async def decrement_likes_count(self, db: AsyncSession, post_id: int, commit: bool = True) -> bool:
+        """减少点赞数，commit为False时由调用方提交事务"""
+        return await self._adjust_counter(db, post_id, Post.likes_count, -1, commit)
+    
+    async def increment_comments_count(self, db: AsyncSession, post_id: int, commit: bool = True) -> bool:
+        """增加评论数，commit为False时由调用方提交事务"""
+        return await self._adjust_counter(db, post_id, Post.comments_count, 1, commit)
+    
+    async def decrement_comments_count(self, db: AsyncSession, post_id: int, commit: bool = True) -> bool:
+        """减少评论数，commit为False时由调用方提交事务"""
+        return await self._adjust_counter(db, post_id, Post.comments_count, -1, commit)
 
     async def get_total_count(
         self,
@@ -143,6 +279,10 @@ class PostRepository(RepositoryBase[Post, PostCreate, PostUpdate]):
         return result.scalar() or 0
 
 
+# 点赞数写回后刷新对应动态的热度分
+counter_aggregator.add_flush_hook(Post.likes_count, PostRepository().refresh_hot_scores)
+
+
 class PostCommentRepository(RepositoryBase[PostComment, PostCommentCreate, PostCommentUpdate]):
     """动态评论Repository"""
     
@@ -174,6 +314,66 @@ class PostCommentRepository(RepositoryBase[PostComment, PostCommentCreate, PostC
         query = query.order_by(asc(PostComment.created_at))
         result = await db.execute(query)
         return result.scalars().all()
+    
+    async def get_comment_tree(
+        self, 
+        db: AsyncSession, 
+        post_id: int, 
+        skip: int = 0, 
+        limit: int = 50
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        一次查询取出动态的全部评论和回复，在内存中O(n)组装成树
+        
+        顶层评论按时间倒序分页，各级回复按时间正序嵌套在replies中
+        
+        Returns:
+            (本页顶层评论列表, 顶层评论总数)
+        """
+        from ..models.user import User
+        
+        query = (
+            select(
+                PostComment.id,
+                PostComment.post_id,
+                PostComment.user_id,
+                PostComment.parent_id,
+                PostComment.content,
+                PostComment.created_at,
+                User.username,
+                User.nickname,
+                User.avatar
+            )
+            .outerjoin(User, User.id == PostComment.user_id)
+            .where(PostComment.post_id == post_id)
+            .order_by(asc(PostComment.created_at), asc(PostComment.id))
+        )
+        result = await db.execute(query)
+        
+        nodes: Dict[int, Dict[str, Any]] = {}
+        for row in result:
+            nodes[row.id] = {
+                "id": row.id,
+                "post_id": row.post_id,
+                "user_id": row.user_id,
+                "parent_id": row.parent_id,
+                "content": row.content,
+                "created_at": row.created_at,
+                "user": {"id": row.user_id, "username": row.username, "nickname": row.nickname, "avatar": row.avatar},
+                "replies": []
+            }
+        
+        # 按时间正序挂到父评论下，父评论不存在的按顶层评论处理
+        roots = []
+        for node in nodes.values():
+            parent = nodes.get(node["parent_id"]) if node["parent_id"] is not None else None
+            if parent is not None and parent is not node:
+                parent["replies"].append(node)
+            else:
+                roots.append(node)
+        
+        roots.reverse()
+        return roots[skip:skip + limit], len(roots)
 
 
 class PostLikeRepository(RepositoryBase[PostLike, PostLikeCreate, PostLikeUpdate]):
@@ -221,6 +421,35 @@ class PostLikeRepository(RepositoryBase[PostLike, PostLikeCreate, PostLikeUpdate
         await db.delete(like)
         await db.commit()
         return True
+    
+    async def remove_like(self, db: AsyncSession, user_id: int, post_id: int) -> bool:
+        """删除点赞记录，不提交事务"""
+        result = await db.execute(
+            delete(PostLike).where(and_(PostLike.user_id == user_id, PostLike.post_id == post_id))
+        )
+        return result.rowcount > 0
+    
+    async def add_like(self, db: AsyncSession, user_id: int, post_id: int) -> Optional[bool]:
+        """
+        用INSERT ... SELECT添加点赞记录，不提交事务
+        
+        Returns:
+            是否新增了点赞；(post_id, user_id)唯一约束冲突（并发重复点赞）时返回False，动态不存在返回None
+        """
+        now = datetime.utcnow()
+        source = select(
+            Post.id,
+            literal(user_id),
+            literal(now, PostLike.created_at.type),
+            literal(now, PostLike.updated_at.type)
+        ).where(Post.id == post_id)
+        stmt = insert(PostLike).from_select(["post_id", "user_id", "created_at", "updated_at"], source)
+        try:
+            async with db.begin_nested():
+                result = await db.execute(stmt)
+        except IntegrityError:
+            return False
+        return True if result.rowcount else None
 
 
 class HeritageProjectRepository(RepositoryBase[HeritageProject, HeritageProjectCreate, HeritageProjectUpdate]):
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -42,6 +42,27 @@ class UserRepository(RepositoryBase[User, UserCreate, UserUpdate]):
         result = await db.execute(select(User).where(User.username == username))
         return result.scalars().first()
     
+    async def get_profiles_by_ids(self, db: AsyncSession, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        批量获取用户的展示信息（用户名、昵称、头像）
+        
+        Args:
+            db: 数据库会话
+            user_ids: 用户ID列表
+            
+        Returns:
+            用户ID到展示信息的字典
+        """
+        if not user_ids:
+            return {}
+        result = await db.execute(
+            select(User.id, User.username, User.nickname, User.avatar).where(User.id.in_(user_ids))
+        )
+        return {
+            row.id: {"username": row.username, "nickname": row.nickname, "avatar": row.avatar}
+            for row in result
+        }
+    
     async def get_active_users(
         self, 
         db: AsyncSession, 
@@ -57,7 +57,7 @@ class ChallengePublic(ChallengeBase):
     id: int = Field(..., description="挑战ID")
     is_active: bool = Field(..., description="是否激活")
     created_at: datetime = Field(..., description="创建时间")
-    participants_count: int = Field(0, description="参与人数")
+    participants_count: int = Field(0, validation_alias="participant_count", description="参与人数")
     is_joined: Optional[bool] = Field(None, description="当前用户是否参与")
 
 class ChallengeParticipantBase(BaseSchema):
@@ -76,6 +76,8 @@ class ChatRoomPublic(ChatRoomBase):
     created_at: datetime = Field(..., description="创建时间")
     member_count: int = Field(0, description="成员数量")
     last_message: Optional[ChatMessagePublic] = Field(None, description="最新消息")
+    last_message_preview: Optional[str] = Field(None, description="最新消息预览")
+    last_message_at: Optional[datetime] = Field(None, description="最新消息时间")
     creator: UserPublic = Field(..., description="创建者信息")
 
 class ChatRoomMemberBase(BaseSchema):
@@ -61,6 +61,8 @@ class CoursePublic(CourseBase):
     video_url: Optional[str] = Field(None, description="视频URL")
     created_at: datetime = Field(..., description="创建时间")
     instructor_id: Optional[int] = Field(None, description="讲师ID")
+    enrollment_count: int = Field(0, description="报名人数")
+    views_count: int = Field(0, description="浏览数")
 
 class CourseEnrollmentBase(BaseSchema):
     """课程报名基础模型"""
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import Field, field_validator
+from typing import Any, Dict, List, Optional
+from pydantic import Field, field_validator, model_validator
 
 from .base import BaseSchema
 
@@ -79,4 +79,36 @@ class HealthStatistics(BaseSchema):
     latest_weight: Optional[float] = Field(None, description="最新体重")
     latest_bmi: Optional[float] = Field(None, description="最新BMI")
     records_count: int = Field(..., description="记录数量")
-    latest_record: Optional[HealthRecordPublic] = Field(None, description="最新记录") 
\ No newline at end of file
+    latest_record: Optional[HealthRecordPublic] = Field(None, description="最新记录")
+
+class HealthRecordBatch(BaseSchema):
+    """
+    批量导入健康记录的列式请求模型
+
+    各指标列与recorded_at等长，缺失值用null表示，未提供的列视为全部缺失
+    """
+    user_id: int = Field(..., description="用户ID")
+    recorded_at: List[datetime] = Field(..., min_length=1, description="记录时间列")
+    blood_pressure: Optional[List[Optional[str]]] = Field(None, description="血压列，格式: '120/80'")
+    heart_rate: Optional[List[Optional[int]]] = Field(None, description="心率列")
+    blood_sugar: Optional[List[Optional[float]]] = Field(None, description="血糖列")
+    weight: Optional[List[Optional[float]]] = Field(None, description="体重列(kg)")
+    height: Optional[List[Optional[float]]] = Field(None, description="身高列(cm)")
+    bmi: Optional[List[Optional[float]]] = Field(None, description="BMI列")
+
+    @model_validator(mode="after")
+    def validate_lengths(self):
+        """验证各列长度一致"""
+        size = len(self.recorded_at)
+        for name in ("blood_pressure", "heart_rate", "blood_sugar", "weight", "height", "bmi"):
+            column = getattr(self, name)
+            if column is not None and len(column) != size:
+                raise ValueError(f"{name}列长度({len(column)})与recorded_at列长度({size})不一致")
+        return self
+
+class HealthRecordBatchResult(BaseSchema):
+    """批量导入健康记录的结果"""
+    inserted: int = Field(..., description="成功写入的记录数")
+    rejected: int = Field(..., description="校验失败被拒绝的记录数")
+    errors: List[Dict[str, Any]] = Field(default_factory=list, description="部分校验错误（行号、字段、原因）")
+
@@ -39,6 +39,7 @@ class PostPublic(PostBase):
     user_id: int = Field(..., description="发布者ID")
     likes_count: int = Field(..., description="点赞数")
     comments_count: int = Field(..., description="评论数")
+    views_count: int = Field(0, description="浏览数")
     shares_count: int = Field(..., description="分享数")
     created_at: datetime = Field(..., description="创建时间")
     updated_at: datetime = Field(..., description="更新时间")
@@ -7,6 +7,7 @@ from .prescription_service import PrescriptionService
 from .challenge_service import ChallengeService
 from .chat_service import ChatService
 from .ai_service import AIService
+from .platform_counter_service import PlatformCounterService
 
 # 实例化服务
 user_service = UserService()
@@ -16,4 +17,5 @@ health_service = HealthService()
 prescription_service = PrescriptionService()
 challenge_service = ChallengeService()
 chat_service = ChatService()
-ai_service = AIService() 
\ No newline at end of file
+ai_service = AIService()
+platform_counter_service = PlatformCounterService() 
\ No newline at end of file
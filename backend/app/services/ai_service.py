@@ -41,20 +41,17 @@ class AIService:
         Returns:
             分析结果
         """
-        # 获取用户健康数据
-        health_records = await health_repository.get_by_user_id(db, user_id=user_id)
-        if not health_records:
+        # 获取健康统计数据
+        health_stats = await health_repository.get_statistics(db, user_id=user_id, days=days)
+        if not health_stats["latest_record"]:
             return {
                 "status": "error",
                 "message": "没有健康记录数据",
                 "data": None
             }
         
-        # 获取健康统计数据
-        health_stats = await health_repository.get_statistics(db, user_id=user_id, days=days)
-        
-        # 使用健康服务分析趋势
-        trend_analysis = self.health_service.analyze_health_trend(health_records)
+        # 使用健康服务分析趋势（列式查询，不加载完整记录）
+        trend_analysis = await self.health_service.analyze_user_health_trend(db, user_id=user_id, days=days)
         
         # 构建分析结果
         analysis_result = {
@@ -2,12 +2,15 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from passlib.context import CryptContext
 from jose import jwt
 
 from ..core.config import settings
+from ..core.security import pwd_context, verify_password_async, get_password_hash_async
+from ..core.rate_limit import check_login_rate
+from ..core.exceptions import TooManyRequestsException
 from ..models.user import User
-from ..repositories import user_repository
+from ..models.platform import PlatformCounterKey
+from ..repositories import user_repository, platform_counter_repository
 from ..schemas.user import UserCreate, UserUpdate, TokenResponse, UserPublic
 
 class AuthService:
@@ -19,11 +22,11 @@ class AuthService:
         """
         初始化认证服务
         """
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.pwd_context = pwd_context
         
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """
-        验证密码
+        验证密码（在密码哈希线程池中执行）
         
         Args:
             plain_password: 明文密码
@@ -32,11 +35,11 @@ class AuthService:
         Returns:
             验证是否成功
         """
-        return self.pwd_context.verify(plain_password, hashed_password)
+        return await verify_password_async(plain_password, hashed_password)
     
-    def get_password_hash(self, password: str) -> str:
+    async def get_password_hash(self, password: str) -> str:
         """
-        获取密码哈希
+        获取密码哈希（在密码哈希线程池中执行）
         
         Args:
             password: 明文密码
@@ -44,12 +47,13 @@ class AuthService:
         Returns:
             密码哈希
         """
-        return self.pwd_context.hash(password)
+        return await get_password_hash_async(password)
     
     def create_access_token(
         self, 
         subject: int, 
-        expires_delta: Optional[timedelta] = None
+        expires_delta: Optional[timedelta] = None,
+        token_version: int = 0
     ) -> str:
         """
         创建访问令牌
@@ -57,6 +61,7 @@ class AuthService:
         Args:
             subject: 令牌主题（通常是用户ID）
             expires_delta: 有效期
+            token_version: 用户令牌版本，版本变化后旧令牌失效
             
         Returns:
             JWT令牌
@@ -66,7 +71,7 @@ class AuthService:
         else:
             expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
             
-        to_encode = {"exp": expire, "sub": str(subject)}
+        to_encode = {"exp": expire, "sub": str(subject), "ver": token_version}
         encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
         return encoded_jwt
     
@@ -90,7 +95,7 @@ class AuthService:
         user = await user_repository.get_by_username(db, username)
         if not user:
             return None
-        if not self.verify_password(password, user.hashed_password):
+        if not await self.verify_password(password, user.hashed_password):
             return None
         return user
     
@@ -98,19 +103,33 @@ class AuthService:
         self, 
         db: AsyncSession, 
         username: str, 
-        password: str
+        password: str,
+        client_ip: Optional[str] = None
     ) -> Optional[TokenResponse]:
         """
         用户登录
         
+        先按用户名和IP限流，被拒绝的请求不会查询数据库或计算bcrypt
+        
         Args:
             db: 数据库会话
             username: 用户名
             password: 密码
+            client_ip: 客户端IP
             
         Returns:
             登录成功返回令牌信息，否则返回None
+            
+        Raises:
+            TooManyRequestsException: 登录尝试过于频繁
         """
+        if not username or not password:
+            return None
+        
+        allowed, retry_after = await check_login_rate(username, client_ip)
+        if not allowed:
+            raise TooManyRequestsException("登录尝试过于频繁，请稍后再试", retry_after=retry_after)
+        
         user = await self.authenticate_user(db, username, password)
         if not user:
             return None
@@ -118,7 +137,8 @@ class AuthService:
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = self.create_access_token(
             subject=user.id,
-            expires_delta=access_token_expires
+            expires_delta=access_token_expires,
+            token_version=user.token_version or 0
         )
         
         # 确保role和unique_id有值
@@ -173,11 +193,16 @@ class AuthService:
             raise ValueError("邮箱已被注册")
             
         # 哈希密码
-        hashed_password = self.get_password_hash(user_in.password)
+        hashed_password = await self.get_password_hash(user_in.password)
         
         # 创建用户
         user_data = user_in.model_dump(exclude={"password"})
         user_data["hashed_password"] = hashed_password
         
         user = await user_repository.create(db, obj_in=UserUpdate(**user_data))
+        
+        # 更新平台用户计数
+        platform_counter_repository.adjust(PlatformCounterKey.USERS, 1)
+        if user.is_active:
+            platform_counter_repository.adjust(PlatformCounterKey.ACTIVE_USERS, 1)
         return user 
\ No newline at end of file
@@ -3,11 +3,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, date, timedelta
 
 from .base_service import BaseService
+from ..core.leaderboard import ChallengeLeaderboard, LeaderboardEntry, leaderboard_registry
 from ..models.challenge import Challenge, challenge_participants, ChallengeRecord
+from ..models.platform import PlatformCounterKey
 from ..repositories import (
     challenge_repository, 
     challenge_participant_repository,
-    challenge_record_repository
+    challenge_record_repository,
+    user_repository,
+    platform_counter_repository
 )
 from ..schemas.challenge import (
     ChallengeCreate, ChallengeUpdate,
@@ -28,6 +32,38 @@ class ChallengeService(BaseService[Challenge, ChallengeCreate, ChallengeUpdate])
         self.participant_repository = challenge_participant_repository
         self.record_repository = challenge_record_repository
     
+    async def create(self, db: AsyncSession, *, obj_in: ChallengeCreate) -> Challenge:
+        """
+        创建挑战，并更新平台挑战计数
+        
+        Args:
+            db: 数据库会话
+            obj_in: 挑战创建数据
+            
+        Returns:
+            创建的挑战
+        """
+        challenge = await super().create(db, obj_in=obj_in)
+        platform_counter_repository.adjust(PlatformCounterKey.CHALLENGES, 1)
+        return challenge
+    
+    async def delete(self, db: AsyncSession, *, id: int) -> Optional[Challenge]:
+        """
+        删除挑战，丢弃其进程内排行榜，并更新平台挑战计数
+        
+        Args:
+            db: 数据库会话
+            id: 挑战ID
+            
+        Returns:
+            删除的挑战，如未找到返回None
+        """
+        challenge = await super().delete(db, id=id)
+        leaderboard_registry.invalidate(id)
+        if challenge:
+            platform_counter_repository.adjust(PlatformCounterKey.CHALLENGES, -1)
+        return challenge
+    
     async def get_active_challenges(
         self, 
         db: AsyncSession, 
@@ -193,15 +229,10 @@ class ChallengeService(BaseService[Challenge, ChallengeCreate, ChallengeUpdate])
             raise ValueError("已经参与该挑战")
             
         # 检查是否达到最大参与人数
-        if challenge.max_participants:
-            participant_count = await self.participant_repository.count_participants(
-                db, 
-                challenge_id=challenge_id
-            )
-            if participant_count >= challenge.max_participants:
-                raise ValueError("挑战已达到最大参与人数")
+        if challenge.max_participants and challenge.participant_count >= challenge.max_participants:
+            raise ValueError("挑战已达到最大参与人数")
                 
-        # 创建参与记录
+        # 创建参与记录，人数上限在更新参与人数时再次原子校验
         participant_data = ChallengeParticipantCreate(
             user_id=user_id,
             challenge_id=challenge_id
@@ -324,50 +355,32 @@ class ChallengeService(BaseService[Challenge, ChallengeCreate, ChallengeUpdate])
         Returns:
             打卡记录
         """
-        # 检查用户是否已参与挑战
-        is_joined = await self.repository.check_user_joined(
-            db, 
-            challenge_id=challenge_id, 
-            user_id=user_id
-        )
+        record_data = record_in.model_dump(exclude={"user_id", "challenge_id"})
+        if not record_data.get("check_in_date"):
+            record_data["check_in_date"] = datetime.now()
         
-        if not is_joined:
-            raise ValueError("未参与该挑战")
-            
-        # 检查挑战是否活跃
-        challenge = await self.repository.get(db, challenge_id)
-        if not challenge or not challenge.is_active:
-            raise ValueError("挑战已结束或被禁用")
-            
-        # 检查今日是否已打卡
-        today = datetime.now().date()
-        today_record = await self.record_repository.get_by_date(
+        # 参与校验、活跃校验、积分计算和插入在一条语句中完成，重复打卡由唯一约束拦截
+        record = await self.record_repository.create_check_in(
             db, 
             user_id=user_id, 
             challenge_id=challenge_id,
-            check_in_date=today
+            values=record_data
         )
         
-        if today_record:
-            raise ValueError("今日已打卡")
-            
-        # 创建打卡记录
-        record_data = record_in.model_dump()
-        if not record_data.get("user_id"):
-            record_data["user_id"] = user_id
-        record_data["challenge_id"] = challenge_id
-        if not record_data.get("check_in_date"):
-            record_data["check_in_date"] = datetime.now()
-            
-        # 计算积分奖励
-        if record_data.get("completed", True) and not record_data.get("points_earned"):
-            # 默认给予挑战设置的奖励积分
-            record_data["points_earned"] = challenge.reward_points
-            
-        record = await self.record_repository.create(
-            db, 
-            obj_in=ChallengeRecordCreate(**record_data)
-        )
+        if record is None:
+            # 仅在失败时查询具体原因
+            is_joined = await self.repository.check_user_joined(
+                db, 
+                challenge_id=challenge_id, 
+                user_id=user_id
+            )
+            if not is_joined:
+                raise ValueError("未参与该挑战")
+            raise ValueError("挑战已结束或被禁用")
+        
+        # 增量更新进程内排行榜
+        if record.completed:
+            leaderboard_registry.record_check_in(challenge_id, user_id, record.points_earned or 0)
         return record
     
     async def get_user_challenge_records(
@@ -418,41 +431,33 @@ class ChallengeService(BaseService[Challenge, ChallengeCreate, ChallengeUpdate])
         Returns:
             进度信息
         """
-        # 获取挑战信息
-        challenge = await self.repository.get(db, challenge_id)
-        if not challenge:
+        # 挑战信息和进度行在一次查询中取回
+        row = await self.record_repository.get_progress_with_challenge(
+            db, 
+            user_id=user_id, 
+            challenge_id=challenge_id
+        )
+        if not row:
             raise ValueError("挑战不存在")
+        challenge, progress_row = row
             
         # 计算挑战总天数
         start_date = challenge.start_date.date() if isinstance(challenge.start_date, datetime) else challenge.start_date
         end_date = challenge.end_date.date() if isinstance(challenge.end_date, datetime) else challenge.end_date
         total_days = (end_date - start_date).days + 1
         
-        # 获取已打卡天数
-        check_in_count = await self.record_repository.count_check_ins(
-            db, 
-            user_id=user_id, 
-            challenge_id=challenge_id
-        )
-        
-        # 计算获得的总积分
-        total_points = await self.record_repository.get_total_points(
-            db, 
-            user_id=user_id, 
-            challenge_id=challenge_id
-        )
+        check_in_count = progress_row.check_in_count if progress_row else 0
+        total_points = progress_row.total_points if progress_row else 0
+        last_check_in_date = progress_row.last_check_in_date if progress_row else None
         
         # 计算打卡进度
         progress = (check_in_count / total_days) * 100 if total_days > 0 else 0
         
-        # 获取是否今日已打卡
+        # 最后一次打卡早于昨天时连续打卡已中断
         today = datetime.now().date()
-        today_record = await self.record_repository.get_by_date(
-            db, 
-            user_id=user_id, 
-            challenge_id=challenge_id,
-            check_in_date=today
-        )
+        current_streak = 0
+        if last_check_in_date is not None and last_check_in_date >= today - timedelta(days=1):
+            current_streak = progress_row.current_streak
         
         # 判断挑战当前状态
         now = datetime.now()
@@ -472,10 +477,43 @@ class ChallengeService(BaseService[Challenge, ChallengeCreate, ChallengeUpdate])
             "check_in_count": check_in_count,
             "total_points": total_points,
             "progress": round(progress, 2),
-            "is_checked_today": today_record is not None,
+            "is_checked_today": last_check_in_date == today,
+            "current_streak": current_streak,
+            "longest_streak": progress_row.longest_streak if progress_row else 0,
+            "last_check_in_date": last_check_in_date.isoformat() if last_check_in_date else None,
             "status": status
         }
     
+    async def rebuild_progress(
+        self, 
+        db: AsyncSession, 
+        *, 
+        challenge_id: Optional[int] = None
+    ) -> int:
+        """
+        根据打卡记录重建挑战进度数据
+        
+        Args:
+            db: 数据库会话
+            challenge_id: 挑战ID，为None时重建所有挑战
+            
+        Returns:
+            重建的进度行数
+        """
+        return await self.record_repository.rebuild_progress(db, challenge_id=challenge_id)
+    
+    async def rebuild_participant_counts(self, db: AsyncSession) -> int:
+        """
+        根据参与记录重新计算所有挑战的参与人数
+        
+        Args:
+            db: 数据库会话
+            
+        Returns:
+            更新的挑战数
+        """
+        return await self.repository.rebuild_participant_counts(db)
+    
     async def get_leaderboard(
         self, 
         db: AsyncSession, 
@@ -494,11 +532,73 @@ class ChallengeService(BaseService[Challenge, ChallengeCreate, ChallengeUpdate])
         Returns:
             排行榜数据列表
         """
-        return await self.record_repository.get_leaderboard(
-            db, 
-            challenge_id=challenge_id,
-            limit=limit
+        board = await self._get_leaderboard_board(db, challenge_id=challenge_id)
+        return await self._build_leaderboard_entries(db, board.top(limit), first_rank=1)
+    
+    async def get_leaderboard_position(
+        self, 
+        db: AsyncSession, 
+        *, 
+        challenge_id: int,
+        user_id: int,
+        neighbors: int = 5
+    ) -> Dict[str, Any]:
+        """
+        获取用户在挑战排行榜中的名次及前后相邻的用户
+        
+        Args:
+            db: 数据库会话
+            challenge_id: 挑战ID
+            user_id: 用户ID
+            neighbors: 前后各返回的人数
+            
+        Returns:
+            用户名次、上榜人数及相邻排行榜条目，用户未上榜时名次为None
+        """
+        board = await self._get_leaderboard_board(db, challenge_id=challenge_id)
+        rank, entries = board.around(user_id, neighbors)
+        first_rank = max(rank - neighbors, 1) if rank else 1
+        return {
+            "user_id": user_id,
+            "rank": rank,
+            "total": len(board),
+            "entries": await self._build_leaderboard_entries(db, entries, first_rank=first_rank)
+        }
+    
+    async def _get_leaderboard_board(
+        self, 
+        db: AsyncSession, 
+        *, 
+        challenge_id: int
+    ) -> ChallengeLeaderboard:
+        """获取进程内排行榜，首次访问时从打卡记录加载"""
+        return await leaderboard_registry.get(
+            challenge_id,
+            lambda: self.record_repository.get_leaderboard_scores(db, challenge_id=challenge_id)
         )
+    
+    async def _build_leaderboard_entries(
+        self, 
+        db: AsyncSession, 
+        entries: List[LeaderboardEntry],
+        *, 
+        first_rank: int
+    ) -> List[Dict[str, Any]]:
+        """为排行榜条目补充用户展示信息"""
+        profiles = await user_repository.get_profiles_by_ids(db, [user_id for user_id, _, _ in entries])
+        leaderboard = []
+        for offset, (user_id, total_points, check_in_count) in enumerate(entries):
+            profile = profiles.get(user_id, {})
+            leaderboard.append({
+                "rank": first_rank + offset,
+                "user_id": user_id,
+                "username": profile.get("username"),
+                "nickname": profile.get("nickname"),
+                "avatar": profile.get("avatar"),
+                "total_points": total_points,
+                "check_in_count": check_in_count
+            })
+        return leaderboard
 
     async def get_participation_stats(self, db: AsyncSession) -> Dict[str, Any]:
         """
@@ -1,8 +1,9 @@
 from typing import List, Optional, Dict, Any, Union, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from .base_service import BaseService
+from ..core.config import settings
 from ..models.chat import ChatMessage, ChatRoom, ChatRoomMember
 from ..repositories import (
     chat_message_repository, 
@@ -101,7 +102,9 @@ class ChatService(BaseService):
         Returns:
             创建的消息
         """
-        return await self.message_repository.create(db, obj_in=message_in)
+        if message_in.chat_room_id:
+            return await self.message_repository.create_room_message(db, obj_in=message_in)
+        return await self.message_repository.create_direct_message(db, obj_in=message_in)
     
     async def send_direct_message(
         self, 
@@ -132,7 +135,7 @@ class ChatService(BaseService):
             "message_type": message_type
         }
         
-        return await self.message_repository.create(
+        return await self.message_repository.create_direct_message(
             db, 
             obj_in=ChatMessageCreate(**message_data)
         )
@@ -178,7 +181,7 @@ class ChatService(BaseService):
             "chat_room_id": room_id
         }
         
-        return await self.message_repository.create(
+        return await self.message_repository.create_room_message(
             db, 
             obj_in=ChatMessageCreate(**message_data)
         )
@@ -308,11 +311,16 @@ class ChatService(BaseService):
                 "is_admin": user_id == creator_id
             }
             
-            await self.member_repository.create(
+            await self.member_repository.add_member(
                 db, 
-                obj_in=ChatRoomMemberCreate(**member_data)
+                obj_in=ChatRoomMemberCreate(**member_data),
+                commit=False
             )
         
+        # 成员记录与成员数量一并提交
+        await db.commit()
+        await db.refresh(room)
+        
         return room
     
     async def create_direct_room(
@@ -409,10 +417,12 @@ class ChatService(BaseService):
             "is_admin": is_admin
         }
         
-        return await self.member_repository.create(
+        member = await self.member_repository.add_member(
             db, 
             obj_in=ChatRoomMemberCreate(**member_data)
         )
+        
+        return member
     
     async def remove_room_member(
         self, 
@@ -432,7 +442,30 @@ class ChatService(BaseService):
         Returns:
             是否成功移除
         """
-        return await self.member_repository.remove_member(
+        removed = await self.member_repository.remove_member(
+            db, 
+            user_id=user_id, 
+            room_id=room_id
+        )
+        
+        return removed
+    
+    async def mark_room_as_read(
+        self, 
+        db: AsyncSession, 
+        *, 
+        room_id: int,
+        user_id: int
+    ) -> None:
+        """
+        将聊天室标记为已读，清零用户在该聊天室的未读计数
+        
+        Args:
+            db: 数据库会话
+            room_id: 聊天室ID
+            user_id: 用户ID
+        """
+        await self.member_repository.reset_unread(
             db, 
             user_id=user_id, 
             room_id=room_id
@@ -557,6 +590,29 @@ class ChatService(BaseService):
         """
         return await self.room_repository.delete(db, id=room_id)
     
+    async def archive_old_messages(
+        self, 
+        db: AsyncSession, 
+        *, 
+        hot_days: Optional[int] = None
+    ) -> int:
+        """
+        将超出热数据窗口的消息迁移到归档表
+        
+        Args:
+            db: 数据库会话
+            hot_days: 热表保留天数，默认使用配置CHAT_HOT_DAYS
+            
+        Returns:
+            归档的消息数
+        """
+        cutoff = datetime.now() - timedelta(days=hot_days or settings.CHAT_HOT_DAYS)
+        return await self.message_repository.archive_messages_before(
+            db, 
+            cutoff=cutoff, 
+            batch_size=settings.CHAT_ARCHIVE_BATCH_SIZE
+        )
+    
     # ===================== 管理员功能 =====================
     
     async def get_all_messages_for_admin(
@@ -659,9 +715,9 @@ class ChatService(BaseService):
         member_data = {
             'room_id': room.id,
             'user_id': creator_id,
-            'role': 'admin'
+            'is_admin': True
         }
-        await self.member_repository.create(db, obj_in=member_data)
+        await self.member_repository.add_member(db, obj_in=ChatRoomMemberCreate(**member_data))
         
         return room
     
@@ -706,9 +762,9 @@ class ChatService(BaseService):
             member_data = {
                 'room_id': room_id,
                 'user_id': user_id,
-                'role': role
+                'is_admin': role == "admin"
             }
-            await self.member_repository.create(db, obj_in=member_data)
+            await self.member_repository.add_member(db, obj_in=ChatRoomMemberCreate(**member_data))
             return True
         except:
             return False
@@ -739,8 +795,8 @@ class ChatService(BaseService):
         """
         管理员移除群聊成员
         """
-        member = await self.member_repository.get_room_member(db, room_id, user_id)
-        if member:
-            await self.member_repository.delete(db, id=member.id)
-            return True
-        return False 
\ No newline at end of file
+        return await self.member_repository.remove_member(
+            db, 
+            user_id=user_id, 
+            room_id=room_id
+        )
\ No newline at end of file
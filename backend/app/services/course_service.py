@@ -4,10 +4,12 @@ import os
 from datetime import datetime
 
 from .base_service import BaseService
-from ..models.course import Course
-from ..repositories import course_repository
+from ..models.course import Course, CourseEnrollment
+from ..models.platform import PlatformCounterKey
+from ..repositories import course_repository, platform_counter_repository
 from ..schemas.course import CourseCreate, CourseUpdate
 from ..core.config import settings
+from ..core.counters import counter_aggregator
 
 class CourseService(BaseService[Course, CourseCreate, CourseUpdate]):
     """
@@ -20,6 +22,37 @@ class CourseService(BaseService[Course, CourseCreate, CourseUpdate]):
         """
         super().__init__(course_repository)
     
+    async def create(self, db: AsyncSession, *, obj_in: CourseCreate) -> Course:
+        """
+        创建课程，并更新平台课程计数
+        
+        Args:
+            db: 数据库会话
+            obj_in: 课程创建数据
+            
+        Returns:
+            创建的课程
+        """
+        course = await super().create(db, obj_in=obj_in)
+        platform_counter_repository.adjust(PlatformCounterKey.COURSES, 1)
+        return course
+    
+    async def delete(self, db: AsyncSession, *, id: int) -> Optional[Course]:
+        """
+        删除课程，并更新平台课程计数
+        
+        Args:
+            db: 数据库会话
+            id: 课程ID
+            
+        Returns:
+            删除的课程，如未找到返回None
+        """
+        course = await super().delete(db, id=id)
+        if course:
+            platform_counter_repository.adjust(PlatformCounterKey.COURSES, -1)
+        return course
+    
     async def get_by_title(self, db: AsyncSession, title: str) -> Optional[Course]:
         """
         通过标题获取课程
@@ -276,4 +309,38 @@ class CourseService(BaseService[Course, CourseCreate, CourseUpdate]):
         Returns:
             热门课程列表
         """
-        return await self.repository.get_popular_courses(db, limit) 
\ No newline at end of file
+        return await self.repository.get_popular_courses(db, limit)
+    
+    def record_view(self, course_id: int) -> None:
+        """
+        记录一次课程浏览，浏览数定期批量写回
+        
+        Args:
+            course_id: 课程ID
+        """
+        counter_aggregator.increment(Course.views_count, course_id)
+    
+    async def enroll(self, db: AsyncSession, *, course_id: int, user_id: int) -> CourseEnrollment:
+        """
+        报名课程，报名人数定期批量写回
+        
+        Args:
+            db: 数据库会话
+            course_id: 课程ID
+            user_id: 用户ID
+            
+        Returns:
+            报名记录
+            
+        Raises:
+            ValueError: 已经报名该课程
+        """
+        existing = await self.repository.get_enrollment(db, user_id=user_id, course_id=course_id)
+        if existing:
+            raise ValueError("已经报名该课程")
+        
+        enrollment = await self.repository.create_enrollment(db, user_id=user_id, course_id=course_id)
+        if enrollment is None:
+            raise ValueError("已经报名该课程")
+        counter_aggregator.increment(Course.enrollment_count, course_id)
+        return enrollment
@@ -2,10 +2,30 @@ from typing import List, Optional, Dict, Any, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, date, timedelta
 
+import numpy as np
+
 from .base_service import BaseService
+from ..core.config import settings
+from ..core.exceptions import ValidationException
+from ..core.trend import TREND_METRICS, analyze_columns, to_float_array
 from ..models.health import HealthRecord
-from ..repositories import health_repository
-from ..schemas.health import HealthRecordCreate, HealthRecordUpdate, HealthStatistics
+from ..models.platform import PlatformCounterKey
+from ..repositories import health_repository, platform_counter_repository
+from ..schemas.health import (
+    HealthRecordCreate, HealthRecordUpdate, HealthStatistics,
+    HealthRecordBatch, HealthRecordBatchResult
+)
+
+# 批量导入时各数值指标的合理范围（与HealthRecordBase的字段约束一致），None表示不限
+BATCH_VALUE_RANGES = {
+    "heart_rate": (30, 220),
+    "blood_sugar": (1.0, 30.0),
+    "weight": (0, None),
+    "height": (0, None)
+}
+
+# 批量导入结果中最多返回的错误条数
+BATCH_MAX_ERRORS = 50
 
 class HealthService(BaseService[HealthRecord, HealthRecordCreate, HealthRecordUpdate]):
     """
@@ -110,7 +130,130 @@ class HealthService(BaseService[HealthRecord, HealthRecordCreate, HealthRecordUp
             record_data["bmi"] = round(bmi, 2)
             obj_in = HealthRecordCreate(**record_data)
             
-        return await super().create(db, obj_in=obj_in)
+        record = await super().create(db, obj_in=obj_in)
+        platform_counter_repository.adjust(PlatformCounterKey.HEALTH_RECORDS, 1)
+        return record
+    
+    async def delete(self, db: AsyncSession, *, id: int) -> Optional[HealthRecord]:
+        """
+        删除健康记录，并更新平台健康记录计数
+        
+        Args:
+            db: 数据库会话
+            id: 记录ID
+            
+        Returns:
+            删除的健康记录，如未找到返回None
+        """
+        record = await super().delete(db, id=id)
+        if record:
+            platform_counter_repository.adjust(PlatformCounterKey.HEALTH_RECORDS, -1)
+        return record
+    
+    async def create_records_batch(
+        self, 
+        db: AsyncSession, 
+        *, 
+        batch: HealthRecordBatch
+    ) -> HealthRecordBatchResult:
+        """
+        批量导入健康记录
+        
+        按列做向量化校验并批量计算BMI，校验失败的行被拒绝，其余行在一个事务中多行插入
+        
+        Args:
+            db: 数据库会话
+            batch: 列式批量数据
+            
+        Returns:
+            导入结果
+        """
+        size = len(batch.recorded_at)
+        if size > settings.HEALTH_BATCH_MAX_SIZE:
+            raise ValidationException(f"单次最多导入{settings.HEALTH_BATCH_MAX_SIZE}条记录")
+        
+        valid = np.ones(size, dtype=bool)
+        errors: List[Dict[str, Any]] = []
+        
+        def reject(field: str, mask: np.ndarray, reason: str) -> None:
+            rows = np.flatnonzero(mask & valid)
+            for row in rows[:max(BATCH_MAX_ERRORS - len(errors), 0)]:
+                errors.append({"row": int(row), "field": field, "reason": reason})
+            valid[rows] = False
+        
+        empty = np.full(size, np.nan)
+        columns = {}
+        for name in ("heart_rate", "blood_sugar", "weight", "height", "bmi"):
+            column = getattr(batch, name)
+            columns[name] = to_float_array(column) if column is not None else empty
+        
+        for name, (low, high) in BATCH_VALUE_RANGES.items():
+            values = columns[name]
+            present = ~np.isnan(values)
+            if high is None:
+                reject(name, present & (values <= low), f"{name}必须大于{low}")
+            else:
+                reject(name, present & ((values < low) | (values > high)), f"{name}应在{low}到{high}之间")
+        
+        if batch.blood_pressure is not None:
+            systolic, diastolic, malformed = self._parse_blood_pressure(batch.blood_pressure)
+            out_of_range = ~malformed & ~np.isnan(systolic) & (
+                (systolic < 60) | (systolic > 250) | (diastolic < 40) | (diastolic > 150)
+            )
+            reject("blood_pressure", malformed | out_of_range, "血压格式无效，应为'收缩压/舒张压'，例如'120/80'")
+        
+        # 提供了身高体重但没有BMI的行批量计算BMI
+        height_m = columns["height"] / 100
+        with np.errstate(divide="ignore", invalid="ignore"):
+            computed_bmi = np.round(columns["weight"] / (height_m * height_m), 2)
+        bmi = np.where(np.isnan(columns["bmi"]), computed_bmi, columns["bmi"])
+        
+        indices = np.flatnonzero(valid)
+        records = [
+            {
+                "user_id": batch.user_id,
+                "recorded_at": batch.recorded_at[i],
+                "blood_pressure": batch.blood_pressure[i] if batch.blood_pressure is not None else None,
+                "heart_rate": batch.heart_rate[i] if batch.heart_rate is not None else None,
+                "blood_sugar": batch.blood_sugar[i] if batch.blood_sugar is not None else None,
+                "weight": batch.weight[i] if batch.weight is not None else None,
+                "height": batch.height[i] if batch.height is not None else None,
+                "bmi": None if np.isnan(value) else float(value)
+            }
+            for i, value in zip(indices.tolist(), bmi[indices].tolist())
+        ]
+        
+        inserted = await self.repository.create_many(db, rows=records)
+        platform_counter_repository.adjust(PlatformCounterKey.HEALTH_RECORDS, inserted)
+        return HealthRecordBatchResult(
+            inserted=inserted,
+            rejected=size - inserted,
+            errors=errors
+        )
+    
+    @staticmethod
+    def _parse_blood_pressure(values: List[Optional[str]]):
+        """
+        将血压列拆分为收缩压、舒张压两个数组
+        
+        Returns:
+            (收缩压数组, 舒张压数组, 格式错误掩码)，缺失值为NaN
+        """
+        size = len(values)
+        systolic = np.full(size, np.nan)
+        diastolic = np.full(size, np.nan)
+        malformed = np.zeros(size, dtype=bool)
+        for i, value in enumerate(values):
+            if value is None:
+                continue
+            parts = value.split("/")
+            try:
+                systolic[i], diastolic[i] = int(parts[0].strip()), int(parts[1].strip())
+            except (ValueError, IndexError):
+                malformed[i] = True
+            else:
+                malformed[i] = len(parts) != 2
+        return systolic, diastolic, malformed
     
     async def update_record(
         self, 
@@ -190,6 +333,64 @@ class HealthService(BaseService[HealthRecord, HealthRecordCreate, HealthRecordUp
         """
         return await self.repository.get_monthly_summary(db, user_id=user_id, year=year, month=month)
     
+    async def get_chart_series(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        max_points: int = 200,
+        method: str = "bucket",
+        metrics: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        获取用于图表展示的降采样健康指标序列
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            start_date: 开始时间
+            end_date: 结束时间
+            max_points: 每个指标最多返回的点数
+            method: 降采样方式（bucket或lttb）
+            metrics: 需要的指标，默认全部
+            
+        Returns:
+            降采样后的指标序列
+        """
+        unknown = [metric for metric in metrics or [] if metric not in TREND_METRICS]
+        if unknown:
+            raise ValidationException(f"不支持的指标: {', '.join(unknown)}")
+        
+        return await self.repository.get_downsampled_series(
+            db,
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            max_points=max_points,
+            method=method,
+            metrics=metrics
+        )
+    
+    async def rebuild_rollups(
+        self, 
+        db: AsyncSession, 
+        *, 
+        user_id: Optional[int] = None
+    ) -> int:
+        """
+        根据原始记录重建健康日汇总数据
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID，为None时重建所有用户
+            
+        Returns:
+            重建的汇总行数
+        """
+        return await self.repository.rebuild_rollups(db, user_id=user_id)
+    
     def analyze_health_trend(self, records: List[HealthRecord]) -> Dict[str, Any]:
         """
         分析健康趋势
@@ -200,76 +401,33 @@ class HealthService(BaseService[HealthRecord, HealthRecordCreate, HealthRecordUp
         Returns:
             健康趋势分析结果
         """
-        if not records or len(records) < 2:
-            return {
-                "trend": "insufficient_data",
-                "message": "数据不足，无法分析趋势"
-            }
-            
-        # 按记录时间排序
-        sorted_records = sorted(records, key=lambda r: r.recorded_at)
-        
-        # 分析体重趋势
-        weights = [r.weight for r in sorted_records if r.weight]
-        weight_trend = self._analyze_trend(weights) if weights and len(weights) >= 2 else None
-        
-        # 分析BMI趋势
-        bmis = [r.bmi for r in sorted_records if r.bmi]
-        bmi_trend = self._analyze_trend(bmis) if bmis and len(bmis) >= 2 else None
-        
-        # 分析心率趋势
-        heart_rates = [r.heart_rate for r in sorted_records if r.heart_rate]
-        heart_rate_trend = self._analyze_trend(heart_rates) if heart_rates and len(heart_rates) >= 2 else None
-        
-        # 分析血糖趋势
-        blood_sugars = [r.blood_sugar for r in sorted_records if r.blood_sugar]
-        blood_sugar_trend = self._analyze_trend(blood_sugars) if blood_sugars and len(blood_sugars) >= 2 else None
-        
-        return {
-            "weight_trend": weight_trend,
-            "bmi_trend": bmi_trend,
-            "heart_rate_trend": heart_rate_trend,
-            "blood_sugar_trend": blood_sugar_trend,
-            "analysis_date": datetime.now().isoformat(),
-            "data_points": len(sorted_records)
+        columns = {
+            name: [getattr(r, name) for r in records]
+            for name in ("recorded_at",) + TREND_METRICS
         }
+        return analyze_columns(columns)
     
-    def _analyze_trend(self, values: List[float]) -> Dict[str, Any]:
+    async def analyze_user_health_trend(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        days: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
-        分析数值趋势
+        直接基于列式查询结果分析用户健康趋势
         
         Args:
-            values: 数值列表
+            db: 数据库会话
+            user_id: 用户ID
+            days: 分析最近多少天的数据，为None时分析全部记录
             
         Returns:
-            趋势分析结果
+            健康趋势分析结果
         """
-        if not values or len(values) < 2:
-            return {
-                "trend": "insufficient_data",
-                "change": 0,
-                "change_percent": 0
-            }
-            
-        first = values[0]
-        last = values[-1]
-        change = last - first
-        change_percent = (change / first) * 100 if first != 0 else 0
-        
-        if abs(change_percent) < 1:
-            trend = "stable"
-        elif change_percent > 0:
-            trend = "increasing"
-        else:
-            trend = "decreasing"
-            
-        return {
-            "trend": trend,
-            "change": round(change, 2),
-            "change_percent": round(change_percent, 2),
-            "first_value": first,
-            "last_value": last
-        }
+        start_date = datetime.now() - timedelta(days=days) if days else None
+        columns = await self.repository.get_metric_columns(db, user_id=user_id, start_date=start_date)
+        return analyze_columns(columns)
 
     async def get_user_activity_stats(
         self,
@@ -290,38 +448,29 @@ class HealthService(BaseService[HealthRecord, HealthRecordCreate, HealthRecordUp
         Returns:
             用户健康活动统计信息
         """
-        # 获取指定时间范围内的健康记录
-        if start_date and end_date:
-            records = await self.get_by_date_range(db, user_id=user_id, start_date=start_date, end_date=end_date)
-        else:
-            # 默认获取最近30天的记录
+        if not (start_date and end_date):
+            # 默认统计最近30天
             end_date = date.today()
             start_date = end_date - timedelta(days=30)
-            records = await self.get_by_date_range(db, user_id=user_id, start_date=start_date, end_date=end_date)
-        
-        # 统计各类健康记录数量
-        total_records = len(records)
-        records_with_exercise = len([r for r in records if r.exercise_duration and r.exercise_duration > 0])
-        records_with_weight = len([r for r in records if r.weight])
-        records_with_heart_rate = len([r for r in records if r.heart_rate])
-        records_with_blood_pressure = len([r for r in records if r.systolic_pressure and r.diastolic_pressure])
         
-        # 计算平均值
-        avg_weight = sum([r.weight for r in records if r.weight]) / records_with_weight if records_with_weight > 0 else 0
-        avg_heart_rate = sum([r.heart_rate for r in records if r.heart_rate]) / records_with_heart_rate if records_with_heart_rate > 0 else 0
-        avg_exercise_duration = sum([r.exercise_duration for r in records if r.exercise_duration]) / records_with_exercise if records_with_exercise > 0 else 0
+        # 从日汇总表再聚合，代价与天数成正比，与记录数无关
+        totals = await self.repository.get_rollup_totals(
+            db, user_id=user_id, start_date=start_date, end_date=end_date
+        )
+        weight = totals["weight"]
+        heart_rate = totals["heart_rate"]
         
         return {
-            "totalRecords": total_records,
-            "exerciseRecords": records_with_exercise,
-            "weightRecords": records_with_weight,
-            "heartRateRecords": records_with_heart_rate,
-            "bloodPressureRecords": records_with_blood_pressure,
-            "averageWeight": round(avg_weight, 1),
-            "averageHeartRate": round(avg_heart_rate, 1),
-            "averageExerciseDuration": round(avg_exercise_duration, 1),
+            "totalRecords": totals["record_count"],
+            "exerciseRecords": 0,  # 健康记录暂不包含运动时长
+            "weightRecords": weight["count"],
+            "heartRateRecords": heart_rate["count"],
+            "bloodPressureRecords": totals["blood_pressure_count"],
+            "averageWeight": round(weight["avg"] or 0, 1),
+            "averageHeartRate": round(heart_rate["avg"] or 0, 1),
+            "averageExerciseDuration": 0,
             "period": {
                 "startDate": start_date.isoformat() if start_date else None,
                 "endDate": end_date.isoformat() if end_date else None
             }
-        } 
\ No newline at end of file
+        } 
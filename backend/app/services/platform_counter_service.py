@@ -0,0 +1,45 @@
+from typing import Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.counters import counter_aggregator
+from ..core.snapshot import stats_snapshots
+from ..models.platform import PlatformCounterKey
+from ..repositories import platform_counter_repository
+
+class PlatformCounterService:
+    """
+    平台计数服务，提供仪表盘使用的用户、课程、挑战、健康记录、动态总数
+    """
+
+    def __init__(self):
+        """
+        初始化平台计数服务
+        """
+        self.repository = platform_counter_repository
+
+    async def get_counts(self, db: AsyncSession) -> Dict[PlatformCounterKey, int]:
+        """
+        获取所有计数项的当前值，写回周期内的增减尚未计入
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            计数项 -> 值
+        """
+        return await self.repository.get_counts(db)
+
+    async def rebuild(self, db: AsyncSession) -> Dict[PlatformCounterKey, int]:
+        """
+        先写回待写回的增量，再按count(*)重新计算所有计数项，并丢弃已缓存的统计快照
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            计数项 -> 重新计算后的值
+        """
+        await counter_aggregator.flush()
+        counts = await self.repository.rebuild(db)
+        stats_snapshots.invalidate()
+        return counts
@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
 
@@ -15,7 +15,12 @@ from ..schemas.social import (
     HeritageInheritorCreate, HeritageInheritorUpdate, HeritageInheritorPublic, HeritageInheritorWithProjects
 )
 from ..models.social import Post, PostComment, PostLike, HeritageProject, HeritageInheritor
+from ..models.platform import PlatformCounterKey
+from ..repositories import platform_counter_repository
 from ..core.database import AsyncSessionLocal
+from ..core.exceptions import NotFoundException
+from ..core.counters import counter_aggregator
+from ..core.feed import FeedFilter, feed_registry
 
 
 class PostService(BaseService[Post, PostCreate, PostUpdate]):
@@ -39,6 +44,61 @@ class PostService(BaseService[Post, PostCreate, PostUpdate]):
         db.add(post)
         await db.commit()
         await db.refresh(post)
+        await self._sync_feed(db, post.id)
+        platform_counter_repository.adjust(PlatformCounterKey.POSTS, 1)
+        return post
+    
+    async def _sync_feed(self, db: AsyncSession, post_id: int) -> None:
+        """动态发布或修改后更新信息流时间线"""
+        entries = await self.repository.get_feed_entries(db, post_id)
+        if entries:
+            feed_registry.upsert(entries[0])
+        else:
+            feed_registry.remove(post_id)
+    
+    async def get_feed(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 20,
+        post_type: Optional[str] = None,
+        user_role: Optional[str] = None,
+        is_public: Optional[bool] = None,
+        is_featured: Optional[bool] = None
+    ) -> Tuple[List[Post], int]:
+        """
+        从物化的受众时间线获取一页动态，只按ID加载本页需要的动态
+        
+        Returns:
+            (动态列表, 动态总数)
+        """
+        post_ids, total = await feed_registry.page(
+            FeedFilter(post_type, user_role, is_public, is_featured),
+            skip,
+            limit,
+            lambda: self.repository.get_feed_entries(db)
+        )
+        posts = await self.repository.get_posts_by_ids(db, post_ids)
+        return posts, total
+    
+    async def update(
+        self, 
+        db: AsyncSession, 
+        *, 
+        db_obj: Post, 
+        obj_in: Union[PostUpdate, Dict[str, Any]]
+    ) -> Post:
+        """更新动态，并同步信息流时间线"""
+        post = await self.repository.update(db, db_obj=db_obj, obj_in=obj_in)
+        await self._sync_feed(db, post.id)
+        return post
+    
+    async def delete(self, db: AsyncSession, *, id: int) -> Optional[Post]:
+        """删除动态，从信息流时间线中移除，并更新平台动态计数"""
+        post = await self.repository.delete(db, id=id)
+        if post:
+            feed_registry.remove(id)
+            platform_counter_repository.adjust(PlatformCounterKey.POSTS, -1)
         return post
     
     async def get_posts_with_user(
@@ -57,6 +117,22 @@ class PostService(BaseService[Post, PostCreate, PostUpdate]):
             db, skip, limit, post_type, user_role, is_public, is_featured, user_id
         )
     
+    async def get_hot_posts(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 20,
+        post_type: Optional[str] = None,
+        user_role: Optional[str] = None,
+        is_public: Optional[bool] = None,
+        is_featured: Optional[bool] = None,
+        user_id: Optional[int] = None
+    ) -> List[Post]:
+        """按热度获取动态列表"""
+        return await self.repository.get_hot_posts(
+            db, skip, limit, post_type, user_role, is_public, is_featured, user_id
+        )
+    
     async def get_posts_by_user(
         self, 
         db: AsyncSession, 
@@ -69,27 +145,46 @@ class PostService(BaseService[Post, PostCreate, PostUpdate]):
     
     async def toggle_featured(self, db: AsyncSession, post_id: int) -> Optional[Post]:
         """切换精选状态"""
-        return await self.repository.toggle_featured(db, post_id)
+        post = await self.repository.toggle_featured(db, post_id)
+        if post:
+            await self._sync_feed(db, post_id)
+        return post
     
     async def toggle_visibility(self, db: AsyncSession, post_id: int) -> Optional[Post]:
         """切换可见性"""
-        return await self.repository.toggle_visibility(db, post_id)
+        post = await self.repository.toggle_visibility(db, post_id)
+        if post:
+            await self._sync_feed(db, post_id)
+        return post
     
     async def like_post(self, db: AsyncSession, post_id: int, user_id: int) -> bool:
-        """点赞动态"""
+        """
+        点赞/取消点赞动态
+        
+        点赞记录在一个事务中写入，点赞数交给写回式计数器合并后批量更新，
+        热门动态的点赞不再逐次锁定同一行
+        """
         like_repo = PostLikeRepository()
-        existing_like = await like_repo.get_like_by_user_and_post(db, user_id, post_id)
         
-        if existing_like:
-            # 已点赞，取消点赞
-            await like_repo.delete_like(db, user_id, post_id)
-            await self.repository.decrement_likes_count(db, post_id)
+        # 已点赞则取消点赞
+        if await like_repo.remove_like(db, user_id, post_id):
+            await db.commit()
+            counter_aggregator.increment(Post.likes_count, post_id, -1)
             return False
-        else:
-            # 未点赞，添加点赞
-            await like_repo.create_like(db, user_id, post_id)
-            await self.repository.increment_likes_count(db, post_id)
-            return True
+        
+        # 未点赞，重复点赞由唯一约束拦截
+        added = await like_repo.add_like(db, user_id, post_id)
+        if added is None:
+            await db.rollback()
+            raise NotFoundException("动态不存在")
+        await db.commit()
+        if added:
+            counter_aggregator.increment(Post.likes_count, post_id, 1)
+        return True
+    
+    def record_view(self, post_id: int) -> None:
+        """记录一次动态浏览，浏览数定期批量写回"""
+        counter_aggregator.increment(Post.views_count, post_id)
     
     async def get_total_count(
         self,
@@ -130,12 +225,12 @@ class PostCommentService(BaseService[PostComment, PostCommentCreate, PostComment
         
         comment = PostComment(**create_data)
         db.add(comment)
-        await db.commit()
-        await db.refresh(comment)
         
-        # 增加动态的评论数
+        # 评论与动态的评论数在同一事务中提交
         post_repo = PostRepository()
-        await post_repo.increment_comments_count(db, obj_in.post_id)
+        await post_repo.increment_comments_count(db, obj_in.post_id, commit=False)
+        await db.commit()
+        await db.refresh(comment)
         
         return comment
     
@@ -149,6 +244,17 @@ class PostCommentService(BaseService[PostComment, PostCommentCreate, PostComment
         """获取动态的评论列表"""
         return await self.repository.get_comments_by_post(db, post_id, skip, limit)
     
+    async def get_comment_tree(
+        self, 
+        db: AsyncSession, 
+        post_id: int, 
+        skip: int = 0, 
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """获取动态的评论树（顶层评论分页，回复嵌套在replies中）"""
+        comments, _ = await self.repository.get_comment_tree(db, post_id, skip, limit)
+        return comments
+    
     async def get_replies_by_comment(
         self, 
         db: AsyncSession, 
@@ -161,12 +267,12 @@ class PostCommentService(BaseService[PostComment, PostCommentCreate, PostComment
         """删除评论"""
         comment = await self.repository.get(db, comment_id)
         if comment:
-            # 减少动态的评论数
+            # 减少动态的评论数，与删除评论在同一事务中提交
             post_repo = PostRepository()
-            await post_repo.decrement_comments_count(db, comment.post_id)
+            await post_repo.decrement_comments_count(db, comment.post_id, commit=False)
             
             # 删除评论
-            await self.repository.remove(db, id=comment_id)
+            await self.repository.delete(db, id=comment_id)
             return True
         return False
 
@@ -353,7 +459,6 @@ class SocialService:
     def __init__(self):
         self.post_service = PostService()
         self.comment_service = PostCommentService()
-        self.like_service = PostLikeService()
         self.heritage_project_service = HeritageProjectService()
         self.heritage_inheritor_service = HeritageInheritorService()
         self.repository = self.post_service.repository  # 为了兼容性
@@ -377,22 +482,16 @@ class SocialService:
         Returns:
             用户社交活动统计信息
         """
-        # 获取用户的动态统计
-        user_posts = await self.post_service.repository.get_by_user_id(db, user_id)
-        user_comments = await self.comment_service.repository.get_by_user_id(db, user_id)
-        user_likes = await self.like_service.repository.get_by_user_id(db, user_id)
-        
-        # 按日期范围过滤
-        if start_date and end_date:
-            user_posts = [p for p in user_posts if start_date <= p.created_at.date() <= end_date]
-            user_comments = [c for c in user_comments if start_date <= c.created_at.date() <= end_date]
-            user_likes = [l for l in user_likes if start_date <= l.created_at.date() <= end_date]
+        # 四项计数在数据库端按日期范围聚合，一次查询返回
+        counts = await self.post_service.repository.get_user_activity_counts(
+            db, user_id, start_date, end_date
+        )
         
         return {
-            "totalPosts": len(user_posts),
-            "totalComments": len(user_comments),
-            "totalLikes": len(user_likes),
-            "receivedLikes": sum([p.like_count or 0 for p in user_posts]),
+            "totalPosts": counts["posts"],
+            "totalComments": counts["comments"],
+            "totalLikes": counts["likes"],
+            "receivedLikes": counts["received_likes"],
             "period": {
                 "startDate": start_date.isoformat() if start_date else None,
                 "endDate": end_date.isoformat() if end_date else None
@@ -1,12 +1,12 @@
 from typing import List, Optional, Dict, Any, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from passlib.context import CryptContext
 
 from .base_service import BaseService
 from ..models.user import User
-from ..repositories import user_repository
+from ..models.platform import PlatformCounterKey
+from ..repositories import user_repository, platform_counter_repository
 from ..schemas.user import UserCreate, UserUpdate, PasswordChange
-from ..core.security import get_password_hash
+from ..core.security import get_password_hash_async, verify_password_async, invalidate_cached_user
 
 class UserService(BaseService[User, UserCreate, UserUpdate]):
     """
@@ -32,7 +32,7 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
         """
         # 将密码哈希化并准备数据
         create_data = obj_in.model_dump(exclude={'password'})
-        create_data['hashed_password'] = get_password_hash(obj_in.password)
+        create_data['hashed_password'] = await get_password_hash_async(obj_in.password)
         
         # 确保role和is_admin字段的一致性
         from ..models.user import UserRole
@@ -55,8 +55,42 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        self._count_user(is_active=db_obj.is_active)
         return db_obj
     
+    @staticmethod
+    def _count_user(*, was_active: Optional[bool] = None, is_active: Optional[bool] = None) -> None:
+        """
+        用户创建、删除或激活状态变化后更新平台计数
+        
+        Args:
+            was_active: 变化前是否激活，创建时为None
+            is_active: 变化后是否激活，删除时为None
+        """
+        if was_active is None:
+            platform_counter_repository.adjust(PlatformCounterKey.USERS, 1)
+        elif is_active is None:
+            platform_counter_repository.adjust(PlatformCounterKey.USERS, -1)
+        if bool(is_active) != bool(was_active):
+            platform_counter_repository.adjust(PlatformCounterKey.ACTIVE_USERS, 1 if is_active else -1)
+    
+    async def delete(self, db: AsyncSession, *, id: int) -> Optional[User]:
+        """
+        删除用户，并清除其认证缓存
+        
+        Args:
+            db: 数据库会话
+            id: 用户ID
+            
+        Returns:
+            删除的用户对象，如未找到返回None
+        """
+        user = await self.repository.delete(db, id=id)
+        invalidate_cached_user(id)
+        if user:
+            self._count_user(was_active=user.is_active)
+        return user
+    
     async def get_by_email(
         self, 
         db: AsyncSession, 
@@ -150,8 +184,12 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
         user = await self.repository.get(db, user_id)
         if not user:
             return None
-            
-        return await self.repository.update(db, db_obj=user, obj_in=user_in)
+        
+        was_active = user.is_active
+        user = await self.repository.update(db, db_obj=user, obj_in=user_in)
+        invalidate_cached_user(user_id)
+        self._count_user(was_active=was_active, is_active=user.is_active)
+        return user
     
     async def activate_user(
         self, 
@@ -173,8 +211,12 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
         if not user:
             return None
             
+        was_active = user.is_active
         update_data = {"is_active": True}
-        return await self.repository.update(db, db_obj=user, obj_in=update_data)
+        user = await self.repository.update(db, db_obj=user, obj_in=update_data)
+        invalidate_cached_user(user_id)
+        self._count_user(was_active=was_active, is_active=True)
+        return user
     
     async def deactivate_user(
         self, 
@@ -196,8 +238,13 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
         if not user:
             return None
             
-        update_data = {"is_active": False}
-        return await self.repository.update(db, db_obj=user, obj_in=update_data)
+        # 递增令牌版本，使该用户已签发的令牌全部失效
+        was_active = user.is_active
+        update_data = {"is_active": False, "token_version": (user.token_version or 0) + 1}
+        user = await self.repository.update(db, db_obj=user, obj_in=update_data)
+        invalidate_cached_user(user_id)
+        self._count_user(was_active=was_active, is_active=False)
+        return user
     
     async def set_admin_status(
         self, 
@@ -222,7 +269,9 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
             return None
             
         update_data = {"is_admin": is_admin}
-        return await self.repository.update(db, db_obj=user, obj_in=update_data)
+        user = await self.repository.update(db, db_obj=user, obj_in=update_data)
+        invalidate_cached_user(user_id)
+        return user
     
     async def is_active(
         self, 
@@ -286,21 +335,20 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
         if not user:
             raise ValueError("用户不存在")
         
-        # 初始化密码上下文
-        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        
         # 验证当前密码
-        if not pwd_context.verify(password_data.current_password, user.hashed_password):
+        if not await verify_password_async(password_data.current_password, user.hashed_password):
             raise ValueError("当前密码错误")
         
         # 生成新密码哈希
-        new_hashed_password = pwd_context.hash(password_data.new_password)
+        new_hashed_password = await get_password_hash_async(password_data.new_password)
         
-        # 直接更新用户密码
+        # 直接更新用户密码，并递增令牌版本使旧令牌失效
         user.hashed_password = new_hashed_password
+        user.token_version = (user.token_version or 0) + 1
         db.add(user)
         await db.commit()
         await db.refresh(user)
+        invalidate_cached_user(user_id)
         
         return True
     
@@ -432,11 +480,14 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
             return False
         
         # 生成新密码哈希
-        from ..core.security import get_password_hash
-        new_hashed_password = get_password_hash(password)
+        new_hashed_password = await get_password_hash_async(password)
         
         # 更新用户密码
-        update_data = {"hashed_password": new_hashed_password}
+        update_data = {
+            "hashed_password": new_hashed_password,
+            "token_version": (user.token_version or 0) + 1
+        }
         await self.repository.update(db, db_obj=user, obj_in=update_data)
+        invalidate_cached_user(user_id)
         
         return True 
\ No newline at end of file
@@ -1,12 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import logging
 import os
 
 from app.core.config import settings
-from app.core.database import initialize_db, close_db_connection
+from app.core.database import initialize_db, close_db_connection, check_declared_indexes
 from app.core.exceptions import register_exception_handlers
 from app.api.v1 import (
     courses, auth, stats, users, 
@@ -30,6 +31,35 @@ def create_upload_dirs():
             os.makedirs(upload_path)
             logger.info(f"Created upload directory: {upload_path}")
 
+# 定期归档历史聊天消息
+async def archive_chat_messages_periodically():
+    from app.core.database import AsyncSessionLocal, advisory_lock
+    from app.services import chat_service
+    
+    while True:
+        try:
+            # 多个工作进程同时启动时只由获取到锁的一个执行归档
+            async with advisory_lock("chat_message_archive") as acquired:
+                if acquired:
+                    async with AsyncSessionLocal() as db:
+                        archived = await chat_service.archive_old_messages(db)
+                    if archived:
+                        logger.info(f"Archived {archived} chat messages")
+        except Exception as e:
+            logger.error(f"Chat message archiving failed: {e}")
+        await asyncio.sleep(settings.CHAT_ARCHIVE_INTERVAL_HOURS * 3600)
+
+# 定期把内存中合并的计数增量写回数据库
+async def flush_counters_periodically():
+    from app.core.counters import counter_aggregator
+    
+    while True:
+        await asyncio.sleep(settings.COUNTER_FLUSH_INTERVAL_SECONDS)
+        try:
+            await counter_aggregator.flush()
+        except Exception as e:
+            logger.error(f"Counter flush failed: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -43,11 +73,24 @@ async def lifespan(app: FastAPI):
     
     # 初始化数据库
     await initialize_db()
+    if settings.SCHEMA_INDEX_CHECK:
+        try:
+            await check_declared_indexes()
+        except Exception as e:
+            logger.warning(f"Index check skipped: {e}")
     
     # 初始化WebSocket连接管理器
     from app.core.chat import chat_manager
     app.state.chat_manager = chat_manager
     
+    # 启动聊天消息归档任务
+    archive_task = None
+    if settings.CHAT_ARCHIVE_INTERVAL_HOURS > 0:
+        archive_task = asyncio.create_task(archive_chat_messages_periodically())
+    
+    # 启动计数器写回任务
+    counter_task = asyncio.create_task(flush_counters_periodically())
+    
     # 注册异常处理器
     register_exception_handlers(app)
     
@@ -57,6 +100,23 @@ async def lifespan(app: FastAPI):
     # 应用关闭时的操作
     logger.info("Shutting down application...")
     
+    # 停止聊天消息归档任务
+    if archive_task:
+        archive_task.cancel()
+    
+    # 停止计数器写回任务，并写回剩余的增量
+    counter_task.cancel()
+    # 等待任务结束，避免与进行中的写回交错
+    with suppress(asyncio.CancelledError):
+        await counter_task
+    from app.core.counters import counter_aggregator
+    try:
+        flushed = await counter_aggregator.flush()
+        if flushed:
+            logger.info(f"Flushed {flushed} pending counters")
+    except Exception as e:
+        logger.error(f"Final counter flush failed: {e}")
+    
     # 关闭数据库连接
     await close_db_connection()
 